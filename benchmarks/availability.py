@@ -0,0 +1,132 @@
+"""Свободные даты и время для 200 врачей на 30 дней: индекс в памяти против запросов.
+
+Без --db индекс строится из синтетических строк и меряются только ответы
+из памяти. С --db данные кладутся во временную схему Postgres (DB_* переменные),
+и для сравнения выполняются прежние запросы: расписание врача и записи
+за день через DATE(appointment_date) на каждый клик.
+
+    python -m benchmarks.availability --doctors 200 --days 30 [--db]
+"""
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta, time as time_type
+from unittest import mock
+
+from benchmarks.common import report
+from db_handler.availability import AvailabilityIndex
+
+LEGACY_SCHEDULE_QUERY = "SELECT weekday FROM DoctorSchedules WHERE doctor_id = $1"
+LEGACY_APPOINTMENTS_QUERY = """
+    SELECT appointment_date FROM Appointments
+    WHERE doctor_id = $1 AND DATE(appointment_date) = $2
+"""
+
+
+def synthetic_rows(doctors: int, days: int, load: float, seed: int = 1):
+    """Расписание (5 рабочих дней из 7) и занятые слоты с долей load."""
+    rng = random.Random(seed)
+    today = datetime.combine(datetime.now().date(), time_type.min)
+    schedules = [
+        (doctor_id, weekday)
+        for doctor_id in range(1, doctors + 1)
+        for weekday in rng.sample(range(7), 5)
+    ]
+    appointments = [
+        (doctor_id, today + timedelta(days=day, hours=hour))
+        for doctor_id in range(1, doctors + 1)
+        for day in range(days)
+        for hour in range(8, 19)
+        if rng.random() < load
+    ]
+    return schedules, appointments
+
+
+class RowsPool:
+    def __init__(self, schedules, appointments):
+        self.schedules = schedules
+        self.appointments = appointments
+
+    async def fetch(self, query, *args):
+        return self.schedules if "DoctorSchedules" in query else self.appointments
+
+    async def execute(self, query, *args):
+        return "DELETE 0"
+
+
+async def index_lookups(index: AvailabilityIndex, doctors: int, days: int):
+    dates_latencies, times_latencies = [], []
+    for doctor_id in range(1, doctors + 1):
+        started = time.perf_counter()
+        free_dates = index.free_dates(doctor_id, days)
+        dates_latencies.append(time.perf_counter() - started)
+        for day in free_dates:
+            started = time.perf_counter()
+            index.free_times(doctor_id, day)
+            times_latencies.append(time.perf_counter() - started)
+    return dates_latencies, times_latencies
+
+
+async def in_memory(doctors: int, days: int, load: float):
+    index = AvailabilityIndex()
+    pool = RowsPool(*synthetic_rows(doctors, days, load))
+    with mock.patch("db_handler.availability.get_pool", return_value=pool):
+        started = time.perf_counter()
+        await index.rebuild()
+        print(f"построение индекса: {(time.perf_counter() - started) * 1000:.1f} мс, "
+              f"{len(pool.appointments)} записей")
+
+    dates_latencies, times_latencies = await index_lookups(index, doctors, days)
+    report("индекс: free_dates", len(dates_latencies), sum(dates_latencies), dates_latencies)
+    report("индекс: free_times", len(times_latencies), sum(times_latencies), times_latencies)
+
+
+async def against_postgres(doctors: int, days: int, load: float):
+    from benchmarks.common import temporary_schema
+    from db_handler.availability import availability_index
+
+    schedules, appointments = synthetic_rows(doctors, days, load)
+    async with temporary_schema() as pool:
+        await pool.executemany(
+            "INSERT INTO Doctors (doctor_id, first_name, last_name) VALUES ($1, 'Врач', $2)",
+            [(doctor_id, str(doctor_id)) for doctor_id in range(1, doctors + 1)],
+        )
+        await pool.executemany("INSERT INTO DoctorSchedules (doctor_id, weekday) VALUES ($1, $2)", schedules)
+        await pool.executemany(
+            "INSERT INTO Appointments (doctor_id, appointment_date) VALUES ($1, $2)", appointments
+        )
+        await pool.execute("ANALYZE")
+
+        today = datetime.now().date()
+        latencies = []
+        for doctor_id in range(1, doctors + 1):
+            started = time.perf_counter()
+            weekdays = {row[0] for row in await pool.fetch(LEGACY_SCHEDULE_QUERY, doctor_id)}
+            latencies.append(time.perf_counter() - started)
+            for day in range(days):
+                current = today + timedelta(days=day)
+                if current.weekday() in weekdays:
+                    started = time.perf_counter()
+                    await pool.fetch(LEGACY_APPOINTMENTS_QUERY, doctor_id, current)
+                    latencies.append(time.perf_counter() - started)
+        report("запросы: расписание + день", len(latencies), sum(latencies), latencies)
+
+        availability_index.invalidate()
+        started = time.perf_counter()
+        await availability_index.ensure_loaded()
+        print(f"построение индекса из Postgres: {(time.perf_counter() - started) * 1000:.1f} мс")
+        dates_latencies, times_latencies = await index_lookups(availability_index, doctors, days)
+        report("индекс: free_dates", len(dates_latencies), sum(dates_latencies), dates_latencies)
+        report("индекс: free_times", len(times_latencies), sum(times_latencies), times_latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--load", type=float, default=0.5, help="доля занятых слотов")
+    parser.add_argument("--db", action="store_true")
+    args = parser.parse_args()
+    run = against_postgres if args.db else in_memory
+    asyncio.run(run(args.doctors, args.days, args.load))
@@ -0,0 +1,94 @@
+"""Параллельная запись на прием: сотни пациентов одновременно берут одни и те же слоты.
+
+Каждый пациент бронирует случайный слот (hold_slot) и сразу подтверждает
+запись (create_appointment). С --no-hold бронь пропускается и все пациенты
+одновременно доходят до INSERT ... ON CONFLICT, так что двойную запись
+отсекает только уникальный индекс. После прогона проверяется, что на каждый
+слот приходится не больше одной активной записи. Нужен Postgres из DB_*
+переменных.
+
+    python -m benchmarks.booking --bookers 500 --slots 20
+    python -m benchmarks.booking --bookers 500 --slots 1 --no-hold
+"""
+import time
+import random
+import asyncio
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.common import report, run_concurrent, temporary_schema
+from db_handler import db
+
+FIRST_SLOT = datetime(2030, 6, 12, 9, 0)
+
+
+async def seed(pool, bookers: int) -> int:
+    """Заводит одного врача и bookers пациентов с tg_id 1..bookers, возвращает doctor_id."""
+    specialization_id = await pool.fetchval(
+        "INSERT INTO Specializations (name) VALUES ('Терапия') RETURNING specialization_id"
+    )
+    doctor_id = await pool.fetchval(
+        "INSERT INTO Doctors (first_name, last_name, specialization_id) VALUES ('Иван', 'Петров', $1) RETURNING doctor_id",
+        specialization_id,
+    )
+    await pool.executemany(
+        "INSERT INTO Users (first_name, last_name, tg_id) VALUES ('Пациент', $1, $1)",
+        [(str(tg_id),) for tg_id in range(1, bookers + 1)],
+    )
+    return doctor_id
+
+
+async def book_concurrently(doctor_id: int, bookers: int, slots: int, concurrency: int,
+                            seed_value: int = 0, hold: bool = True):
+    """Возвращает (результаты по пациентам, задержки).
+
+    hold=False — запись без брони: как у пациента, чья бронь истекла и была
+    удалена при пересборке индекса свободных слотов.
+    """
+    rng = random.Random(seed_value)
+    choices = [FIRST_SLOT + timedelta(minutes=30 * rng.randrange(slots)) for _ in range(bookers)]
+    results = [None] * bookers
+
+    async def call(i):
+        slot = choices[i]
+        tg_id = i + 1
+        if hold and not await db.hold_slot(doctor_id, slot, tg_id):
+            results[i] = "held_by_other"
+            return
+        results[i] = await db.create_appointment(tg_id, doctor_id, slot.strftime("%Y-%m-%d"), slot.strftime("%H:%M"))
+
+    latencies = await run_concurrent(call, bookers, concurrency)
+    return results, latencies
+
+
+async def active_per_slot(pool, doctor_id: int) -> Counter:
+    rows = await pool.fetch(
+        "SELECT appointment_date FROM Appointments WHERE doctor_id = $1 AND status IN ('scheduled', 'confirmed')",
+        doctor_id,
+    )
+    return Counter(row["appointment_date"] for row in rows)
+
+
+async def main(bookers: int, slots: int, concurrency: int, hold: bool):
+    async with temporary_schema(max_size=concurrency) as pool:
+        doctor_id = await seed(pool, bookers)
+        started = time.perf_counter()
+        results, latencies = await book_concurrently(doctor_id, bookers, slots, concurrency, hold=hold)
+        report("hold + create_appointment" if hold else "create_appointment без брони", bookers, time.perf_counter() - started, latencies)
+
+        outcomes = Counter(getattr(result, "value", result) for result in results)
+        per_slot = await active_per_slot(pool, doctor_id)
+        print(f"    исходы: {dict(outcomes)}")
+        print(f"    занято слотов: {len(per_slot)} из {slots}, двойных записей: "
+              f"{sum(1 for count in per_slot.values() if count > 1)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookers", type=int, default=500)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50, help="соединений в пуле и одновременных пациентов")
+    parser.add_argument("--no-hold", action="store_true", help="записывать сразу, без hold_slot")
+    args = parser.parse_args()
+    asyncio.run(main(args.bookers, args.slots, args.concurrency, not args.no_hold))
@@ -0,0 +1,64 @@
+"""Справок в секунду: рендер в процессе и через пул CertificateRenderer.
+
+В процессе сравниваются урезанный шрифт (compile_font) и полный DejaVuSans,
+пул — с разным числом процессов при --concurrency одновременных запросах.
+
+    python -m benchmarks.certificates --count 200 --workers 1 2 4
+"""
+import time
+import asyncio
+import argparse
+
+import certificate
+from benchmarks.common import report, run_concurrent
+
+
+def make_fields(i: int) -> dict:
+    return certificate.certificate_fields({
+        "full_name": f"Пациент Łukasz Ґудзь {i}",
+        "birth_date": "01.02.1990",
+        "diagnosis": "ОРВИ",
+        "start_date": "01.06.2025",
+        "end_date": "07.06.2025",
+        "doctor_name": "Иван Петров",
+    })
+
+
+def render_in_process(name: str, count: int, font_file: str):
+    certificate._font_file = font_file
+    certificate.render_certificate(make_fields(0))
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        call_started = time.perf_counter()
+        certificate.render_certificate(make_fields(i))
+        latencies.append(time.perf_counter() - call_started)
+    report(name, count, time.perf_counter() - started, latencies)
+
+
+async def render_in_pool(workers: int, count: int, concurrency: int):
+    renderer = certificate.CertificateRenderer(workers)
+    # прогрев: процессы пула стартуют и собирают шрифт до замера
+    await asyncio.gather(*(renderer.render(make_fields(i)) for i in range(workers)))
+    try:
+        started = time.perf_counter()
+        latencies = await run_concurrent(lambda i: renderer.render(make_fields(i)), count, concurrency)
+        report(f"пул, процессов: {workers}", count, time.perf_counter() - started, latencies)
+    finally:
+        renderer.shutdown()
+
+
+async def main(count: int, workers: list, concurrency: int):
+    render_in_process("в процессе, урезанный шрифт", count, certificate.compile_font())
+    render_in_process("в процессе, полный шрифт", max(1, count // 4), certificate.CERT_FONT_PATH)
+    for worker_count in workers:
+        await render_in_pool(worker_count, count, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.workers, args.concurrency))
@@ -0,0 +1,57 @@
+"""Задержка и память классификатора симптомов для каждого бэкенда.
+
+Каждый бэкенд меряется в отдельном процессе, чтобы пиковая память одного
+не смешивалась с другим. Нужен чекпоинт в results/.
+
+    python -m benchmarks.classifier_backends --repeat 20
+"""
+import time
+import argparse
+import resource
+import statistics
+import multiprocessing
+
+from benchmarks.common import load_corpus
+
+
+def measure(name: str, repeat: int) -> dict:
+    import model
+    from classifier_backends import load_backend
+
+    texts = [text for text, _ in load_corpus("symptoms.tsv")]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    started = time.perf_counter()
+    backend = load_backend(name, model.checkpoint_path)
+    load_time = time.perf_counter() - started
+    backend.predict_proba(texts[:1])
+
+    result = {"load": load_time}
+    for batch_size in (1, 8):
+        latencies = []
+        for i in range(repeat):
+            batch = [texts[(i + j) % len(texts)] for j in range(batch_size)]
+            started = time.perf_counter()
+            backend.predict_proba(batch)
+            latencies.append(time.perf_counter() - started)
+        result[f"batch{batch_size}"] = statistics.median(latencies)
+    # ru_maxrss в Linux — в килобайтах
+    result["rss_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+    return result
+
+
+if __name__ == "__main__":
+    from classifier_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'бэкенд':<12} {'загрузка, с':>12} {'батч 1, мс':>11} {'батч 8, мс':>11} {'+RSS, МБ':>9}")
+    for name in args.backends:
+        with context.Pool(1) as pool:
+            r = pool.apply(measure, (name, args.repeat))
+        print(f"{name:<12} {r['load']:>12.2f} {r['batch1'] * 1000:>11.1f} "
+              f"{r['batch8'] * 1000:>11.1f} {r['rss_mb']:>9.0f}")
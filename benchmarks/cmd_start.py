@@ -0,0 +1,76 @@
+"""Сообщений в секунду через cmd_start -> проверку регистрации.
+
+До: psycopg2.connect на каждое сообщение, синхронно внутри корутины (как было
+в db_handler/db.py до пула). После: пул asyncpg, с пустым и прогретым кэшем
+tg_id -> user_id.
+
+    DB_HOST=... DB_NAME=... python -m benchmarks.cmd_start --messages 2000
+"""
+import time
+import asyncio
+import argparse
+
+from benchmarks.common import FakeMessage, make_state, report, run_concurrent, temporary_schema
+
+
+def legacy_check_auth(params: dict, tg_id: str) -> bool:
+    import psycopg2
+
+    conn = psycopg2.connect(**params)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM Users WHERE tg_id = %s", (tg_id,))
+            return cursor.fetchone() is not None
+    finally:
+        conn.close()
+
+
+async def main(messages: int, users: int, concurrency: int):
+    from db_handler import db
+    from handlers.common import cmd_start
+
+    async with temporary_schema(max_size=db.DB_POOL_MAX_SIZE) as pool:
+        await pool.executemany(
+            "INSERT INTO Users (first_name, last_name, tg_id) VALUES ('Тест', 'Тестов', $1)",
+            [(str(100000 + i),) for i in range(users)],
+        )
+        schema = await pool.fetchval("SELECT current_schema()")
+        params = db.connection_params()
+        legacy_params = dict(
+            host=params["host"], port=params["port"], dbname=params["database"],
+            user=params["user"], password=params["password"],
+            options=f"-c search_path={schema}",
+        )
+
+        async def before(i):
+            tg_id = str(100000 + i % (users * 2))
+            user_id = 1 if legacy_check_auth(legacy_params, tg_id) else None
+            await cmd_start(FakeMessage(), make_state(), user_id=user_id)
+
+        async def after_cold(i):
+            tg_id = str(100000 + i % (users * 2))
+            db.invalidate_identity(tg_id)
+            await cmd_start(FakeMessage(), make_state(), user_id=await db.resolve_user_id(tg_id))
+
+        async def after_warm(i):
+            tg_id = str(100000 + i % (users * 2))
+            await cmd_start(FakeMessage(), make_state(), user_id=await db.resolve_user_id(tg_id))
+
+        # половина tg_id не зарегистрирована — обе ветки cmd_start
+        for name, call in (
+            ("psycopg2, соединение на запрос", before),
+            ("asyncpg пул, без кэша", after_cold),
+            ("asyncpg пул, кэш tg_id", after_warm),
+        ):
+            started = time.perf_counter()
+            latencies = await run_concurrent(call, messages, concurrency)
+            report(name, messages, time.perf_counter() - started, latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.users, args.concurrency))
@@ -0,0 +1,153 @@
+"""Общие помощники бенчмарков: замер, временная схема в Postgres, заглушки aiogram.
+
+Бенчмарки запускаются из корня репозитория: python -m benchmarks.<имя>.
+Те, что ходят в базу, берут подключение из тех же DB_* переменных, что и бот,
+и работают во временной схеме, которую удаляют после прогона.
+"""
+import os
+import time
+import uuid
+import asyncio
+import statistics
+import contextlib
+from typing import Awaitable, Callable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INIT_SQL = os.path.join(ROOT, "db", "init.sql")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def load_corpus(name: str) -> List[List[str]]:
+    """Строки TSV-корпуса из benchmarks/data без комментариев."""
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        return [
+            line.rstrip("\n").split("\t") for line in f
+            if line.strip() and not line.startswith("#")
+        ]
+
+
+def percentile(samples: List[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def report(name: str, count: int, seconds: float, latencies: List[float] = ()):
+    line = f"{name:<32} {count:>7} за {seconds:7.3f} с  {count / seconds:10.1f}/с"
+    if latencies:
+        line += (
+            f"  p50={statistics.median(latencies) * 1000:.2f} мс"
+            f"  p99={percentile(latencies, 0.99) * 1000:.2f} мс"
+        )
+    print(line)
+
+
+def timed(func: Callable, repeat: int) -> float:
+    """Среднее время одного вызова в секундах."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+async def run_concurrent(
+    make_call: Callable[[int], Awaitable],
+    count: int,
+    concurrency: int
+) -> List[float]:
+    """Выполняет count вызовов не более чем в concurrency задач и возвращает задержки."""
+    latencies = []
+    counter = iter(range(count))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            await make_call(i)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+@contextlib.asynccontextmanager
+async def temporary_schema(dsn: str = None, max_size: int = 10):
+    """Пул asyncpg во временной схеме со схемой из db/init.sql и всеми миграциями.
+
+    На время работы пул подставляется в db_handler.db, так что функции
+    бота работают с временной схемой.
+    """
+    import asyncpg
+    from db_handler import db
+    from db_handler.migrations import apply_migrations
+
+    schema = f"bench_{uuid.uuid4().hex[:12]}"
+    connect = dict(dsn=dsn) if dsn else db.connection_params()
+
+    admin = await asyncpg.connect(**connect)
+    await admin.execute(f"CREATE SCHEMA {schema}")
+    try:
+        pool = await asyncpg.create_pool(
+            **connect, min_size=1, max_size=max_size,
+            server_settings={"search_path": schema},
+        )
+        previous, db._pool = db._pool, pool
+        try:
+            with open(INIT_SQL, encoding="utf-8") as f:
+                await pool.execute(f.read())
+            await apply_migrations()
+            yield pool
+        finally:
+            db._pool = previous
+            db._identities.clear()
+            db._patient_snapshots.clear()
+            await pool.close()
+    finally:
+        await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+        await admin.close()
+
+
+class FakeMessage:
+    """Сообщение, которому хендлеры отвечают в память, а не в Telegram."""
+
+    def __init__(self, text: str = "", user_id: int = 1):
+        from aiogram.types import Chat, User
+
+        self.text = text
+        self.from_user = User(id=user_id, is_bot=False, first_name="Тест")
+        self.chat = Chat(id=user_id, type="private")
+        self.message_id = 1
+        self.answers = []
+
+    @property
+    def last_text(self):
+        return self.answers[-1][0] if self.answers else None
+
+    async def answer(self, text: str = None, **kwargs):
+        self.answers.append((text, kwargs))
+        return self
+
+    async def answer_document(self, document, **kwargs):
+        self.answers.append((kwargs.get("caption"), dict(kwargs, document=document)))
+        return self
+
+    async def edit_text(self, text: str, **kwargs):
+        self.answers.append((text, kwargs))
+        return self
+
+    async def edit_reply_markup(self, **kwargs):
+        self.answers.append((None, kwargs))
+        return self
+
+    async def delete(self):
+        return True
+
+
+def make_state(user_id: int = 1, storage=None):
+    """FSMContext поверх MemoryStorage или переданного хранилища."""
+    from aiogram.fsm.context import FSMContext
+    from aiogram.fsm.storage.base import StorageKey
+    from aiogram.fsm.storage.memory import MemoryStorage
+
+    return FSMContext(
+        storage=storage or MemoryStorage(),
+        key=StorageKey(bot_id=1, chat_id=user_id, user_id=user_id),
+    )
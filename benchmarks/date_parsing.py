@@ -0,0 +1,71 @@
+"""Задержка и точность разбора дат: локальный парсер против запроса к Ollama.
+
+Ollama заменена заглушкой с фиксированной задержкой (--llm-latency), которая
+отвечает ожидаемой датой, поэтому для пути через LLM меряется только время.
+Корпус — benchmarks/data/dates.tsv, "сегодня" в нем 12.06.2025.
+
+    python -m benchmarks.date_parsing --llm-latency 1.5
+"""
+import time
+import asyncio
+import argparse
+from datetime import date
+from unittest import mock
+
+from benchmarks.common import load_corpus, report
+from date_parser import parse_date
+
+TODAY = date(2025, 6, 12)
+
+
+class StubOllama:
+    def __init__(self, answers: dict, latency: float):
+        self.answers = answers
+        self.latency = latency
+
+    async def chat(self, model, messages):
+        await asyncio.sleep(self.latency)
+        prompt = messages[0]["content"]
+        answer = next((value for text, value in self.answers.items() if f'"{text}"' in prompt), "")
+        return {"message": {"content": answer}}
+
+
+async def main(repeat: int, llm_latency: float):
+    import model
+    from llm_client import LLMDateClient
+
+    corpus = load_corpus("dates.tsv")
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [parse_date(text, TODAY) for text, _ in corpus]
+    elapsed = time.perf_counter() - started
+    correct = sum(result == (expected or None) for result, (_, expected) in zip(results, corpus))
+    report("локальный парсер", len(corpus) * repeat, elapsed)
+    print(f"    точность {correct}/{len(corpus)}, {elapsed / (len(corpus) * repeat) * 1e6:.1f} мкс на текст")
+
+    client = LLMDateClient()
+    client._client = StubOllama({text: expected for text, expected in corpus}, llm_latency)
+    started = time.perf_counter()
+    for text, _ in corpus:
+        await client.extract_date(text)
+    report("только Ollama (заглушка)", len(corpus), time.perf_counter() - started)
+
+    # текущий путь get_date: парсер, а Ollama — только для того, что он не понял
+    client.cache.clear()
+    with mock.patch("llm_client.llm_date_client", client), mock.patch("date_parser.datetime") as clock:
+        clock.now.return_value.date.return_value = TODAY
+        started = time.perf_counter()
+        for text, _ in corpus:
+            await model.get_date(text)
+        report("get_date: парсер + Ollama", len(corpus), time.perf_counter() - started)
+    fallbacks = sum(parse_date(text, TODAY) is None for text, _ in corpus)
+    print(f"    в Ollama ушло {fallbacks} из {len(corpus)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--llm-latency", type=float, default=1.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.llm_latency))
@@ -0,0 +1,57 @@
+"""Задержка state.update_data/get_data для FSM-хранилищ.
+
+Каждый из --users пользователей делает --steps шагов сценария: update_data,
+затем get_data, как хендлеры регистрации. Postgres-хранилище меряется с
+кэшем и без него (cache_ttl=0 — каждое чтение идет в базу), запись в обоих
+случаях пачками. Нужен Postgres из DB_* переменных; redis — если задан REDIS_URL.
+
+    python -m benchmarks.fsm_storage --users 200 --steps 10
+"""
+import os
+import time
+import asyncio
+import argparse
+
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from benchmarks.common import make_state, report, run_concurrent, temporary_schema
+from db_handler.fsm_storage import PostgresStorage
+
+
+async def measure(name: str, storage, users: int, steps: int):
+    async def call(i):
+        state = make_state(user_id=i % users, storage=storage)
+        await state.update_data({f"field_{i // users}": "значение"})
+        await state.get_data()
+
+    started = time.perf_counter()
+    latencies = await run_concurrent(call, users * steps, concurrency=users)
+    report(name, users * steps, time.perf_counter() - started, latencies)
+
+    started = time.perf_counter()
+    await storage.close()
+    print(f"    закрытие с записью остатка: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+
+async def main(users: int, steps: int):
+    await measure("memory", MemoryStorage(), users, steps)
+
+    async with temporary_schema() as pool:
+        await measure("postgres, кэш", PostgresStorage(), users, steps)
+        rows = await pool.fetchval("SELECT count(*) FROM FSMStates")
+        print(f"    строк в FSMStates: {rows}")
+        await pool.execute("TRUNCATE FSMStates")
+        await measure("postgres, без кэша", PostgresStorage(cache_ttl=0), users, steps)
+
+    if os.environ.get("REDIS_URL"):
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        await measure("redis", RedisStorage.from_url(os.environ["REDIS_URL"]), users, steps)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.steps))
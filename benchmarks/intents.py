@@ -0,0 +1,81 @@
+"""Определение намерения: быстрые уровни IntentEngine против sklearn-модели.
+
+На корпусе benchmarks/data/intents.tsv меряются задержка и точность быстрого
+пути (точная фраза, нормализация, ключевые слова), модели intent_model.joblib
+по одному сообщению и пачкой, и связки "быстрый путь, иначе модель", как в
+predict_intent_async. Кэш предсказаний не используется.
+
+    python -m benchmarks.intents --repeat 200
+"""
+import time
+import argparse
+from collections import Counter
+
+from benchmarks.common import load_corpus
+from intents import IntentEngine
+
+
+def load_model():
+    import joblib
+    import model
+
+    started = time.perf_counter()
+    pipeline = joblib.load(model.intent_model_path)
+    return pipeline, time.perf_counter() - started
+
+
+def measure(name: str, predict, corpus, repeat: int) -> list:
+    """Печатает среднюю задержку и точность, возвращает ответы на корпус."""
+    answers = [predict(text) for text, _ in corpus]
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text, _ in corpus:
+            predict(text)
+    per_message = (time.perf_counter() - started) / (repeat * len(corpus))
+
+    answered = [(answer, expected) for answer, (_, expected) in zip(answers, corpus) if answer is not None]
+    correct = sum(answer == expected for answer, expected in answered)
+    print(f"{name:<28} {per_message * 1e6:>10.1f} мкс  ответил на {len(answered):>3}/{len(corpus)}"
+          f"  верно {correct}/{len(answered)}")
+    return answers
+
+
+def main(repeat: int):
+    corpus = load_corpus("intents.tsv")
+    engine = IntentEngine()
+    pipeline, load_seconds = load_model()
+    print(f"загрузка модели: {load_seconds * 1000:.0f} мс, сообщений в корпусе: {len(corpus)}\n")
+
+    fast = measure("быстрый путь", lambda text: engine.match_tier(text)[0], corpus, repeat)
+    model_answers = measure("модель, по одному", lambda text: str(pipeline.predict([text])[0]), corpus,
+                            max(1, repeat // 20))
+
+    def tiered(text):
+        intent, _ = engine.match_tier(text)
+        return intent if intent is not None else str(pipeline.predict([text])[0])
+
+    measure("быстрый путь, иначе модель", tiered, corpus, max(1, repeat // 20))
+
+    texts = [text for text, _ in corpus]
+    started = time.perf_counter()
+    for _ in range(max(1, repeat // 20)):
+        pipeline.predict(texts)
+    batch = (time.perf_counter() - started) / max(1, repeat // 20)
+    print(f"{'модель, пачкой':<28} {batch / len(texts) * 1e6:>10.1f} мкс на сообщение в пачке из {len(texts)}")
+
+    tiers = Counter(engine.match_tier(text)[1] or "model" for text in texts)
+    disagree = [
+        (text, intent, answer) for (text, _), intent, answer in zip(corpus, fast, model_answers)
+        if intent is not None and intent != answer
+    ]
+    print(f"\nуровни: {dict(tiers)}")
+    print(f"быстрый путь и модель расходятся: {len(disagree)}")
+    for text, intent, answer in disagree:
+        print(f"    {text!r}: быстрый путь {intent}, модель {answer}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,44 @@
+"""Стоимость inline-клавиатур: сборка заново против кэша и сериализация для Telegram.
+
+    python -m benchmarks.keyboards --repeat 2000
+"""
+import argparse
+from datetime import date, time, timedelta
+
+from keyboards import inline
+from benchmarks.common import timed
+
+
+def main(repeat: int, doctors_count: int):
+    doctors = [(i, "Имя", f"Фамилия{i}", "Терапия") for i in range(doctors_count)]
+    dates = [date(2025, 6, 12) + timedelta(days=i) for i in range(30)]
+    times = [time(hour) for hour in range(8, 20)]
+
+    cases = (
+        ("главное меню", inline.get_main_menu.__wrapped__, inline.get_main_menu),
+        (f"врачи ({doctors_count}), страница",
+         lambda: inline.get_doctors_keyboard(doctors, page=3, page_callback="doctors_page"),
+         lambda: inline.get_doctors_keyboard(doctors, page=3, generation=1, page_callback="doctors_page")),
+        ("даты (30)",
+         lambda: inline._build_dates_keyboard.__wrapped__(tuple(d.strftime("%Y-%m-%d") for d in dates)),
+         lambda: inline.get_dates_keyboard(dates)),
+        ("время (12)",
+         lambda: inline._build_times_keyboard.__wrapped__(tuple(t.strftime("%H:%M") for t in times)),
+         lambda: inline.get_times_keyboard(times)),
+    )
+
+    print(f"{'клавиатура':<26} {'сборка, мкс':>12} {'кэш, мкс':>10} {'в JSON, мкс':>12}")
+    for name, build, cached in cases:
+        markup = cached()
+        build_time = timed(build, repeat)
+        cached_time = timed(cached, repeat)
+        dump_time = timed(lambda: markup.model_dump_json(exclude_none=True), repeat)
+        print(f"{name:<26} {build_time * 1e6:>12.1f} {cached_time * 1e6:>10.2f} {dump_time * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--doctors", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat, args.doctors)
@@ -0,0 +1,193 @@
+"""Сколько запросов к БД уходит на один апдейт Telegram.
+
+Апдейты проходят через настоящий Dispatcher из main.create_dispatcher с
+IdentityMiddleware; Bot отвечает без сети, а пул БД подменяется счетчиком
+запросов поверх пула в памяти. Режим "без кэша" повторяет то, что было до
+middleware: поиск пациента в Users на каждом апдейте.
+
+    python -m benchmarks.queries_per_update --users 50 --rounds 5
+"""
+import json
+import asyncio
+import logging
+import argparse
+import contextlib
+from collections import Counter
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Update
+
+from cache import TTLCache
+from db_handler import db
+from db_handler.db import PATIENT_SNAPSHOT_QUERY, RESOLVE_USER_ID_QUERY
+
+
+class NoNetworkSession(BaseSession):
+    """Сессия Bot, которая ничего не отправляет в Telegram."""
+
+    async def make_request(self, bot, method, timeout=None):
+        return None
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+class FakeUsersPool:
+    """Users и снимок медкарты в памяти: пациенты с tg_id из registered."""
+
+    def __init__(self, registered):
+        self.registered = {str(tg_id) for tg_id in registered}
+
+    async def fetchval(self, query, *args):
+        if query == RESOLVE_USER_ID_QUERY:
+            return int(args[0]) if args[0] in self.registered else None
+        if query == PATIENT_SNAPSHOT_QUERY and args[0] in self.registered:
+            return json.dumps({
+                "user": {"user_id": int(args[0]), "first_name": "Анна", "last_name": "Иванова", "gender": "Ж",
+                         "phone": "+79990000000", "email": None, "birth_date": "1990-02-01"},
+                "appointments": [], "diagnoses": [],
+            })
+        return None
+
+    async def fetch(self, query, *args):
+        return []
+
+    async def fetchrow(self, query, *args):
+        return None
+
+    async def execute(self, query, *args):
+        return "OK"
+
+
+class CountingPool:
+    """Обертка над пулом, которая считает запросы по первой строке текста."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.queries = Counter()
+
+    def _count(self, query):
+        self.queries[" ".join(query.split())[:60]] += 1
+
+    async def fetchval(self, query, *args):
+        self._count(query)
+        return await self.pool.fetchval(query, *args)
+
+    async def fetch(self, query, *args):
+        self._count(query)
+        return await self.pool.fetch(query, *args)
+
+    async def fetchrow(self, query, *args):
+        self._count(query)
+        return await self.pool.fetchrow(query, *args)
+
+    async def execute(self, query, *args):
+        self._count(query)
+        return await self.pool.execute(query, *args)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self
+
+
+def make_message_update(update_id: int, tg_id: int, text: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(datetime.now().timestamp()),
+            "chat": {"id": tg_id, "type": "private"},
+            "from": {"id": tg_id, "is_bot": False, "first_name": "Анна"},
+            "text": text,
+        },
+    })
+
+
+def make_callback_update(update_id: int, tg_id: int, data: str) -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": "1",
+            "from": {"id": tg_id, "is_bot": False, "first_name": "Анна"},
+            "data": data,
+            "message": {
+                "message_id": update_id,
+                "date": int(datetime.now().timestamp()),
+                "chat": {"id": tg_id, "type": "private"},
+                "from": {"id": 1, "is_bot": True, "first_name": "Бот"},
+                "text": "🏠Главное меню:",
+            },
+        },
+    })
+
+
+# Типичная сессия пациента: вход, меню, профиль, главное меню
+SESSION = (
+    ("message", "/start"),
+    ("message", "Меню"),
+    ("callback", "medcard_profile"),
+    ("callback", "main_menu"),
+)
+
+_dispatcher = None
+
+
+def get_dispatcher():
+    """Dispatcher собирается один раз: роутер нельзя подключить повторно."""
+    global _dispatcher
+    if _dispatcher is None:
+        from db_handler import fsm_storage
+        from main import create_dispatcher
+
+        fsm_storage.FSM_STORAGE = "memory"
+        _dispatcher = create_dispatcher()
+    return _dispatcher
+
+
+async def count_queries(users: int, rounds: int, cached: bool) -> tuple:
+    """Прогоняет rounds сессий для каждого из users пациентов, возвращает (апдейтов, Counter запросов)."""
+    dp = get_dispatcher()
+    bot = Bot(token="123456:TEST", session=NoNetworkSession())
+    pool = CountingPool(FakeUsersPool(range(1, users + 1)))
+
+    previous_pool, previous_identities = db._pool, db._identities
+    db._pool = pool
+    db._identities = TTLCache(maxsize=db.IDENTITY_CACHE_SIZE if cached else 0, ttl=db.IDENTITY_CACHE_TTL)
+    db._patient_snapshots.clear()
+    update_id = 0
+    try:
+        for _ in range(rounds):
+            for tg_id in range(1, users + 1):
+                for kind, payload in SESSION:
+                    update_id += 1
+                    make = make_message_update if kind == "message" else make_callback_update
+                    await dp.feed_update(bot, make(update_id, tg_id, payload))
+    finally:
+        db._pool, db._identities = previous_pool, previous_identities
+        db._patient_snapshots.clear()
+    return update_id, pool.queries
+
+
+async def main(users: int, rounds: int):
+    get_dispatcher()
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    for name, cached in (("без кэша (как до middleware)", False), ("IdentityMiddleware", True)):
+        updates, queries = await count_queries(users, rounds, cached)
+        total = sum(queries.values())
+        print(f"{name:<30} апдейтов: {updates}, запросов: {total}, на апдейт: {total / updates:.2f}")
+        for query, count in queries.most_common():
+            print(f"    {count:>6}  {query}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.rounds))
@@ -0,0 +1,139 @@
+"""Нагрузочный тест рассылки напоминаний: 50 000 приемов и поддельный Bot.
+
+Bot отвечает с задержкой --latency и на каждую --retry-every отправку
+возвращает 429. С --crash-after рассылка "падает" после указанного числа
+отправок и запускается заново — проверяется, что ни одно напоминание не
+потерялось и не ушло дважды. Вместо Postgres — пул в памяти с тем же API.
+
+    python -m benchmarks.reminders --reminders 50000 --crash-after 12345
+"""
+import time
+import asyncio
+import argparse
+import contextlib
+from datetime import datetime, timedelta
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+import time_func
+
+
+class Crash(BaseException):
+    """Имитация падения процесса посреди рассылки."""
+
+
+class FakeBot:
+    def __init__(self, latency: float = 0.0, retry_every: int = 0, crash_after: int = 0):
+        self.latency = latency
+        self.retry_every = retry_every
+        self.crash_after = crash_after
+        self.calls = 0
+        self.delivered = []
+
+    async def send_message(self, chat_id: int, text: str):
+        self.calls += 1
+        if self.crash_after and len(self.delivered) >= self.crash_after:
+            raise Crash()
+        await asyncio.sleep(self.latency)
+        if self.retry_every and self.calls % self.retry_every == 0:
+            raise TelegramRetryAfter(
+                method=SendMessage(chat_id=chat_id, text=text), message="Too Many Requests", retry_after=0
+            )
+        self.delivered.append(chat_id)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.position = 0
+
+    async def fetch(self, count):
+        chunk = self.rows[self.position:self.position + count]
+        self.position += count
+        return chunk
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def cursor(self, query, start, end, kind):
+        return FakeCursor([
+            row for row in self.pool.appointments
+            if start <= row["appointment_date"] < end and (row["appointment_id"], kind) not in self.pool.sent
+        ])
+
+
+class FakeReminderPool:
+    """Appointments и AppointmentReminders в памяти."""
+
+    def __init__(self, count: int, start: datetime):
+        self.appointments = [
+            {
+                "appointment_id": i,
+                "tg_id": str(1_000_000 + i),
+                "appointment_date": start + timedelta(seconds=i % 3600),
+                "doctor_name": "Иван Петров",
+                "specialization": "Терапия",
+            }
+            for i in range(1, count + 1)
+        ]
+        self.sent = set()
+        self.writes = 0
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self)
+
+    async def execute(self, query, appointment_id, kind):
+        self.writes += 1
+        self.sent.add((appointment_id, kind))
+
+
+async def run(pool: FakeReminderPool, bots, start: datetime, kind: str = "24h"):
+    """Прогоняет рассылку с каждым ботом по очереди, как перезапуски процесса."""
+    previous = time_func.db_handler.db._pool
+    time_func.db_handler.db._pool = pool
+    try:
+        for bot in bots:
+            limiter = time_func.RateLimiter(global_rate=float("inf"), chat_interval=0)
+            try:
+                await time_func.dispatch_reminders(bot, start, start + timedelta(hours=1), kind, limiter)
+            except Crash:
+                # задачи, которые еще отправляют, "умирают" вместе с процессом
+                bot.crash_after = -1
+                await asyncio.sleep(0.1)
+    finally:
+        time_func.db_handler.db._pool = previous
+
+
+async def main(count: int, latency: float, retry_every: int, crash_after: int):
+    start = datetime(2025, 6, 12, 10, 0)
+    pool = FakeReminderPool(count, start)
+    bots = [FakeBot(latency, retry_every, crash_after)] if crash_after else []
+    bots.append(FakeBot(latency, retry_every))
+
+    started = time.perf_counter()
+    await run(pool, bots, start)
+    elapsed = time.perf_counter() - started
+
+    delivered = [chat_id for bot in bots for chat_id in bot.delivered]
+    print(f"напоминаний: {count}, доставлено: {len(delivered)}, уникальных: {len(set(delivered))}, "
+          f"отмечено: {len(pool.sent)}")
+    print(f"время: {elapsed:.2f} с, {len(delivered) / elapsed:.0f} сообщений/с, "
+          f"вызовов send_message: {sum(bot.calls for bot in bots)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=50_000)
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--retry-every", type=int, default=1000)
+    parser.add_argument("--crash-after", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.reminders, args.latency, args.retry_every, args.crash_after))
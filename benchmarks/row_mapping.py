@@ -0,0 +1,77 @@
+"""Накладные расходы на раскладку строк БД в модели.
+
+Сравнивает словари (как раньше: dict по именам колонок, медкарта — сырой
+JSON) с NamedTuple-моделями из db_handler.models: время раскладки и память
+на закэшированные объекты. База не нужна: строки синтетические.
+
+    python -m benchmarks.row_mapping --repeat 2000
+"""
+import json
+import argparse
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from benchmarks.common import timed
+from db_handler.models import Doctor, PatientSnapshot
+
+DOCTOR_COLUMNS = [name for name in Doctor._fields]
+
+
+def doctor_rows(count: int) -> list:
+    return [
+        (i, "Иван", f"Петров{i}", "+79990000000", f"doctor{i}@clinic.ru", "Опыт 10 лет", "Терапия", None)
+        for i in range(count)
+    ]
+
+
+def snapshot_json(appointments: int, diagnoses: int) -> str:
+    start = datetime(2025, 6, 12, 10, 0)
+    return json.dumps({
+        "user": {"user_id": 1, "first_name": "Анна", "last_name": "Иванова", "gender": "Ж",
+                 "phone": "+79990000000", "email": None, "birth_date": "1990-02-01"},
+        "appointments": [
+            {"appointment_id": i, "doctor_id": i % 7, "appointment_date": (start - timedelta(days=i)).isoformat(),
+             "doctor_name": "Иван Петров", "specialization": "Терапия"}
+            for i in range(appointments)
+        ],
+        "diagnoses": [
+            {"name": "ОРВИ", "diagnosis_date": (date(2025, 6, 1) - timedelta(days=30 * i)).isoformat()}
+            for i in range(diagnoses)
+        ],
+    })
+
+
+def retained_bytes(build, count: int) -> float:
+    """Сколько байт в среднем держит один объект из count построенных."""
+    tracemalloc.start()
+    objects = [build() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def main(repeat: int, doctors: int):
+    rows = doctor_rows(doctors)
+    raw = snapshot_json(appointments=5, diagnoses=20)
+
+    cases = (
+        (f"врачи ({doctors}), dict", lambda: [dict(zip(DOCTOR_COLUMNS, row)) for row in rows]),
+        (f"врачи ({doctors}), NamedTuple", lambda: [Doctor(*row) for row in rows]),
+        ("медкарта, dict из JSON", lambda: json.loads(raw)),
+        ("медкарта, PatientSnapshot", lambda: PatientSnapshot.from_json(json.loads(raw))),
+    )
+
+    print(f"{'раскладка':<30} {'мкс':>10} {'байт на объект':>16}")
+    for name, build in cases:
+        seconds = timed(build, repeat)
+        size = retained_bytes(build, max(1, repeat // 10))
+        print(f"{name:<30} {seconds * 1e6:>10.1f} {size:>16.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--doctors", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat, args.doctors)
@@ -0,0 +1,48 @@
+"""Пропускная способность классификатора симптомов при размере батча 1/8/32 на CPU.
+
+Запросы идут одновременно через MicroBatcher, как из хендлеров; кэш
+предсказаний отключен, чтобы каждый текст доходил до модели. Нужен чекпоинт
+в results/ (см. model.checkpoint_path).
+
+    python -m benchmarks.symptom_batching --requests 256
+"""
+import time
+import asyncio
+import argparse
+
+import model
+from benchmarks.common import load_corpus, report, run_concurrent
+from inference import InferenceService, MicroBatcher, SYMPTOM_BATCH_WAIT_MS
+
+
+async def run(batch_size: int, texts, requests: int, concurrency: int):
+    service = InferenceService()
+    batcher = MicroBatcher(service, "get_doctor", model.get_doctor_scores_batch,
+                           batch_size, SYMPTOM_BATCH_WAIT_MS / 1000)
+
+    async def call(i):
+        # уникальный текст на каждый запрос, иначе ответит кэш
+        model.best_doctor(await batcher.submit(f"{texts[i % len(texts)]} {i}"))
+
+    started = time.perf_counter()
+    latencies = await run_concurrent(call, requests, concurrency)
+    report(f"батч до {batch_size}", requests, time.perf_counter() - started, latencies)
+    print(f"    размеры батчей: {dict(sorted(batcher.batch_sizes.items()))}")
+    service.shutdown()
+
+
+async def main(requests: int, concurrency: int, sizes):
+    model.symptom_cache.maxsize = 0
+    model.get_classifier()
+    texts = [text for text, _ in load_corpus("symptoms.tsv")]
+    for batch_size in sizes:
+        await run(batch_size, texts, requests, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.sizes))
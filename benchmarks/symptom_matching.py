@@ -0,0 +1,81 @@
+"""Точность и задержка рекомендации специализации: индекс, BERT и гибрид.
+
+Каждый текст из benchmarks/data/symptoms.tsv проходит через
+inference.recommend_specialization в режимах index, bert и hybrid; ответ
+засчитывается, если same_specialty сводит его к ожидаемой специализации.
+Индекс строится из таблиц Symptoms бота (DB_* переменные), BERT — из
+чекпоинта в results/. Кэш предсказаний отключен. Недоступный режим
+пропускается с причиной.
+
+    python -m benchmarks.symptom_matching --modes index bert hybrid
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+import model
+import inference
+from benchmarks.common import load_corpus, percentile
+from db_handler.db import close_pool, create_pool
+from db_handler.symptoms import same_specialty, symptom_index
+
+
+async def measure(mode: str, corpus):
+    paths_before = dict(inference.symptom_match_paths)
+    latencies, correct, misses = [], 0, []
+    for text, expected in corpus:
+        started = time.perf_counter()
+        answer = await inference.recommend_specialization(text, mode)
+        latencies.append(time.perf_counter() - started)
+        if same_specialty(answer, expected):
+            correct += 1
+        else:
+            misses.append((text, expected, answer))
+
+    paths = {
+        path: count - paths_before[path]
+        for path, count in inference.symptom_match_paths.items() if count != paths_before[path]
+    }
+    print(f"{mode:<8} верно {correct:>3}/{len(corpus)} ({correct / len(corpus):6.1%})"
+          f"  p50={statistics.median(latencies) * 1000:7.2f} мс  p99={percentile(latencies, 0.99) * 1000:7.2f} мс"
+          f"  пути: {paths}")
+    for text, expected, answer in misses:
+        print(f"    {text!r}: ожидалась {expected}, ответ {answer}")
+
+
+def unavailable(mode: str) -> str:
+    """Причина, по которой режим не прогнать, или пустая строка."""
+    if mode != "bert" and not symptom_index.symptoms:
+        return "индекс симптомов пуст: нет базы или таблицы Symptoms не заполнены"
+    if mode != "index":
+        try:
+            model.get_classifier()
+        except Exception as e:
+            return f"классификатор не загружается: {e}"
+    return ""
+
+
+async def main(modes):
+    corpus = load_corpus("symptoms.tsv")
+    model.symptom_cache.maxsize = 0
+    await create_pool()
+    try:
+        await symptom_index.ensure_loaded()
+        for mode in modes:
+            reason = unavailable(mode)
+            if reason:
+                print(f"{mode:<8} пропущен: {reason}")
+                continue
+            await measure(mode, corpus)
+    finally:
+        inference.inference_service.shutdown()
+        await close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=["index", "bert", "hybrid"],
+                        choices=["index", "bert", "hybrid"])
+    args = parser.parse_args()
+    asyncio.run(main(args.modes))
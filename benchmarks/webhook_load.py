@@ -0,0 +1,144 @@
+"""Генератор нагрузки для вебхука: синтетические апдейты Telegram, апдейтов/с по числу воркеров.
+
+По умолчанию поднимает тот же вебхук (webhook.create_app) и воркеры с
+consume_updates/ChatOrderedRunner, но вместо Dispatcher в воркере — обработчик,
+который тратит --cpu-ms процессора и ждет --io-ms, как хендлер с запросом в БД.
+На 503 генератор повторяет доставку через --retry-ms, как Telegram.
+С --url апдейты отправляются в уже запущенного бота, и меряется только прием.
+
+    python -m benchmarks.webhook_load --updates 5000 --workers 1 2 4
+"""
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+from aiohttp import ClientSession, web
+
+import webhook
+
+
+def make_update(update_id: int, chat_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Тест"},
+            "text": "📅 Данные о приёмах",
+        },
+    }
+
+
+class SimulatedDispatcher:
+    def __init__(self, processed, cpu_ms: float, io_ms: float):
+        self.processed = processed
+        self.cpu = cpu_ms / 1000
+        self.io = io_ms / 1000
+
+    async def feed_raw_update(self, bot, update: dict):
+        deadline = time.perf_counter() + self.cpu
+        while time.perf_counter() < deadline:
+            pass
+        await asyncio.sleep(self.io)
+        with self.processed.get_lock():
+            self.processed.value += 1
+
+
+def _simulated_worker(updates, processed, cpu_ms: float, io_ms: float):
+    runner = webhook.ChatOrderedRunner(SimulatedDispatcher(processed, cpu_ms, io_ms), bot=None)
+    asyncio.run(webhook.consume_updates(updates, runner))
+
+
+class NoTelegramBot:
+    class session:
+        @staticmethod
+        async def close():
+            pass
+
+    async def set_webhook(self, *args, **kwargs):
+        pass
+
+
+async def send_updates(url: str, updates: int, chats: int, concurrency: int, retry_ms: float) -> int:
+    """Отправляет апдейты и возвращает, сколько раз вебхук ответил 503."""
+    rejected = 0
+    counter = iter(range(updates))
+
+    async with ClientSession() as session:
+        async def sender():
+            nonlocal rejected
+            for update_id in counter:
+                body = json.dumps(make_update(update_id, 1 + update_id % chats))
+                while True:
+                    async with session.post(url, data=body) as response:
+                        if response.status != 503:
+                            break
+                    rejected += 1
+                    await asyncio.sleep(retry_ms / 1000)
+
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return rejected
+
+
+async def run_local(workers: int, args):
+    context = multiprocessing.get_context("spawn")
+    processed = context.Value("i", 0)
+    queues = [context.Queue(maxsize=webhook.WORKER_QUEUE_SIZE) for _ in range(workers)]
+    processes = [
+        context.Process(target=_simulated_worker, args=(updates, processed, args.cpu_ms, args.io_ms))
+        for updates in queues
+    ]
+    for process in processes:
+        process.start()
+
+    runner = web.AppRunner(webhook.create_app(NoTelegramBot(), queues))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        started = time.perf_counter()
+        rejected = await send_updates(f"http://127.0.0.1:{port}{webhook.WEBHOOK_PATH}",
+                                      args.updates, args.chats, args.concurrency, args.retry_ms)
+        accepted_in = time.perf_counter() - started
+        while processed.value < args.updates:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+        for updates in queues:
+            updates.put(None)
+        for process in processes:
+            process.join()
+
+    print(f"воркеров: {workers:>2}  обработано {args.updates} за {elapsed:6.2f} с  "
+          f"{args.updates / elapsed:8.0f} апдейтов/с  (прием {accepted_in:.2f} с, 503: {rejected})")
+
+
+async def main(args):
+    if args.url:
+        started = time.perf_counter()
+        rejected = await send_updates(args.url, args.updates, args.chats, args.concurrency, args.retry_ms)
+        elapsed = time.perf_counter() - started
+        print(f"принято {args.updates} за {elapsed:.2f} с, {args.updates / elapsed:.0f}/с, 503: {rejected}")
+        return
+
+    for workers in args.workers:
+        await run_local(workers, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100, help="одновременных HTTP-запросов")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cpu-ms", type=float, default=2.0)
+    parser.add_argument("--io-ms", type=float, default=20.0)
+    parser.add_argument("--retry-ms", type=float, default=50.0)
+    parser.add_argument("--url", help="адрес вебхука уже запущенного бота")
+    asyncio.run(main(parser.parse_args()))
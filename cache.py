@@ -0,0 +1,75 @@
+# cache.py
+import re
+import time
+import threading
+from collections import OrderedDict
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_SPACES_RE = re.compile(r"\s+")
+
+MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    text = text.lower().replace("ё", "е")
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+class TTLCache:
+    """Потокобезопасный LRU-кэш с TTL: предсказания моделей, данные пациентов и т.п.
+
+    Размер ограничен maxsize записями, а слишком длинные ключи не кэшируются.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600, max_key_length: int = 512):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_key_length = max_key_length
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, count_miss: bool = True):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += count_miss
+                return MISSING
+
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += count_miss
+                return MISSING
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value):
+        if len(key) > self.max_key_length:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
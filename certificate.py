@@ -0,0 +1,166 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CERT_FONT_PATH = os.environ.get("CERT_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+CERT_WORKERS = int(os.environ.get("CERT_WORKERS", 2))
+CLINIC_NAME = "Разумед"
+
+# Латиница с Latin-1 и Latin Extended-A, вся кириллица (с украинскими, белорусскими
+# и казахскими буквами) и типографские знаки. Символ вне набора — ошибка рендера,
+# а не пустой квадрат в ФИО на справке.
+FONT_UNICODES = [
+    *range(0x20, 0x7F), *range(0xA0, 0x180), *range(0x400, 0x500), 0x2013, 0x2014, 0x2116
+]
+FONT_CHARS = frozenset(map(chr, FONT_UNICODES))
+
+# Меняется вместе с CERTIFICATE_TEMPLATE, чтобы старые справки в кэше не совпали по хэшу
+TEMPLATE_VERSION = 1
+
+# Шаблон справки: (размер шрифта, высота строки, текст с полями)
+CERTIFICATE_TEMPLATE = (
+    (16, 14, "Медицинская справка"),
+    (12, 8, "Выдана: {full_name}"),
+    (12, 8, "Дата рождения: {birth_date}"),
+    (12, 8, "Диагноз: {diagnosis}"),
+    (12, 8, "Период болезни: с {start_date} по {end_date}"),
+    (12, 8, "Справка выдана для предоставления по месту требования."),
+    (12, 8, "Врач: {doctor_name}"),
+    (12, 8, "Медицинское учреждение: {clinic}"),
+    (12, 8, "Дата выдачи: {issue_date}"),
+)
+
+_font_file: Optional[str] = None
+
+
+def compile_font(source: str = CERT_FONT_PATH) -> str:
+    """Готовит урезанную копию шрифта и возвращает путь к ней.
+
+    Полный DejaVuSans весит ~750 КБ, и fpdf разбирает и сабсетит его на каждой
+    справке; подмножество из FONT_UNICODES рендерится в несколько раз быстрее.
+    Файл собирается один раз и переиспользуется всеми процессами.
+    """
+    stat = os.stat(source)
+    # набор символов в имени файла: после его расширения старое подмножество не подойдет
+    charset = hashlib.sha256(repr(FONT_UNICODES).encode()).hexdigest()[:8]
+    target = os.path.join(
+        tempfile.gettempdir(), f"certificate_font_{stat.st_size}_{int(stat.st_mtime)}_{charset}.ttf"
+    )
+    if os.path.exists(target):
+        return target
+
+    from fontTools import subset
+
+    options = subset.Options()
+    options.layout_features = []
+    options.hinting = False
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=FONT_UNICODES)
+    subsetter.subset(font)
+
+    tmp_path = f"{target}.{os.getpid()}"
+    subset.save_font(font, tmp_path, options)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _init_worker():
+    global _font_file
+    _font_file = compile_font()
+
+
+def certificate_fields(data: dict) -> dict:
+    """Значения полей шаблона из данных сценария справки."""
+    return {
+        "full_name": data["full_name"],
+        "birth_date": data.get("birth_date") or "не указана",
+        "diagnosis": data["diagnosis"],
+        "start_date": data["start_date"],
+        "end_date": data["end_date"],
+        "doctor_name": data.get("doctor_name") or "Не указан",
+        "clinic": CLINIC_NAME,
+        "issue_date": data.get("issue_date") or datetime.now().strftime("%d.%m.%Y"),
+    }
+
+
+def content_hash(fields: dict) -> str:
+    """Одинаковые поля дают одинаковый PDF, поэтому хэш полей — ключ кэша справок."""
+    payload = json.dumps([TEMPLATE_VERSION, fields], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def missing_glyphs(lines) -> str:
+    """Символы строк, которых нет в урезанном шрифте, в порядке появления."""
+    missing = {}
+    for line in lines:
+        for char in line:
+            if char not in FONT_CHARS:
+                missing[char] = None
+    return "".join(missing)
+
+
+def render_certificate(fields: dict) -> bytes:
+    """Заполняет шаблон справки и возвращает готовый PDF в памяти.
+
+    ValueError, если в полях есть символы, которых нет в шрифте.
+    """
+    from fpdf import FPDF
+
+    lines = [(size, height, line.format_map(fields)) for size, height, line in CERTIFICATE_TEMPLATE]
+    missing = missing_glyphs(line for _, _, line in lines)
+    if missing:
+        raise ValueError(f"В шрифте справки нет символов: {missing!r}")
+
+    global _font_file
+    if _font_file is None:
+        _font_file = compile_font()
+
+    pdf = FPDF()
+    pdf.add_font("DejaVu", fname=_font_file)
+    pdf.add_page()
+    for size, height, line in lines:
+        pdf.set_font("DejaVu", size=size)
+        pdf.multi_cell(0, height, line, new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+class CertificateRenderer:
+    """Рендерит справки в пуле процессов, чтобы не держать event loop.
+
+    fpdf написан на чистом Python, поэтому потоки упирались бы в GIL.
+    """
+
+    def __init__(self, workers: int = CERT_WORKERS):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    async def render(self, fields: dict) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), render_certificate, fields)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+certificate_renderer = CertificateRenderer()
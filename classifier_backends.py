@@ -0,0 +1,117 @@
+# classifier_backends.py
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_NAME = "DeepPavlov/rubert-base-cased"
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, checkpoint_path: str):
+        from transformers import BertTokenizer, BertForSequenceClassification
+
+        self.tokenizer = BertTokenizer.from_pretrained(TOKENIZER_NAME)
+        self.model = BertForSequenceClassification.from_pretrained(checkpoint_path)
+        self.model.eval()
+
+    def predict_proba(self, texts):
+        import torch
+
+        inputs = self.tokenizer(texts, return_tensors="pt", truncation=True, padding=True)
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+            probabilities = torch.nn.functional.softmax(logits, dim=1)
+        return probabilities.numpy()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Динамическая int8-квантизация линейных слоев для CPU."""
+
+    name = "torch-int8"
+
+    def __init__(self, checkpoint_path: str):
+        import torch
+
+        super().__init__(checkpoint_path)
+        self.model = torch.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+def onnx_path_for(checkpoint_path: str) -> str:
+    """ONNX-файл лежит рядом с чекпоинтом, а не внутри: model.check_model_files
+    следит за содержимым каталога чекпоинта, и экспорт не должен сбрасывать кэш."""
+    return os.path.normpath(checkpoint_path) + ".onnx"
+
+
+def _checkpoint_mtime(checkpoint_path: str) -> float:
+    return max(entry.stat().st_mtime for entry in os.scandir(checkpoint_path) if entry.is_file())
+
+
+class OnnxBackend:
+    """ONNX Runtime на CPU; модель экспортируется из чекпоинта при первом запуске."""
+
+    name = "onnx"
+
+    def __init__(self, checkpoint_path: str):
+        import onnxruntime
+        from transformers import BertTokenizer
+
+        self.tokenizer = BertTokenizer.from_pretrained(TOKENIZER_NAME)
+        onnx_path = onnx_path_for(checkpoint_path)
+        # экспорт устарел, если чекпоинт обновили после него
+        if not os.path.exists(onnx_path) or os.path.getmtime(onnx_path) < _checkpoint_mtime(checkpoint_path):
+            self._export(checkpoint_path, onnx_path)
+
+        self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _export(self, checkpoint_path: str, onnx_path: str):
+        import torch
+        from transformers import BertForSequenceClassification
+
+        logger.info(f"Экспорт классификатора в ONNX: {onnx_path}")
+        model = BertForSequenceClassification.from_pretrained(checkpoint_path)
+        model.eval()
+        sample = self.tokenizer(["пример"], return_tensors="pt")
+        dynamic_axes = {"input_ids": {0: "batch", 1: "sequence"},
+                        "attention_mask": {0: "batch", 1: "sequence"},
+                        "token_type_ids": {0: "batch", 1: "sequence"},
+                        "logits": {0: "batch"}}
+        tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            tmp_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+        os.replace(tmp_path, onnx_path)
+
+    def predict_proba(self, texts):
+        import numpy as np
+
+        inputs = self.tokenizer(texts, return_tensors="np", truncation=True, padding=True)
+        feed = {name: value.astype(np.int64) for name, value in inputs.items() if name in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+
+def load_backend(name: str, checkpoint_path: str):
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд классификатора: {name}. Доступны: {', '.join(BACKENDS)}")
+    return BACKENDS[name](checkpoint_path)
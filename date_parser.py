@@ -0,0 +1,119 @@
+# date_parser.py
+import re
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+DATE_FORMAT = "%d.%m.%Y"
+
+MONTHS = {
+    "январ": 1, "феврал": 2, "март": 3, "апрел": 4, "ма": 5, "июн": 6,
+    "июл": 7, "август": 8, "сентябр": 9, "октябр": 10, "ноябр": 11, "декабр": 12,
+}
+
+WEEKDAYS = {
+    "понедельник": 0, "вторник": 1, "сред": 2, "четверг": 3,
+    "пятниц": 4, "суббот": 5, "воскресень": 6,
+}
+
+RELATIVE_DAYS = {
+    "позавчера": -2,
+    "вчера": -1,
+    "сегодня": 0,
+    "завтра": 1,
+    "послезавтра": 2,
+}
+
+NUMBER_WORDS = {
+    "один": 1, "одну": 1, "пару": 2, "два": 2, "две": 2, "три": 3, "четыре": 4, "пять": 5,
+    "шесть": 6, "семь": 7, "восемь": 8, "девять": 9, "десять": 10,
+}
+
+_NUMERIC_RE = re.compile(r"\b(\d{1,2})[./-](\d{1,2})(?:[./-](\d{2}|\d{4}))?\b")
+_ISO_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_TEXT_MONTH_RE = re.compile(r"\b(\d{1,2})(?:-?г?о)?\s+([а-я]+)(?:\s+(\d{4}))?")
+_AGO_RE = re.compile(r"\b(?:(\d+|[а-я]+)\s+)?(дн|день|недел)[а-я]*\s+назад\b")
+_WORD_RE = re.compile(r"[а-я]+")
+
+
+def _month_from_word(word: str) -> Optional[int]:
+    # "ма" отдельно, чтобы не путать "мая" с "март"
+    if word in ("мая", "май", "мае"):
+        return 5
+    for stem, month in MONTHS.items():
+        if stem != "ма" and word.startswith(stem):
+            return month
+    return None
+
+
+def _build(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _candidates(text: str, today: date) -> Iterator[Optional[date]]:
+    """Все даты, которые удалось выделить из текста, от самых явных к относительным.
+
+    Невалидное совпадение ("38.5" в "температура 38.5 с 10 июня") дает None
+    и не мешает следующим.
+    """
+    for match in _ISO_RE.finditer(text):
+        yield _build(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    for match in _NUMERIC_RE.finditer(text):
+        day, month, year = match.groups()
+        if year is None:
+            year = today.year
+        elif len(year) == 2:
+            year = 2000 + int(year)
+        yield _build(int(year), int(month), int(day))
+
+    for match in _TEXT_MONTH_RE.finditer(text):
+        month = _month_from_word(match.group(2))
+        if month:
+            year = int(match.group(3)) if match.group(3) else today.year
+            yield _build(year, month, int(match.group(1)))
+
+    words = _WORD_RE.findall(text)
+    for word in words:
+        if word in RELATIVE_DAYS:
+            yield today + timedelta(days=RELATIVE_DAYS[word])
+
+    for match in _AGO_RE.finditer(text):
+        amount, unit = match.groups()
+        if amount is None:
+            count = 1
+        elif amount.isdigit():
+            count = int(amount)
+        else:
+            # "заболел неделю назад": слово перед единицей — не число
+            count = NUMBER_WORDS.get(amount, 1)
+        days = count * 7 if unit == "недел" else count
+        yield today - timedelta(days=days)
+
+    for word in words:
+        for stem, weekday in WEEKDAYS.items():
+            if word.startswith(stem):
+                # дата болезни — всегда прошедший или сегодняшний день
+                delta = (today.weekday() - weekday) % 7
+                if "прошл" in text and delta == 0:
+                    delta = 7
+                yield today - timedelta(days=delta)
+
+
+def _parse(text: str, today: date) -> Optional[date]:
+    return next((result for result in _candidates(text, today) if result is not None), None)
+
+
+def parse_date(text: str, today: Optional[date] = None) -> Optional[str]:
+    """Разбирает дату на русском языке и возвращает ее в формате ДД.ММ.ГГГГ.
+
+    Понимает "12.06.25", "12.06.2025", "3 июня", "вчера", "позавчера",
+    "с понедельника", "3 дня назад". Возвращает None, если дату найти не удалось.
+    """
+    if not text:
+        return None
+    today = today or datetime.now().date()
+    result = _parse(text.lower().replace("ё", "е"), today)
+    return result.strftime(DATE_FORMAT) if result else None
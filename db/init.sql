@@ -62,6 +62,36 @@ CREATE TABLE Appointments (
     notes TEXT
 );
 
+-- Один активный прием на слот врача
+CREATE UNIQUE INDEX appointments_doctor_slot_uniq
+    ON Appointments (doctor_id, appointment_date)
+    WHERE status IN ('scheduled', 'confirmed');
+
+-- Временная бронь слота на время подтверждения записи
+CREATE TABLE SlotHolds (
+    doctor_id INTEGER REFERENCES Doctors(doctor_id),
+    slot TIMESTAMP NOT NULL,
+    tg_id VARCHAR(50) NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (doctor_id, slot)
+);
+
+-- Отправленные напоминания о приемах
+CREATE TABLE AppointmentReminders (
+    appointment_id INTEGER REFERENCES Appointments(appointment_id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,
+    sent_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (appointment_id, kind)
+);
+
+-- Состояния диалогов бота (FSM)
+CREATE TABLE FSMStates (
+    storage_key VARCHAR(255) PRIMARY KEY,
+    state VARCHAR(255),
+    data JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Таблица отзывов
 CREATE TABLE Reviews (
     review_id SERIAL PRIMARY KEY,
@@ -89,9 +119,17 @@ CREATE TABLE Certificates (
     issue_date DATE NOT NULL,
     type VARCHAR(100) NOT NULL,
     content TEXT,
-    status VARCHAR(20) NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'expired', 'revoked'))
+    status VARCHAR(20) NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'expired', 'revoked')),
+    content_hash CHAR(64),
+    pdf BYTEA,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Одна действующая справка пациента на набор полей; отозванные не мешают выдать новую
+CREATE UNIQUE INDEX certificates_user_content_hash_uniq
+    ON Certificates (user_id, content_hash)
+    WHERE status = 'active';
+
 -- Налоговые документы
 CREATE TABLE TaxDocuments (
     document_id SERIAL PRIMARY KEY,
@@ -103,6 +141,30 @@ CREATE TABLE TaxDocuments (
     status VARCHAR(20) NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'processed', 'rejected'))
 );
 
+-- Версия справочника врачей: увеличивается при любом изменении Doctors или Specializations
+CREATE TABLE CatalogVersion (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO CatalogVersion (id, version) VALUES (1, 0);
+
+CREATE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE CatalogVersion SET version = version + 1 WHERE id = 1;
+    PERFORM pg_notify('catalog_changed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER doctors_catalog_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Doctors
+FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+CREATE TRIGGER specializations_catalog_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Specializations
+FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
 -- Наполнение таблицы Specializations
 INSERT INTO Specializations (name, description) VALUES
 ('Гастроэнтерология', 'Диагностика и лечение заболеваний желудочно-кишечного тракта'),
@@ -0,0 +1,85 @@
+-- Таблицы, которые использует бот, но которых нет в ранних версиях init.sql
+
+ALTER TABLE Users ADD COLUMN IF NOT EXISTS gender VARCHAR(1);
+
+-- Рабочие дни врачей (0 — понедельник, 6 — воскресенье)
+CREATE TABLE IF NOT EXISTS DoctorSchedules (
+    doctor_id INTEGER NOT NULL REFERENCES Doctors(doctor_id) ON DELETE CASCADE,
+    weekday SMALLINT NOT NULL CHECK (weekday BETWEEN 0 AND 6),
+    PRIMARY KEY (doctor_id, weekday)
+);
+
+-- Диагнозы пациентов
+CREATE TABLE IF NOT EXISTS Diagnoses (
+    diagnosis_id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES Users(user_id),
+    doctor_id INTEGER REFERENCES Doctors(doctor_id),
+    diagnosis_name VARCHAR(255) NOT NULL,
+    diagnosis_date DATE NOT NULL,
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS AppointmentReminders (
+    appointment_id INTEGER REFERENCES Appointments(appointment_id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,
+    sent_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (appointment_id, kind)
+);
+
+CREATE TABLE IF NOT EXISTS FSMStates (
+    storage_key VARCHAR(255) PRIMARY KEY,
+    state VARCHAR(255),
+    data JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS SlotHolds (
+    doctor_id INTEGER REFERENCES Doctors(doctor_id),
+    slot TIMESTAMP NOT NULL,
+    tg_id VARCHAR(50) NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (doctor_id, slot)
+);
+
+-- Старые версии бота могли записать двух пациентов на один слот. Перед
+-- уникальным индексом оставляем активной самую раннюю запись, остальные
+-- отменяем с пометкой в notes, чтобы их можно было найти и разобрать.
+UPDATE Appointments a
+SET status = 'canceled',
+    notes = concat_ws(E'\n', a.notes, 'Отменена миграцией 0001: двойная запись на слот')
+FROM (
+    SELECT appointment_id,
+           row_number() OVER (PARTITION BY doctor_id, appointment_date ORDER BY appointment_id) AS n
+    FROM Appointments
+    WHERE status IN ('scheduled', 'confirmed')
+) duplicates
+WHERE a.appointment_id = duplicates.appointment_id AND duplicates.n > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS appointments_doctor_slot_uniq
+    ON Appointments (doctor_id, appointment_date)
+    WHERE status IN ('scheduled', 'confirmed');
+
+CREATE TABLE IF NOT EXISTS CatalogVersion (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO CatalogVersion (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE CatalogVersion SET version = version + 1 WHERE id = 1;
+    PERFORM pg_notify('catalog_changed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS doctors_catalog_version ON Doctors;
+CREATE TRIGGER doctors_catalog_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Doctors
+FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS specializations_catalog_version ON Specializations;
+CREATE TRIGGER specializations_catalog_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Specializations
+FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
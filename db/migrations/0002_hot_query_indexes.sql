@@ -0,0 +1,29 @@
+-- Индексы под частые запросы бота
+
+-- медкарта и справка: последние приемы пациента
+CREATE INDEX IF NOT EXISTS appointments_user_date_idx
+    ON Appointments (user_id, appointment_date DESC);
+
+-- свободное время врача на день
+CREATE INDEX IF NOT EXISTS appointments_doctor_date_status_idx
+    ON Appointments (doctor_id, appointment_date, status);
+
+-- напоминания: приемы в интервале времени
+CREATE INDEX IF NOT EXISTS appointments_scheduled_date_idx
+    ON Appointments (appointment_date)
+    WHERE status = 'scheduled';
+
+-- диагнозы пациента
+CREATE INDEX IF NOT EXISTS diagnoses_user_date_idx
+    ON Diagnoses (user_id, diagnosis_date DESC);
+
+-- врачи по специализации
+CREATE INDEX IF NOT EXISTS doctors_specialization_idx
+    ON Doctors (specialization_id);
+
+-- очистка брошенных сценариев и просроченных броней
+CREATE INDEX IF NOT EXISTS fsm_states_updated_at_idx
+    ON FSMStates (updated_at);
+
+CREATE INDEX IF NOT EXISTS slot_holds_expires_at_idx
+    ON SlotHolds (expires_at);
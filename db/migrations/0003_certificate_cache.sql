@@ -0,0 +1,9 @@
+-- Выданные справки хранятся вместе с PDF: повторный запрос с теми же данными
+-- отдается из таблицы без повторного рендера
+
+ALTER TABLE Certificates ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+ALTER TABLE Certificates ADD COLUMN IF NOT EXISTS pdf BYTEA;
+ALTER TABLE Certificates ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+CREATE UNIQUE INDEX IF NOT EXISTS certificates_content_hash_uniq
+    ON Certificates (content_hash);
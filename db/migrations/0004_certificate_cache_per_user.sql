@@ -0,0 +1,9 @@
+-- Кэш справок был общим по content_hash: второй пациент с теми же полями
+-- получал чужую справку, а отозванная строка навсегда занимала хэш.
+-- Теперь уникальна только действующая справка в пределах пациента.
+
+DROP INDEX IF EXISTS certificates_content_hash_uniq;
+
+CREATE UNIQUE INDEX IF NOT EXISTS certificates_user_content_hash_uniq
+    ON Certificates (user_id, content_hash)
+    WHERE status = 'active';
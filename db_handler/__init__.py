@@ -1,3 +1,3 @@
-from .db import create_connection, check_auth,register_user
+from .db import create_pool, get_pool, close_pool, check_auth, register_user
 
-__all__ = ['create_connection', 'check_auth','register_user']
\ No newline at end of file
+__all__ = ['create_pool', 'get_pool', 'close_pool', 'check_auth', 'register_user']
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import time
+import asyncio
+from datetime import datetime, timedelta, date as date_type, time as time_type
+from typing import Dict, List, Set, Tuple
+
+import asyncpg
+
+from .db import CLINIC_WORK_HOURS, Weekday, get_pool
+
+AVAILABILITY_REFRESH_INTERVAL = float(os.environ.get("AVAILABILITY_REFRESH_INTERVAL", 300))
+
+
+def _build_day_slots() -> Dict[int, Tuple[time_type, ...]]:
+    slots = {}
+    for weekday, (start_hour, start_minute, end_hour, end_minute) in CLINIC_WORK_HOURS.items():
+        current = datetime.combine(date_type.today(), time_type(start_hour, start_minute))
+        end = datetime.combine(date_type.today(), time_type(end_hour, end_minute))
+        times = []
+        while current < end:
+            times.append(current.time())
+            current += timedelta(hours=1)
+        slots[weekday.value] = tuple(times)
+    return slots
+
+
+class AvailabilityIndex:
+    """Свободные даты и время приема врачей без запросов к БД на каждый клик.
+
+    Индекс строится одним проходом по DoctorSchedules и будущим записям,
+    дополняется при успешной записи и периодически перестраивается, чтобы
+    подхватить изменения, сделанные в обход бота.
+    """
+
+    def __init__(self, refresh_interval: float = AVAILABILITY_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.day_slots = _build_day_slots()
+        self._schedules: Dict[int, frozenset] = {}
+        self._booked: Dict[Tuple[int, date_type], Set[time_type]] = {}
+        self._built_at = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_interval:
+            return
+        async with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < self.refresh_interval:
+                return
+            await self.rebuild()
+
+    async def rebuild(self):
+        pool = await get_pool()
+        if not pool:
+            return
+
+        today = datetime.combine(datetime.now().date(), time_type.min)
+        try:
+            schedule_rows = await pool.fetch("SELECT doctor_id, weekday FROM DoctorSchedules")
+            appointment_rows = await pool.fetch("""
+                SELECT doctor_id, appointment_date
+                FROM Appointments
+                WHERE appointment_date >= $1 AND status IN ('scheduled', 'confirmed')
+            """, today)
+            await pool.execute("DELETE FROM SlotHolds WHERE expires_at < CURRENT_TIMESTAMP")
+        except asyncpg.PostgresError as e:
+            print(f"Ошибка при построении индекса свободного времени: {e}")
+            return
+
+        schedules = {}
+        for doctor_id, weekday in schedule_rows:
+            schedules.setdefault(doctor_id, set()).add(weekday)
+
+        booked = {}
+        for doctor_id, appointment_date in appointment_rows:
+            booked.setdefault((doctor_id, appointment_date.date()), set()).add(appointment_date.time())
+
+        self._schedules = {doctor_id: frozenset(days) for doctor_id, days in schedules.items()}
+        self._booked = booked
+        self._built_at = time.monotonic()
+
+    def invalidate(self):
+        self._built_at = None
+
+    def free_times(self, doctor_id: int, date: date_type) -> List[time_type]:
+        if date.weekday() not in self._schedules.get(doctor_id, ()):
+            return []
+        booked = self._booked.get((doctor_id, date), ())
+        return [slot for slot in self.day_slots.get(date.weekday(), ()) if slot not in booked]
+
+    def free_dates(self, doctor_id: int, days_ahead: int = 30) -> List[date_type]:
+        weekdays = self._schedules.get(doctor_id)
+        if not weekdays:
+            return []
+
+        today = datetime.now().date()
+        available_dates = []
+        for day in range(days_ahead):
+            current_date = today + timedelta(days=day)
+            if current_date.weekday() not in weekdays:
+                continue
+            if len(self._booked.get((doctor_id, current_date), ())) >= len(self.day_slots[current_date.weekday()]):
+                continue
+            available_dates.append(current_date)
+        return available_dates
+
+    def book(self, doctor_id: int, appointment_date: datetime):
+        self._booked.setdefault((doctor_id, appointment_date.date()), set()).add(appointment_date.time())
+
+
+availability_index = AvailabilityIndex()
+
+
+async def generate_available_dates(doctor_id: int, days_ahead: int = 30) -> List[date_type]:
+    await availability_index.ensure_loaded()
+    return availability_index.free_dates(doctor_id, days_ahead)
+
+
+async def generate_available_times(doctor_id: int, date: date_type) -> List[time_type]:
+    if Weekday(date.weekday()) not in CLINIC_WORK_HOURS:
+        return []
+    await availability_index.ensure_loaded()
+    return availability_index.free_times(doctor_id, date)
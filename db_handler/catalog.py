@@ -0,0 +1,135 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+
+from .db import get_pool, connection_params
+from .models import Doctor
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "catalog_changed"
+CATALOG_VERSION_CHECK_INTERVAL = float(os.environ.get("CATALOG_VERSION_CHECK_INTERVAL", 60))
+
+CATALOG_QUERY = f"""
+    SELECT {Doctor.COLUMNS}
+    FROM Doctors d
+    JOIN Specializations s ON d.specialization_id = s.specialization_id
+    ORDER BY d.doctor_id
+"""
+
+
+def normalize_specialization(name: str) -> str:
+    return " ".join(name.lower().replace("ё", "е").split())
+
+
+class DoctorCatalog:
+    """Кэш справочника врачей и специализаций на весь процесс.
+
+    Справочник загружается одним запросом и перечитывается, когда в Postgres
+    меняется счетчик CatalogVersion: об этом сообщает NOTIFY catalog_changed,
+    а на случай потери соединения версия дополнительно сверяется по таймеру.
+    """
+
+    def __init__(self, version_check_interval: float = CATALOG_VERSION_CHECK_INTERVAL):
+        self.version_check_interval = version_check_interval
+        self.version = None
+        # номер загруженного состава врачей, по нему кэшируются клавиатуры
+        self.generation = 0
+        self.doctors: List[Tuple[int, str, str, str]] = []
+        self.by_id: Dict[int, Doctor] = {}
+        self.by_specialization: Dict[str, List[Tuple[int, str, str, str]]] = {}
+        self._stale = True
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._listener = None
+
+    async def start(self):
+        await self.ensure_loaded()
+        try:
+            self._listener = await asyncpg.connect(**connection_params())
+            await self._listener.add_listener(CATALOG_CHANNEL, self._on_notify)
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning(f"Подписка на изменения справочника врачей недоступна: {e}")
+            self._listener = None
+
+    async def stop(self):
+        if self._listener is not None:
+            await self._listener.close()
+            self._listener = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._stale = True
+
+    async def _current_version(self, pool) -> Optional[int]:
+        try:
+            return await pool.fetchval("SELECT version FROM CatalogVersion WHERE id = 1")
+        except asyncpg.UndefinedTableError:
+            return None
+
+    async def ensure_loaded(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.version_check_interval:
+            return
+
+        async with self._lock:
+            if not self._stale and time.monotonic() - self._checked_at < self.version_check_interval:
+                return
+
+            pool = await get_pool()
+            if not pool:
+                return
+            try:
+                version = await self._current_version(pool)
+                if self._stale or version != self.version:
+                    rows = await pool.fetch(CATALOG_QUERY)
+                    self._build(rows)
+                    self.version = version
+                self._stale = False
+                self._checked_at = time.monotonic()
+            except asyncpg.PostgresError as e:
+                print(f"Ошибка при загрузке справочника врачей: {e}")
+
+    def _build(self, rows):
+        doctors, by_id, by_specialization = [], {}, {}
+        for row in rows:
+            info = Doctor(*row)
+            doctor = (info.doctor_id, info.first_name, info.last_name, info.specialization)
+            doctors.append(doctor)
+            by_id[info.doctor_id] = info
+            by_specialization.setdefault(normalize_specialization(info.specialization), []).append(doctor)
+        self.doctors, self.by_id, self.by_specialization = doctors, by_id, by_specialization
+        self.generation += 1
+
+    def find_by_specialization(self, specialization: str) -> List[Tuple[int, str, str, str]]:
+        key = normalize_specialization(specialization)
+        if key in self.by_specialization:
+            return list(self.by_specialization[key])
+        # как раньше ILIKE '%...%': название модели может быть частью названия специализации
+        return [
+            doctor
+            for name, doctors in self.by_specialization.items() if key in name
+            for doctor in doctors
+        ]
+
+
+doctor_catalog = DoctorCatalog()
+
+
+async def get_doctors() -> list:
+    await doctor_catalog.ensure_loaded()
+    return list(doctor_catalog.doctors)
+
+
+async def get_doctor_info(doctor_id: int) -> Optional[Doctor]:
+    await doctor_catalog.ensure_loaded()
+    return doctor_catalog.by_id.get(doctor_id)
+
+
+async def get_doctors_by_specialization(specialization: str) -> list:
+    await doctor_catalog.ensure_loaded()
+    return doctor_catalog.find_by_specialization(specialization)
+
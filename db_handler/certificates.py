@@ -0,0 +1,133 @@
+import os
+import json
+from typing import List, Optional
+
+import asyncpg
+
+from certificate import certificate_fields, content_hash, certificate_renderer
+from .db import get_pool
+
+CERTIFICATE_TYPE = "Справка о болезни"
+CERT_BULK_DAYS = int(os.environ.get("CERT_BULK_DAYS", 7))
+CERT_BULK_LIMIT = int(os.environ.get("CERT_BULK_LIMIT", 200))
+
+GET_CERTIFICATE_PDF_QUERY = """
+    SELECT pdf FROM Certificates
+    WHERE user_id = $1 AND content_hash = $2 AND status = 'active'
+"""
+
+SAVE_CERTIFICATE_QUERY = """
+    INSERT INTO Certificates
+    (user_id, doctor_id, issue_date, type, content, content_hash, pdf)
+    VALUES ($1, $2, CURRENT_DATE, $3, $4, $5, $6)
+    ON CONFLICT (user_id, content_hash) WHERE status = 'active' DO NOTHING
+"""
+
+# Последний диагноз каждого пациента: либо из списка, либо поставленный за последние дни
+BULK_CERTIFICATE_DATA_QUERY = """
+    SELECT DISTINCT ON (u.user_id)
+        u.user_id,
+        u.first_name || ' ' || u.last_name AS full_name,
+        to_char(u.birth_date, 'DD.MM.YYYY') AS birth_date,
+        dg.diagnosis_name,
+        to_char(dg.diagnosis_date, 'DD.MM.YYYY') AS diagnosis_date,
+        to_char(CURRENT_DATE, 'DD.MM.YYYY') AS today,
+        dg.doctor_id,
+        d.first_name || ' ' || d.last_name AS doctor_name
+    FROM Users u
+    JOIN Diagnoses dg ON dg.user_id = u.user_id
+    LEFT JOIN Doctors d ON d.doctor_id = dg.doctor_id
+    WHERE CASE
+        WHEN $1::int[] IS NULL THEN dg.diagnosis_date >= CURRENT_DATE - $2::int
+        ELSE u.user_id = ANY($1::int[])
+    END
+    ORDER BY u.user_id, dg.diagnosis_date DESC
+    LIMIT $3
+"""
+
+
+async def get_certificate_pdf(user_id: int, digest: str) -> Optional[bytes]:
+    pool = await get_pool()
+    if not pool:
+        return None
+
+    try:
+        return await pool.fetchval(GET_CERTIFICATE_PDF_QUERY, user_id, digest)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при чтении справки: {e}")
+        return None
+
+
+async def save_certificate(
+    user_id: Optional[int],
+    doctor_id: Optional[int],
+    digest: str,
+    fields: dict,
+    pdf: bytes
+) -> bool:
+    pool = await get_pool()
+    if not pool:
+        return False
+
+    try:
+        await pool.execute(
+            SAVE_CERTIFICATE_QUERY,
+            user_id, doctor_id, CERTIFICATE_TYPE,
+            json.dumps(fields, ensure_ascii=False), digest, pdf
+        )
+        return True
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при сохранении справки: {e}")
+        return False
+
+
+async def issue_certificate(data: dict) -> bytes:
+    """PDF справки: из таблицы Certificates, если такая уже выдавалась, иначе рендер и сохранение.
+
+    Кэш действует в пределах пациента: у двух пациентов с одинаковыми полями
+    свои справки. Без user_id справка только рендерится.
+    """
+    fields = certificate_fields(data)
+    user_id = data.get("user_id")
+    if user_id is None:
+        return await certificate_renderer.render(fields)
+
+    digest = content_hash(fields)
+    pdf = await get_certificate_pdf(user_id, digest)
+    if pdf is not None:
+        return pdf
+
+    pdf = await certificate_renderer.render(fields)
+    await save_certificate(user_id, data.get("doctor_id"), digest, fields, pdf)
+    return pdf
+
+
+async def get_bulk_certificate_data(
+    user_ids: Optional[List[int]] = None,
+    days: int = CERT_BULK_DAYS,
+    limit: int = CERT_BULK_LIMIT
+) -> List[dict]:
+    """Данные для массовой выдачи справок: период болезни — с даты диагноза по сегодня."""
+    pool = await get_pool()
+    if not pool:
+        return []
+
+    try:
+        rows = await pool.fetch(BULK_CERTIFICATE_DATA_QUERY, user_ids, days, limit)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при выборке пациентов для справок: {e}")
+        return []
+
+    return [
+        {
+            "user_id": row["user_id"],
+            "doctor_id": row["doctor_id"],
+            "full_name": row["full_name"],
+            "birth_date": row["birth_date"],
+            "diagnosis": row["diagnosis_name"],
+            "start_date": row["diagnosis_date"],
+            "end_date": row["today"],
+            "doctor_name": row["doctor_name"],
+        }
+        for row in rows
+    ]
@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta
-import psycopg2
-from psycopg2 import OperationalError
-from typing import Optional, List, Tuple
+from datetime import datetime
+import asyncio
+import json
+import asyncpg
+from typing import Optional
 from enum import Enum
 import os
 
+from cache import TTLCache, MISSING
+from .models import PatientSnapshot
+
 
 class Weekday(Enum):
     MONDAY = 0
@@ -25,150 +29,224 @@ CLINIC_WORK_HOURS = {
     Weekday.SUNDAY: (8, 0, 15, 0),
 }
 
+DB_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 10))
+DB_COMMAND_TIMEOUT = float(os.environ.get("DB_COMMAND_TIMEOUT", 10))
+
+# tg_id -> user_id; живет дольше снимка карты, т.к. меняется только при регистрации
+IDENTITY_CACHE_SIZE = int(os.environ.get("IDENTITY_CACHE_SIZE", 10000))
+IDENTITY_CACHE_TTL = float(os.environ.get("IDENTITY_CACHE_TTL", 600))
+
+_identities = TTLCache(maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL)
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+def connection_params() -> dict:
+    return dict(
+        host=os.environ.get("DB_HOST"),
+        port=os.environ.get("DB_PORT"),
+        database=os.environ.get("DB_NAME"),
+        user=os.environ.get("DB_USER"),
+        password=os.environ.get("DB_PASSWORD"),
+    )
+
+
+async def create_pool() -> Optional[asyncpg.Pool]:
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            return _pool
+        try:
+            # asyncpg кэширует подготовленные выражения на каждом соединении пула,
+            # поэтому частые запросы ниже разбираются сервером один раз
+            _pool = await asyncpg.create_pool(
+                **connection_params(),
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                command_timeout=DB_COMMAND_TIMEOUT,
+                statement_cache_size=256,
+            )
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"Ошибка подключения к базе данных: {e}")
+            return None
+        return _pool
+
+
+async def get_pool() -> Optional[asyncpg.Pool]:
+    if _pool is not None:
+        return _pool
+    return await create_pool()
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+RESOLVE_USER_ID_QUERY = "SELECT user_id FROM Users WHERE tg_id = $1"
+
+
+class BookingResult(Enum):
+    BOOKED = "booked"
+    SLOT_TAKEN = "slot_taken"
+    HOLD_EXPIRED = "hold_expired"
+    USER_NOT_FOUND = "user_not_found"
+    ERROR = "error"
+
+
+SLOT_HOLD_SECONDS = int(os.environ.get("SLOT_HOLD_SECONDS", 300))
+
+HOLD_SLOT_QUERY = """
+    INSERT INTO SlotHolds (doctor_id, slot, tg_id, expires_at)
+    VALUES ($1, $2, $3, CURRENT_TIMESTAMP + make_interval(secs => $4))
+    ON CONFLICT (doctor_id, slot) DO UPDATE
+    SET tg_id = EXCLUDED.tg_id, expires_at = EXCLUDED.expires_at
+    WHERE SlotHolds.expires_at < CURRENT_TIMESTAMP OR SlotHolds.tg_id = EXCLUDED.tg_id
+    RETURNING tg_id
+"""
+
+RELEASE_SLOT_QUERY = """
+    DELETE FROM SlotHolds WHERE doctor_id = $1 AND slot = $2 AND tg_id = $3
+"""
+
+# Запись за один запрос: поиск пользователя, проверка, что слот не держит
+# живой бронью другой пользователь, вставка с проверкой уникального частичного
+# индекса по (doctor_id, appointment_date) и снятие брони. Своя бронь не нужна:
+# истекшую бронь могли удалить при пересборке индекса свободных слотов, и
+# тогда свободный слот все равно можно занять. Если брони нет ни у кого,
+# одновременные записи разводит уникальный индекс. FOR UPDATE не дает
+# перехватить существующую бронь, пока идет запись.
+BOOK_SLOT_QUERY = """
+    WITH patient AS (
+        SELECT user_id FROM Users WHERE tg_id = $1
+    ), hold AS (
+        SELECT tg_id, expires_at FROM SlotHolds
+        WHERE doctor_id = $2 AND slot = $3
+        FOR UPDATE
+    ), held_by_other AS (
+        SELECT EXISTS (
+            SELECT 1 FROM hold WHERE tg_id <> $1 AND expires_at >= CURRENT_TIMESTAMP
+        ) AS held
+    ), booked AS (
+        INSERT INTO Appointments (user_id, doctor_id, appointment_date, status)
+        SELECT user_id, $2, $3, 'scheduled' FROM patient
+        WHERE NOT (SELECT held FROM held_by_other)
+        ON CONFLICT (doctor_id, appointment_date) WHERE status IN ('scheduled', 'confirmed') DO NOTHING
+        RETURNING appointment_id
+    ), released AS (
+        DELETE FROM SlotHolds
+        WHERE doctor_id = $2 AND slot = $3 AND EXISTS (SELECT 1 FROM booked)
+    )
+    SELECT (SELECT user_id FROM patient) AS user_id,
+           (SELECT held FROM held_by_other) AS held_by_other,
+           (SELECT appointment_id FROM booked) AS appointment_id
+"""
+
+
+async def hold_slot(doctor_id: int, slot: datetime, tg_id: int, seconds: int = SLOT_HOLD_SECONDS) -> bool:
+    """Бронирует слот за пользователем на время подтверждения записи.
+
+    Возвращает False, если слот уже держит другой пользователь.
+    """
+    pool = await get_pool()
+    if not pool:
+        return False
 
-def create_connection():
     try:
-        conn = psycopg2.connect(
-            host=os.environ.get("DB_HOST"),
-            port=os.environ.get("DB_PORT"),
-            dbname=os.environ.get("DB_NAME"),
-            user=os.environ.get("DB_USER"),
-            password=os.environ.get("DB_PASSWORD"),
-        )
-        return conn
-    except OperationalError as e:
-        print(f"Ошибка подключения к базе данных: {e}")
-        return None
+        return await pool.fetchval(HOLD_SLOT_QUERY, doctor_id, slot, tg_id_key(tg_id), float(seconds)) is not None
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при бронировании слота: {e}")
+        return False
 
 
-def get_doctor_schedule(doctor_id: int) -> List[Tuple[int, int]]:
-    conn = create_connection()
-    if not conn:
-        return []
+async def release_slot(doctor_id: int, slot: datetime, tg_id: int):
+    """Снимает бронь пользователя, если он ушел с шага подтверждения."""
+    pool = await get_pool()
+    if not pool:
+        return
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT weekday 
-                FROM DoctorSchedules 
-                WHERE doctor_id = %s
-            """, (doctor_id,))
-            return [row[0] for row in cursor.fetchall()]
-    except psycopg2.Error as e:
-        print(f"Ошибка при получении расписания врача: {e}")
-        return []
-    finally:
-        conn.close()
+        await pool.execute(RELEASE_SLOT_QUERY, doctor_id, slot, tg_id_key(tg_id))
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при снятии брони слота: {e}")
 
 
-def generate_available_dates(doctor_id: int, days_ahead: int = 30) -> List[datetime.date]:
-    doctor_schedule = get_doctor_schedule(doctor_id)
-    if not doctor_schedule:
-        return []
+async def create_appointment(tg_id: int, doctor_id: int, date: str, time: str) -> BookingResult:
+    pool = await get_pool()
+    if not pool:
+        return BookingResult.ERROR
 
-    available_dates = []
-    today = datetime.now().date()
-
-    for day in range(days_ahead):
-        current_date = today + timedelta(days=day)
-        weekday = current_date.weekday()
+    try:
+        appointment_datetime = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    except ValueError as e:
+        print(f"Ошибка при создании записи: {e}")
+        return BookingResult.ERROR
 
-        if weekday in doctor_schedule:
-            available_dates.append(current_date)
+    try:
+        row = await pool.fetchrow(BOOK_SLOT_QUERY, tg_id_key(tg_id), doctor_id, appointment_datetime)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при создании записи: {e}")
+        return BookingResult.ERROR
 
-    return available_dates
+    if row["user_id"] is None:
+        print(f"Пользователь с tg_id={tg_id} не найден")
+        return BookingResult.USER_NOT_FOUND
 
+    if row["held_by_other"]:
+        return BookingResult.HOLD_EXPIRED
 
-def generate_available_times(doctor_id: int, date: datetime.date) -> List[datetime.time]:
-    weekday = Weekday(date.weekday())
-    if weekday not in CLINIC_WORK_HOURS:
-        return []
+    from .availability import availability_index
 
-    start_hour, start_minute, end_hour, end_minute = CLINIC_WORK_HOURS[weekday]
-    start_time = datetime.combine(date, datetime.min.time()).replace(hour=start_hour, minute=start_minute)
-    end_time = datetime.combine(date, datetime.min.time()).replace(hour=end_hour, minute=end_minute)
+    # слот занят в любом случае: либо нами, либо параллельной записью
+    availability_index.book(doctor_id, appointment_datetime)
+    if row["appointment_id"] is None:
+        return BookingResult.SLOT_TAKEN
+    invalidate_patient_snapshot(tg_id)
+    return BookingResult.BOOKED
 
-    existing_appointments = get_existing_appointments(doctor_id, date)
-    booked_times = {appt.time() for appt in existing_appointments}
 
-    available_times = []
-    current_time = start_time
+def tg_id_key(tg_id) -> str:
+    """Users.tg_id хранится как VARCHAR, поэтому Telegram id всегда приводим к строке."""
+    return str(tg_id)
 
-    while current_time < end_time:
-        if current_time.time() not in booked_times:
-            available_times.append(current_time.time())
-        current_time += timedelta(hours=1)
 
-    return available_times
+async def resolve_user_id(tg_id) -> Optional[int]:
+    """user_id пациента по tg_id или None, если он не зарегистрирован.
 
+    Отрицательный ответ тоже кэшируется: его сбрасывает register_user.
+    """
+    tg_id = tg_id_key(tg_id)
+    user_id = _identities.get(tg_id)
+    if user_id is not MISSING:
+        return user_id
 
-def get_existing_appointments(doctor_id: int, date: datetime.date) -> List[datetime.date]:
-    conn = create_connection()
-    if not conn:
-        return []
+    pool = await get_pool()
+    if not pool:
+        return None
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT appointment_date 
-                FROM Appointments 
-                WHERE doctor_id = %s AND DATE(appointment_date) = %s AND status = 'scheduled'
-            """, (doctor_id, date))
-            return [row[0] for row in cursor.fetchall()]
-    except psycopg2.Error as e:
-        print(f"Ошибка при получении записей: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def create_appointment(tg_id: int, doctor_id: int, date: str, time: str) -> bool:
-    conn = create_connection()
-    if not conn:
-        return False
+        user_id = await pool.fetchval(RESOLVE_USER_ID_QUERY, tg_id)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при проверке авторизации: {e}")
+        return None
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT user_id FROM Users WHERE tg_id = %s", (str(tg_id),))
-            user_row = cursor.fetchone()
-            if not user_row:
-                print(f"Пользователь с tg_id={tg_id} не найден")
-                return False
-
-            user_id = user_row[0]
-
-            appointment_datetime = f"{date} {time}"
-            cursor.execute("""
-                INSERT INTO Appointments (user_id, doctor_id, appointment_date, status)
-                VALUES (%s, %s, %s, 'scheduled')
-            """, (user_id, doctor_id, appointment_datetime))
-            conn.commit()
-            return True
-    except psycopg2.Error as e:
-        print(f"Ошибка при создании записи: {e}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
+    _identities.set(tg_id, user_id)
+    return user_id
 
 
-def check_auth(tg_id: int) -> bool:
-    conn = create_connection()
-    if not conn:
-        return False
+def invalidate_identity(tg_id):
+    _identities.pop(tg_id_key(tg_id))
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT 1 FROM Users WHERE tg_id = %s", (tg_id,))
-            return cursor.fetchone() is not None
-    except psycopg2.Error as e:
-        print(f"Ошибка при проверке авторизации: {e}")
-        return False
-    finally:
-        conn.close()
 
+async def check_auth(tg_id: str) -> bool:
+    return await resolve_user_id(tg_id) is not None
 
-def register_user(
+
+async def register_user(
     tg_id: str,
     username: Optional[str],
     first_name: str,
@@ -178,307 +256,114 @@ def register_user(
     email: Optional[str] = None,
     birth_date: Optional[str] = None
 ) -> bool:
-    conn = create_connection()
-    if not conn:
+    pool = await get_pool()
+    if not pool:
         return False
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO Users 
-                (first_name, last_name, gender, phone, email, tg_id, birth_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (first_name, last_name, gender, phone, email, tg_id, birth_date)
-            )
-            conn.commit()
-            return True
-    except psycopg2.Error as e:
+        birth_date_value = datetime.strptime(birth_date, "%d.%m.%Y").date() if birth_date else None
+    except ValueError as e:
         print(f"Ошибка при регистрации пользователя: {e}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
-
-
-def get_doctors() -> list:
-    conn = create_connection()
-    if not conn:
-        return []
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT d.doctor_id, d.first_name, d.last_name, s.name as specialization 
-                FROM Doctors d
-                JOIN Specializations s ON d.specialization_id = s.specialization_id
-            """)
-            return cursor.fetchall()
-    except psycopg2.Error as e:
-        print(f"Ошибка при получении списка врачей: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def get_doctor_info(doctor_id: int) -> Optional[dict]:
-    conn = create_connection()
-    if not conn:
-        return None
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    d.doctor_id, 
-                    d.first_name, 
-                    d.last_name, 
-                    d.phone, 
-                    d.email, 
-                    d.description,
-                    s.name AS specialization,
-                    s.description AS specialization_description
-                FROM Doctors d
-                JOIN Specializations s ON d.specialization_id = s.specialization_id
-                WHERE d.doctor_id = %s
-            """, (doctor_id,))
-
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "doctor_id": row[0],
-                    "first_name": row[1],
-                    "last_name": row[2],
-                    "phone": row[3],
-                    "email": row[4],
-                    "description": row[5],
-                    "specialization": row[6],
-                    "specialization_description": row[7],
-                }
-            else:
-                return None
-    except psycopg2.Error as e:
-        print(f"Ошибка при получении информации о враче: {e}")
-        return None
-    finally:
-        conn.close()
-
-def get_doctors_by_specialization(specialization: str) -> list:
-    conn = create_connection()
-    if not conn:
-        return []
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT d.doctor_id, d.first_name, d.last_name, s.name as specialization 
-                FROM Doctors d
-                JOIN Specializations s ON d.specialization_id = s.specialization_id
-                WHERE s.name ILIKE %s
-            """, (f"%{specialization}%",))
-            return cursor.fetchall()
-    except psycopg2.Error as e:
-        print(f"Ошибка при получении врачей по специализации: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def get_user_data(tg_id: str) -> Optional[dict]:
-    conn = create_connection()
-    if not conn:
-        return None
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    user_id, first_name, last_name, gender, 
-                    phone, email, birth_date
-                FROM Users 
-                WHERE tg_id = %s
-            """, (tg_id,))
-
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "user_id": row[0],
-                    "first_name": row[1],
-                    "last_name": row[2],
-                    "gender": row[3],
-                    "phone": row[4],
-                    "email": row[5],
-                    "birth_date": row[6].strftime("%d.%m.%Y") if row[6] else None
-                }
-            return None
-    except psycopg2.Error as e:
-        print(f"Error getting user data: {e}")
-        return None
-    finally:
-        conn.close()
+        await pool.execute(
+            """
+            INSERT INTO Users 
+            (first_name, last_name, gender, phone, email, tg_id, birth_date)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            """,
+            first_name, last_name, gender, phone, email, tg_id_key(tg_id), birth_date_value
+        )
+        invalidate_identity(tg_id)
+        invalidate_patient_snapshot(tg_id)
+        return True
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при регистрации пользователя: {e}")
+        return False
 
-def get_last_appointment(user_id: int) -> Optional[dict]:
-    conn = create_connection()
-    if not conn:
-        return None
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
+PATIENT_SNAPSHOT_TTL = float(os.environ.get("PATIENT_SNAPSHOT_TTL", 30))
+
+_patient_snapshots = TTLCache(maxsize=10000, ttl=PATIENT_SNAPSHOT_TTL)
+
+# Профиль, последние приемы и диагнозы пациента одним запросом
+PATIENT_SNAPSHOT_QUERY = """
+    SELECT json_build_object(
+        'user', json_build_object(
+            'user_id', u.user_id,
+            'first_name', u.first_name,
+            'last_name', u.last_name,
+            'gender', u.gender,
+            'phone', u.phone,
+            'email', u.email,
+            'birth_date', u.birth_date
+        ),
+        'appointments', COALESCE((
+            SELECT json_agg(json_build_object(
+                'appointment_id', a.appointment_id,
+                'doctor_id', a.doctor_id,
+                'appointment_date', a.appointment_date,
+                'doctor_name', a.doctor_name,
+                'specialization', a.specialization
+            ) ORDER BY a.appointment_date DESC)
+            FROM (
                 SELECT 
-                    a.appointment_id,
-                    a.appointment_date,
-                    d.first_name || ' ' || d.last_name as doctor_name,
-                    s.name as specialization
-                FROM Appointments a
-                JOIN Doctors d ON a.doctor_id = d.doctor_id
+                    ap.appointment_id,
+                    ap.doctor_id,
+                    ap.appointment_date,
+                    d.first_name || ' ' || d.last_name AS doctor_name,
+                    s.name AS specialization
+                FROM Appointments ap
+                JOIN Doctors d ON ap.doctor_id = d.doctor_id
                 JOIN Specializations s ON d.specialization_id = s.specialization_id
-                WHERE a.user_id = %s
-                ORDER BY a.appointment_date DESC
-                LIMIT 1
-            """, (user_id,))
-
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "appointment_id": row[0],
-                    "date": row[1].strftime("%d.%m.%Y"),
-                    "time": row[1].strftime("%H:%M"),
-                    "doctor_name": row[2],
-                    "specialization": row[3]
-                }
-            return None
-    except psycopg2.Error as e:
-        print(f"Error getting last appointment: {e}")
-        return None
-    finally:
-        conn.close()
-
-
-def get_doctor_data(doctor_id: int) -> Optional[dict]:
-    conn = create_connection()
-    if not conn:
+                WHERE ap.user_id = u.user_id
+                ORDER BY ap.appointment_date DESC
+                LIMIT 5
+            ) a
+        ), '[]'::json),
+        'diagnoses', COALESCE((
+            SELECT json_agg(json_build_object(
+                'name', dg.diagnosis_name,
+                'diagnosis_date', dg.diagnosis_date
+            ) ORDER BY dg.diagnosis_date DESC)
+            FROM Diagnoses dg
+            WHERE dg.user_id = u.user_id
+        ), '[]'::json)
+    )
+    FROM Users u
+    WHERE u.tg_id = $1
+"""
+
+
+async def get_patient_snapshot(tg_id: str) -> Optional[PatientSnapshot]:
+    """Профиль, 5 последних приемов и диагнозы пациента.
+
+    Результат кэшируется на PATIENT_SNAPSHOT_TTL секунд и сбрасывается при
+    регистрации и записи на прием.
+    """
+    tg_id = tg_id_key(tg_id)
+    snapshot = _patient_snapshots.get(tg_id)
+    if snapshot is not MISSING:
+        return snapshot
+
+    pool = await get_pool()
+    if not pool:
         return None
 
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    d.first_name, d.last_name,
-                    s.name as specialization
-                FROM Doctors d
-                JOIN Specializations s ON d.specialization_id = s.specialization_id
-                WHERE d.doctor_id = %s
-            """, (doctor_id,))
-
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "first_name": row[0],
-                    "last_name": row[1],
-                    "specialization": row[2]
-                }
-            return None
-    except psycopg2.Error as e:
-        print(f"Error getting doctor data: {e}")
+        raw = await pool.fetchval(PATIENT_SNAPSHOT_QUERY, tg_id)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка получения данных пациента: {e}")
         return None
-    finally:
-        conn.close()
 
+    if raw is None:
+        return None
 
-def get_user_diagnoses(user_id: int) -> List[dict]:
-    conn = create_connection()
-    if not conn:
-        return []
+    snapshot = PatientSnapshot.from_json(json.loads(raw))
+    _patient_snapshots.set(tg_id, snapshot)
+    return snapshot
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    diagnosis_name, diagnosis_date
-                FROM Diagnoses
-                WHERE user_id = %s
-                ORDER BY diagnosis_date DESC
-            """, (user_id,))
-
-            return [
-                {
-                    "name": row[0],
-                    "date": row[1].strftime("%d.%m.%Y")
-                }
-                for row in cursor.fetchall()
-            ]
-    except psycopg2.Error as e:
-        print(f"Error getting user diagnoses: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def get_user_appointments(user_id: int) -> List[dict]:
-    conn = create_connection()
-    if not conn:
-        return []
 
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    a.appointment_id,
-                    a.appointment_date,
-                    d.first_name || ' ' || d.last_name as doctor_name,
-                    s.name as specialization
-                FROM Appointments a
-                JOIN Doctors d ON a.doctor_id = d.doctor_id
-                JOIN Specializations s ON d.specialization_id = s.specialization_id
-                WHERE a.user_id = %s
-                ORDER BY a.appointment_date DESC
-                LIMIT 5
-            """, (user_id,))
-
-            return [
-                {
-                    "appointment_id": row[0],
-                    "date": row[1].strftime("%d.%m.%Y"),
-                    "time": row[1].strftime("%H:%M"),
-                    "doctor_name": row[2],
-                    "specialization": row[3]
-                }
-                for row in cursor.fetchall()
-            ]
-    except psycopg2.Error as e:
-        print(f"Error getting user appointments: {e}")
-        return []
-    finally:
-        conn.close()
-
-
-def get_last_diagnosis(user_id: int) -> Optional[dict]:
-    conn = create_connection()
-    if not conn:
-        return None
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT 
-                    diagnosis_name, diagnosis_date
-                FROM Diagnoses
-                WHERE user_id = %s
-                ORDER BY diagnosis_date DESC
-                LIMIT 1
-            """, (user_id,))
-
-            row = cursor.fetchone()
-            if row:
-                return {
-                    "name": row[0],
-                    "date": row[1].strftime("%d.%m.%Y")
-                }
-            return None
-    except psycopg2.Error as e:
-        print(f"Error getting last diagnosis: {e}")
-        return None
-    finally:
-        conn.close()
\ No newline at end of file
+def invalidate_patient_snapshot(tg_id: str):
+    _patient_snapshots.pop(tg_id_key(tg_id))
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+import asyncpg
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from .db import get_pool
+
+logger = logging.getLogger(__name__)
+
+FSM_STORAGE = os.environ.get("FSM_STORAGE", "postgres")
+FSM_STATE_TTL = int(os.environ.get("FSM_STATE_TTL", 86400))
+FSM_FLUSH_INTERVAL = float(os.environ.get("FSM_FLUSH_INTERVAL", 0.2))
+FSM_CACHE_SIZE = int(os.environ.get("FSM_CACHE_SIZE", 10000))
+FSM_CACHE_TTL = float(os.environ.get("FSM_CACHE_TTL", 300))
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+UPSERT_QUERY = """
+    INSERT INTO FSMStates (storage_key, state, data, updated_at)
+    VALUES ($1, $2, $3::jsonb, CURRENT_TIMESTAMP)
+    ON CONFLICT (storage_key) DO UPDATE
+    SET state = EXCLUDED.state, data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+"""
+
+SELECT_QUERY = """
+    SELECT state, data
+    FROM FSMStates
+    WHERE storage_key = $1 AND updated_at > CURRENT_TIMESTAMP - make_interval(secs => $2)
+"""
+
+
+class _Entry:
+    __slots__ = ("state", "data", "loaded_at")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any]):
+        self.state = state
+        self.data = data
+        self.loaded_at = time.monotonic()
+
+
+class PostgresStorage(BaseStorage):
+    """FSM-хранилище в таблице FSMStates.
+
+    Состояние пользователя кэшируется в памяти, а изменения пишутся в БД пачками
+    раз в flush_interval секунд. Кэш предполагает, что апдейты одного чата
+    обрабатывает один процесс; записи старше cache_ttl перечитываются из БД.
+    Брошенные сценарии удаляются через state_ttl секунд без изменений.
+    """
+
+    def __init__(self, state_ttl: int = FSM_STATE_TTL, flush_interval: float = FSM_FLUSH_INTERVAL,
+                 cache_size: int = FSM_CACHE_SIZE, cache_ttl: float = FSM_CACHE_TTL):
+        self.state_ttl = state_ttl
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dirty = set()
+        self._flush_task = None
+        self._last_cleanup = 0.0
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return ":".join(str(part) if part is not None else "" for part in (
+            key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny
+        ))
+
+    async def _get_entry(self, key: StorageKey) -> _Entry:
+        storage_key = self._key(key)
+        entry = self._cache.get(storage_key)
+        if entry is not None and (storage_key in self._dirty or time.monotonic() - entry.loaded_at < self.cache_ttl):
+            self._cache.move_to_end(storage_key)
+            return entry
+
+        entry = _Entry(None, {})
+        pool = await get_pool()
+        if pool:
+            try:
+                row = await pool.fetchrow(SELECT_QUERY, storage_key, float(self.state_ttl))
+                if row:
+                    entry = _Entry(row["state"], json.loads(row["data"]))
+            except asyncpg.PostgresError as e:
+                print(f"Ошибка при чтении состояния FSM: {e}")
+
+        self._remember(storage_key, entry)
+        return entry
+
+    def _remember(self, storage_key: str, entry: _Entry):
+        self._cache[storage_key] = entry
+        self._cache.move_to_end(storage_key)
+        while len(self._cache) > self.cache_size:
+            oldest = next(iter(self._cache))
+            if oldest in self._dirty:
+                break
+            del self._cache[oldest]
+
+    def _mark_dirty(self, storage_key: str):
+        self._dirty.add(storage_key)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        pool = await get_pool()
+        if not pool:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        upserts, deletes = [], []
+        for storage_key in dirty:
+            entry = self._cache.get(storage_key)
+            if entry is None or (entry.state is None and not entry.data):
+                deletes.append(storage_key)
+            else:
+                upserts.append((storage_key, entry.state, json.dumps(entry.data, ensure_ascii=False, default=str)))
+
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    if upserts:
+                        await conn.executemany(UPSERT_QUERY, upserts)
+                    if deletes:
+                        await conn.execute("DELETE FROM FSMStates WHERE storage_key = ANY($1::text[])", deletes)
+                    if time.monotonic() - self._last_cleanup > self.state_ttl / 24:
+                        await conn.execute(
+                            "DELETE FROM FSMStates WHERE updated_at < CURRENT_TIMESTAMP - make_interval(secs => $1)",
+                            float(self.state_ttl),
+                        )
+                        self._last_cleanup = time.monotonic()
+        except asyncpg.PostgresError as e:
+            print(f"Ошибка при сохранении состояний FSM: {e}")
+            self._dirty |= dirty
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._get_entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(self._key(key))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._get_entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        entry = await self._get_entry(key)
+        entry.data = dict(data)
+        self._mark_dirty(self._key(key))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return dict((await self._get_entry(key)).data)
+
+    async def close(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+
+def create_fsm_storage() -> BaseStorage:
+    if FSM_STORAGE == "postgres":
+        return PostgresStorage()
+    if FSM_STORAGE == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage.from_url(REDIS_URL, state_ttl=FSM_STATE_TTL, data_ttl=FSM_STATE_TTL)
+    if FSM_STORAGE == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Неизвестное FSM-хранилище: {FSM_STORAGE}")
@@ -0,0 +1,59 @@
+import os
+import logging
+
+import asyncpg
+
+from .db import get_pool
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+MIGRATIONS_LOCK_ID = 7310001
+
+
+def list_migrations(directory: str = MIGRATIONS_DIR) -> list:
+    """Файлы миграций вида NNNN_description.sql в порядке версий."""
+    return sorted(name for name in os.listdir(directory) if name.endswith(".sql"))
+
+
+async def apply_migrations(directory: str = MIGRATIONS_DIR) -> list:
+    """Применяет еще не примененные миграции и возвращает их имена.
+
+    Каждая миграция выполняется в своей транзакции, а весь прогон — под advisory
+    lock, чтобы несколько реплик бота не применяли миграции одновременно.
+    Ошибка любой миграции пробрасывается: бот не должен стартовать на схеме,
+    которую его запросы не ожидают.
+    """
+    pool = await get_pool()
+    if not pool:
+        raise RuntimeError("Нет подключения к базе данных, миграции не применены")
+
+    applied = []
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute("SELECT pg_advisory_lock($1)", MIGRATIONS_LOCK_ID)
+            try:
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS SchemaMigrations (
+                        version VARCHAR(255) PRIMARY KEY,
+                        applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                done = {row[0] for row in await conn.fetch("SELECT version FROM SchemaMigrations")}
+
+                for name in list_migrations(directory):
+                    if name in done:
+                        continue
+                    with open(os.path.join(directory, name), encoding="utf-8") as f:
+                        sql = f.read()
+                    async with conn.transaction():
+                        await conn.execute(sql)
+                        await conn.execute("INSERT INTO SchemaMigrations (version) VALUES ($1)", name)
+                    logger.info(f"Применена миграция {name}")
+                    applied.append(name)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATIONS_LOCK_ID)
+    except asyncpg.PostgresError as e:
+        print(f"Ошибка при применении миграций: {e}")
+        raise
+    return applied
@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional, Tuple
+
+# Строки БД как NamedTuple: поля перечислены в том же порядке, что и COLUMNS,
+# поэтому запись asyncpg раскладывается в модель без словаря — Model(*row).
+# Медкарта приходит одним JSON (PATIENT_SNAPSHOT_QUERY), ее части
+# раскладываются в модели через from_json: даты там в ISO-формате.
+
+
+class User(NamedTuple):
+    user_id: int
+    first_name: str
+    last_name: str
+    gender: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    birth_date: Optional[date]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "User":
+        birth_date = data["birth_date"]
+        return cls(
+            data["user_id"], data["first_name"], data["last_name"], data["gender"],
+            data["phone"], data["email"], date.fromisoformat(birth_date) if birth_date else None,
+        )
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def birth_date_str(self) -> Optional[str]:
+        return self.birth_date.strftime("%d.%m.%Y") if self.birth_date else None
+
+
+class Doctor(NamedTuple):
+    doctor_id: int
+    first_name: str
+    last_name: str
+    phone: Optional[str]
+    email: Optional[str]
+    description: Optional[str]
+    specialization: str
+    specialization_description: Optional[str]
+
+    COLUMNS = """
+        d.doctor_id, d.first_name, d.last_name, d.phone, d.email, d.description,
+        s.name AS specialization, s.description AS specialization_description
+    """
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+
+class Appointment(NamedTuple):
+    appointment_id: int
+    doctor_id: int
+    appointment_date: datetime
+    doctor_name: str
+    specialization: str
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Appointment":
+        return cls(
+            data["appointment_id"], data["doctor_id"], datetime.fromisoformat(data["appointment_date"]),
+            data["doctor_name"], data["specialization"],
+        )
+
+    @property
+    def date(self) -> str:
+        return self.appointment_date.strftime("%d.%m.%Y")
+
+    @property
+    def time(self) -> str:
+        return self.appointment_date.strftime("%H:%M")
+
+
+class Diagnosis(NamedTuple):
+    name: str
+    diagnosis_date: date
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Diagnosis":
+        return cls(data["name"], date.fromisoformat(data["diagnosis_date"]))
+
+    @property
+    def date(self) -> str:
+        return self.diagnosis_date.strftime("%d.%m.%Y")
+
+
+class PatientSnapshot(NamedTuple):
+    user: User
+    appointments: Tuple[Appointment, ...]
+    diagnoses: Tuple[Diagnosis, ...]
+
+    @classmethod
+    def from_json(cls, data: dict) -> "PatientSnapshot":
+        return cls(
+            User.from_json(data["user"]),
+            tuple(Appointment.from_json(item) for item in data["appointments"]),
+            tuple(Diagnosis.from_json(item) for item in data["diagnoses"]),
+        )
+
+    @property
+    def last_appointment(self) -> Optional[Appointment]:
+        return self.appointments[0] if self.appointments else None
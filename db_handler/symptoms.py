@@ -0,0 +1,161 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, FrozenSet, List, Tuple
+
+import asyncpg
+
+from cache import normalize_text
+from .db import get_pool
+
+logger = logging.getLogger(__name__)
+
+SYMPTOM_INDEX_REFRESH_INTERVAL = float(os.environ.get("SYMPTOM_INDEX_REFRESH_INTERVAL", 600))
+# индекс отвечает сам, если на лидера приходится не меньше этой доли баллов
+SYMPTOM_INDEX_CONFIDENCE = float(os.environ.get("SYMPTOM_INDEX_CONFIDENCE", 0.6))
+# и совпал хотя бы один симптом с приоритетом 1
+SYMPTOM_INDEX_MIN_SCORE = float(os.environ.get("SYMPTOM_INDEX_MIN_SCORE", 1.0))
+
+SYMPTOM_INDEX_QUERY = """
+    SELECT s.symptom_id, s.name AS symptom, sp.name AS specialization, ss.priority
+    FROM Symptom_Specialization ss
+    JOIN Symptoms s ON s.symptom_id = ss.symptom_id
+    JOIN Specializations sp ON sp.specialization_id = ss.specialization_id
+"""
+
+# Окончания от длинных к коротким; вместо полноценной лемматизации хватает
+# отсечения окончания: "болит", "боль", "болью" -> "бол"
+_ENDINGS = sorted((
+    "иями", "ями", "ами", "ного", "ному", "ными", "ных", "ная", "ное", "ной", "ный", "ные", "ную",
+    "ого", "его", "ому", "ему", "ыми", "ими", "ией", "ием", "ать", "ять", "ить", "еть",
+    "ая", "яя", "ое", "ее", "ые", "ие", "ый", "ий", "ой", "ей", "ом", "ем", "ам", "ям", "ах", "ях",
+    "ую", "юю", "ов", "ев", "ия", "ья", "ью", "ит", "ет", "ат", "ят", "ут", "ют",
+    "ы", "и", "а", "я", "о", "е", "у", "ю", "ь", "й",
+), key=len, reverse=True)
+_MIN_STEM = 3
+_STOP_WORDS = frozenset((
+    "у", "меня", "мне", "и", "в", "во", "на", "с", "со", "не", "по", "при", "что", "как", "уже",
+    "очень", "сильно", "когда", "после", "еще", "есть", "это", "все", "или", "а", "но",
+))
+
+
+def stem(word: str) -> str:
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def stems(text: str) -> FrozenSet[str]:
+    return frozenset(
+        stem(word) for word in normalize_text(text).split()
+        if word not in _STOP_WORDS and len(word) >= _MIN_STEM
+    )
+
+
+# Метки врачей, которые не сводятся к названию специализации по основам слов
+SPECIALTY_ALIASES = {
+    "лор": "отоларингология",
+    "окулист": "офтальмология",
+}
+
+
+def _specialty_stem(word: str) -> str:
+    # врач на "-евт" называется по специализации на "-ия": терапевт — терапия
+    if word.endswith("евт"):
+        word = word[:-3]
+    return stem(word)
+
+
+def specialty_key(name: str) -> str:
+    """Общий ключ метки врача и названия специализации: основы всех слов.
+
+    "Кардиолог" и "Кардиология" дают "кардиолог", "Терапевт" и "Терапия" —
+    "терап". Совпадать должны все слова, поэтому "Гинеколог" не сводится ни к
+    "Гинекология-онкология", ни к "Гинеколог-хирург".
+    """
+    text = normalize_text(name)
+    text = SPECIALTY_ALIASES.get(text, text)
+    return " ".join(_specialty_stem(word) for word in text.split())
+
+
+def same_specialty(label: str, specialization: str) -> bool:
+    """Метка классификатора ("Кардиолог") и название специализации ("Кардиология")."""
+    return specialty_key(label) == specialty_key(specialization)
+
+
+class SymptomIndex:
+    """Инвертированный индекс: основа слова -> симптомы -> специализации с весами.
+
+    Строится из Symptoms и Symptom_Specialization. Симптом считается найденным,
+    если в сообщении есть все основы его названия; вес связи — 1 / priority,
+    т.е. priority 1 — основная специализация для симптома.
+    """
+
+    def __init__(self, refresh_interval: float = SYMPTOM_INDEX_REFRESH_INTERVAL,
+                 confidence: float = SYMPTOM_INDEX_CONFIDENCE,
+                 min_score: float = SYMPTOM_INDEX_MIN_SCORE):
+        self.refresh_interval = refresh_interval
+        self.confidence = confidence
+        self.min_score = min_score
+        self.postings: Dict[str, List[int]] = {}
+        self.symptoms: Dict[int, Tuple[FrozenSet[str], Dict[str, float]]] = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+
+            pool = await get_pool()
+            if not pool:
+                return
+            try:
+                self.build(await pool.fetch(SYMPTOM_INDEX_QUERY))
+                logger.info(f"Индекс симптомов: {len(self.symptoms)} симптомов, {len(self.postings)} основ")
+            except asyncpg.PostgresError as e:
+                print(f"Ошибка при загрузке индекса симптомов: {e}")
+            self._loaded_at = time.monotonic()
+
+    def build(self, rows):
+        postings, symptoms = {}, {}
+        for row in rows:
+            symptom_id = row["symptom_id"]
+            if symptom_id not in symptoms:
+                keys = stems(row["symptom"])
+                if not keys:
+                    continue
+                symptoms[symptom_id] = (keys, {})
+                for key in keys:
+                    postings.setdefault(key, []).append(symptom_id)
+            weights = symptoms[symptom_id][1]
+            weights[row["specialization"]] = max(
+                weights.get(row["specialization"], 0.0), 1.0 / max(row["priority"], 1)
+            )
+        self.postings, self.symptoms = postings, symptoms
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Суммарный вес специализаций по всем найденным в тексте симптомам."""
+        keys = stems(text)
+        candidates = {symptom_id for key in keys for symptom_id in self.postings.get(key, ())}
+        scores = {}
+        for symptom_id in candidates:
+            symptom_keys, weights = self.symptoms[symptom_id]
+            if symptom_keys <= keys:
+                for specialization, weight in weights.items():
+                    scores[specialization] = scores.get(specialization, 0.0) + weight
+        return scores
+
+    def is_confident(self, scores: Dict[str, float]) -> bool:
+        if not scores:
+            return False
+        top = max(scores.values())
+        return top >= self.min_score and top / sum(scores.values()) >= self.confidence
+
+
+symptom_index = SymptomIndex()
@@ -1,8 +1,12 @@
-# from aiogram import types
-# from aiogram.dispatcher.filters import Filter
-#
-# class IsAdmin(Filter):
-#     async def check(self, message: types.Message) -> bool:
-#         # Здесь реализуйте проверку, является ли пользователь администратором
-#         # Например, можно проверять ID пользователя из списка админов
-#         return message.from_user.id in [123456789]  # Замените на реальные ID админов
\ No newline at end of file
+import os
+
+from aiogram import types
+from aiogram.filters import BaseFilter
+
+# Telegram id администраторов через запятую
+ADMIN_IDS = {int(admin_id) for admin_id in os.environ.get("ADMIN_IDS", "").replace(",", " ").split()}
+
+
+class IsAdmin(BaseFilter):
+    async def __call__(self, message: types.Message) -> bool:
+        return message.from_user is not None and message.from_user.id in ADMIN_IDS
@@ -1,3 +1,4 @@
 from .common import router
+from .admin import router as admin_router
 
-__all__ = ['router']
\ No newline at end of file
+__all__ = ['router', 'admin_router']
@@ -1,5 +1,64 @@
-from aiogram import types
-#from filters.is_admin import IsAdmin
+import io
+import asyncio
+import logging
+import zipfile
 
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile
+
+from filters.is_admin import IsAdmin
+from db_handler.certificates import get_bulk_certificate_data, issue_certificate
+
+router = Router()
+router.message.filter(IsAdmin())
+logger = logging.getLogger(__name__)
+
+
+@router.message(Command("admin"))
 async def admin_panel(message: types.Message):
-    await message.answer("Добро пожаловать в панель администратора!")
\ No newline at end of file
+    await message.answer(
+        "Добро пожаловать в панель администратора!\n\n"
+        "/certificates — справки пациентам с диагнозами за последние дни\n"
+        "/certificates 12 15 18 — справки пациентам с указанными user_id"
+    )
+
+
+@router.message(Command("certificates"))
+async def bulk_certificates(message: types.Message, command: CommandObject):
+    try:
+        user_ids = [int(user_id) for user_id in command.args.replace(",", " ").split()] if command.args else None
+    except ValueError:
+        await message.answer("Укажите user_id пациентов числами через пробел.")
+        return
+
+    patients = await get_bulk_certificate_data(user_ids)
+    if not patients:
+        await message.answer("Нет пациентов для выдачи справок.")
+        return
+
+    await message.answer(f"Формирую справки: {len(patients)}...")
+
+    async def issue(patient: dict):
+        return patient, await issue_certificate(patient)
+
+    # справки рендерятся параллельно в пуле процессов и пишутся в архив по мере готовности
+    buffer = io.BytesIO()
+    failed = 0
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for task in asyncio.as_completed([issue(patient) for patient in patients]):
+            try:
+                patient, pdf = await task
+            except Exception as e:
+                logger.error(f"Ошибка при формировании справки: {e}")
+                failed += 1
+                continue
+            archive.writestr(f"certificate_{patient['user_id']}.pdf", pdf)
+
+    caption = f"Справок: {len(patients) - failed}"
+    if failed:
+        caption += f", с ошибкой: {failed}"
+    await message.answer_document(
+        BufferedInputFile(buffer.getvalue(), filename="certificates.zip"),
+        caption=caption
+    )
@@ -2,60 +2,38 @@ from aiogram import Router, types
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardRemove, FSInputFile
-from keyboards.inline import get_main_menu, get_gender_keyboard, get_help_back_keyboard, get_medcard_keyboard,get_dates_keyboard,get_times_keyboard,get_doctors_keyboard
+from aiogram.types import BufferedInputFile
+from keyboards.inline import get_main_menu, get_gender_keyboard, get_help_back_keyboard, get_medcard_keyboard,get_dates_keyboard,get_times_keyboard,get_doctors_keyboard,get_booking_confirm_keyboard,get_intent_clarification_keyboard,NOOP_CALLBACK
 from db_handler.db import (
-    check_auth,
     register_user,
-    get_doctors,
-    generate_available_times,
-    generate_available_dates,
     create_appointment,
-    get_doctor_info,
-    get_doctors_by_specialization,
-    get_user_diagnoses,
-    get_doctor_data,
-    get_last_appointment,
-    get_user_data,
-    get_last_diagnosis,
-    get_user_appointments
+    hold_slot,
+    release_slot,
+    BookingResult,
+    get_patient_snapshot
 )
+from db_handler.availability import generate_available_dates, generate_available_times
+from db_handler.catalog import doctor_catalog, get_doctors, get_doctor_info, get_doctors_by_specialization
 from keyboards.reply import get_menu_reply_keyboard
-from utils import get_user_data, get_last_appointment, get_doctor_data
-from model import get_doctor, predict_intent, get_date
+from model import get_date
+from inference import recommend_specialization, predict_intent_async
+from intents import intent_router
+from db_handler.certificates import issue_certificate
 
-from docx import Document
-from docx2pdf import convert
 from datetime import datetime
-import os
+from typing import Optional
 import logging
 
 router = Router()
 
-OUTPUT_DIR = "output"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 logger = logging.getLogger(__name__)
-user_data = {}
-
-
-class CertificateData:
-    def __init__(self):
-        self.user_id = None
-        self.full_name = None
-        self.birth_date = None
-        self.diagnosis = None
-        self.start_date = None
-        self.end_date = None
-        self.doctor_id = None
-        self.doctor_name = None
-        self.clinic_name = "Разумед"
-        self.waiting_for = None
 
 
 class AppointmentStates(StatesGroup):
     waiting_for_doctor = State()
     waiting_for_date = State()
     waiting_for_time = State()
+    waiting_for_confirmation = State()
 
 
 class RegistrationStates(StatesGroup):
@@ -105,10 +83,8 @@ def is_current_year(date_str: str) -> bool:
 
 
 @router.message(Command("start"))
-async def cmd_start(message: types.Message, state: FSMContext):
-    user_id = str(message.from_user.id)
-
-    if check_auth(user_id):
+async def cmd_start(message: types.Message, state: FSMContext, user_id: Optional[int] = None):
+    if user_id is not None:
         await message.answer(
             "С возвращением! Главное меню:",
             reply_markup=get_menu_reply_keyboard()
@@ -159,12 +135,12 @@ async def process_birth_date(message: types.Message, state: FSMContext):
 
 
 @router.message(RegistrationStates.waiting_for_phone)
-async def process_phone(message: types.Message, state: FSMContext):
+async def process_phone(message: types.Message, state: FSMContext, tg_id: str):
     user_data = await state.get_data()
     user = message.from_user
 
-    success = register_user(
-        tg_id=str(user.id),
+    success = await register_user(
+        tg_id=tg_id,
         username=user.username,
         first_name=user_data['first_name'],
         last_name=user_data['last_name'],
@@ -204,126 +180,150 @@ async def handle_menu_button(message: types.Message, state: FSMContext):
 
 
 @router.message(MenuState.waiting_for_input)
-async def main_menu_text_handler(message: types.Message, state: FSMContext):
-    intent = predict_intent(message.text)
+async def main_menu_text_handler(message: types.Message, state: FSMContext, tg_id: str):
+    prediction = await predict_intent_async(message.text)
+    decision = intent_router.decide(prediction)
 
-    if intent == "рекомендация":
-        await ask_for_symptoms(message, state)
+    if decision == "routed":
+        await intent_router.dispatch(prediction.intent, message, state=state, tg_id=tg_id)
 
-    elif intent == "запись":
-        await handler_appointment(message, state)
+    elif decision == "clarify":
+        await state.update_data(predicted_intent=prediction.intent)
+        await message.answer(
+            "Уточните, пожалуйста, что вы хотите сделать:",
+            reply_markup=get_intent_clarification_keyboard(intent_router.options(prediction))
+        )
 
-    elif intent == 'оставить_отзыв':
-        pass
-        # await функция для оставления отзыва
+    else:
+        await message.answer(
+            "❓ Извините, я пока не понял ваш запрос.\nЕсли вы не нашли нужную "
+            "функцию в меню или у вас возник вопрос — пожалуйста, напишите в поддержку: "
+            "@fliwoll. Мы обязательно поможем!"
+        )
 
-    elif intent == 'читать_отзыв':
-        pass
-        # await функция для чтения отзывов
 
-    elif intent == "справка":
-        tg_id = str(message.from_user.id)
-        data = user_data.get(tg_id)
-        if not data:
-            await start_certificate_process(message, state)
-            return
-        await ask_for_symptoms(message, state)
+@router.callback_query(lambda c: c.data.startswith("intent_"))
+async def process_intent_clarification(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    intent = callback.data[len("intent_"):]
+    if intent not in intent_router.routes:
+        await callback.answer()
+        return
 
-    elif intent == 'профиль':
-        await handle_medcard_profile(message, state)
+    data = await state.get_data()
+    intent_router.record_clarification(data.get('predicted_intent'), intent)
+    await callback.answer()
+    await intent_router.dispatch(intent, callback.message, state=state, tg_id=tg_id)
 
-    elif intent == 'приемы':
-        await handle_medcard_appointments(message, state)
 
-    elif intent == 'диагнозы':
-        await handle_medcard_diagnoses(message, state)
+@intent_router.register("график")
+async def show_schedule(message: types.Message):
+    await message.answer(
+        "🕒 *График работы:*\n\n"
+        "📅 *Понедельник – Пятница:* 07:30 – 20:00\n"
+        "📅 *Суббота:* 08:00 – 17:00\n"
+        "📅 *Воскресенье:* 08:00 – 15:00\n\n"
+        "🔹 *График в праздничные дни* — уточняйте заранее.\n"
+        "⛔ *Ночного приёма нет.*",
+        parse_mode="Markdown"
+    )
 
-    elif intent == 'график':
-        await message.answer(
-            "🕒 *График работы:*\n\n"
-            "📅 *Понедельник – Пятница:* 07:30 – 20:00\n"
-            "📅 *Суббота:* 08:00 – 17:00\n"
-            "📅 *Воскресенье:* 08:00 – 15:00\n\n"
-            "🔹 *График в праздничные дни* — уточняйте заранее.\n"
-            "⛔ *Ночного приёма нет.*",
-            parse_mode="Markdown"
-        )
 
-    elif intent == 'адреса':
-        await message.answer(
-            "🏥 *Наши филиалы:*\n\n"
-            "📍 ул. Ю. Фучика, 53а\n"
-            "📍 ул. Ак. Глушко, д. 15а\n"
-            "📍 ул. Беломорская, д. 6",
-            parse_mode="Markdown"
-        )
+@intent_router.register("адреса")
+async def show_addresses(message: types.Message):
+    await message.answer(
+        "🏥 *Наши филиалы:*\n\n"
+        "📍 ул. Ю. Фучика, 53а\n"
+        "📍 ул. Ак. Глушко, д. 15а\n"
+        "📍 ул. Беломорская, д. 6",
+        parse_mode="Markdown"
+    )
 
-    elif intent == 'специальности':
-        await message.answer(
-            "🏥 Наши специальности:\n\n"
-            "• Гастроэнтерология\n"
-            "• Гематология\n"
-            "• Гинекология\n"
-            "• Дерматовенерология\n"
-            "• Кардиология\n"
-            "• Маммология\n"
-            "• Неврология\n"
-            "• Нутрициология\n"
-            "• Отоларингология\n"
-            "• Офтальмология\n"
-            "• Проктология\n"
-            "• Психотерапия\n"
-            "• Сосудистая хирургия\n"
-            "• Урология\n"
-            "• Хирургия\n"
-            "• Эндокринология",
-            parse_mode="Markdown"
-        )
 
-    elif intent == 'поддержка':
-        await message.answer(
-            "Если у вас возникли технические вопросы или нужна помощь, с удовольствием вам ответит наш специалист "
-            "— @fliwoll. Пожалуйста, обращайтесь!",
-            parse_mode="Markdown"
-        )
+@intent_router.register("специальности")
+async def show_specializations(message: types.Message):
+    await message.answer(
+        "🏥 Наши специальности:\n\n"
+        "• Гастроэнтерология\n"
+        "• Гематология\n"
+        "• Гинекология\n"
+        "• Дерматовенерология\n"
+        "• Кардиология\n"
+        "• Маммология\n"
+        "• Неврология\n"
+        "• Нутрициология\n"
+        "• Отоларингология\n"
+        "• Офтальмология\n"
+        "• Проктология\n"
+        "• Психотерапия\n"
+        "• Сосудистая хирургия\n"
+        "• Урология\n"
+        "• Хирургия\n"
+        "• Эндокринология",
+        parse_mode="Markdown"
+    )
 
-    elif intent == 'функционал':
-        await handler_help(message, state)
 
-    else:
-        await message.answer(
-            "❓ Извините, я пока не понял ваш запрос.\nЕсли вы не нашли нужную "
-            "функцию в меню или у вас возник вопрос — пожалуйста, напишите в поддержку: "
-            "@fliwoll. Мы обязательно поможем!"
-        )
+@intent_router.register("поддержка")
+async def show_support(message: types.Message):
+    await message.answer(
+        "Если у вас возникли технические вопросы или нужна помощь, с удовольствием вам ответит наш специалист "
+        "— @fliwoll. Пожалуйста, обращайтесь!",
+        parse_mode="Markdown"
+    )
 
 
 # БЛОК ЗАПИСЬ НА ПРИЕМ
 @router.callback_query(lambda c: c.data == "appointment")
-async def start_appointment(callback: types.CallbackQuery, state: FSMContext):
-    await handler_appointment(callback.message, state)
+async def start_appointment(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    await callback.answer()
+    await handler_appointment(callback.message, state, tg_id)
 
 
-async def handler_appointment(message: types.Message, state: FSMContext):
+@intent_router.register("запись")
+async def handler_appointment(message: types.Message, state: FSMContext, tg_id: str):
+    # "🔙 Назад" с шага подтверждения: слот больше не держим
+    if await state.get_state() == AppointmentStates.waiting_for_confirmation.state:
+        data = await state.get_data()
+        slot = datetime.strptime(f"{data['date']} {data['time']}", "%Y-%m-%d %H:%M")
+        await release_slot(data['doctor_id'], slot, tg_id)
     await state.clear()
-    doctors = get_doctors()
+    doctors = await get_doctors()
     if not doctors:
         await message.answer("В данный момент нет доступных врачей для записи.")
         return
 
     await message.answer(
         "Выберите врача:",
-        reply_markup=get_doctors_keyboard(doctors)
+        reply_markup=get_doctors_keyboard(
+            doctors, generation=doctor_catalog.generation, page_callback="doctors_page"
+        )
     )
     await state.set_state(AppointmentStates.waiting_for_doctor)
 
 
+@router.callback_query(AppointmentStates.waiting_for_doctor, lambda c: c.data.startswith("doctors_page_"))
+async def process_doctors_page(callback: types.CallbackQuery, state: FSMContext):
+    await callback.answer()
+    page = int(callback.data.rsplit("_", 1)[1])
+    doctors = await get_doctors()
+    await callback.message.edit_reply_markup(
+        reply_markup=get_doctors_keyboard(
+            doctors, page=page, generation=doctor_catalog.generation, page_callback="doctors_page"
+        )
+    )
+
+
+@router.callback_query(lambda c: c.data == NOOP_CALLBACK)
+async def process_noop(callback: types.CallbackQuery):
+    await callback.answer()
+
+
 @router.callback_query(AppointmentStates.waiting_for_doctor, lambda c: c.data.startswith("doctor_"))
 async def process_doctor_selection(callback: types.CallbackQuery, state: FSMContext):
     doctor_id = int(callback.data.split("_")[1])
     await state.update_data(doctor_id=doctor_id)
 
-    available_dates = generate_available_dates(doctor_id)
+    available_dates = await generate_available_dates(doctor_id)
     if not available_dates:
         await callback.message.answer("Нет доступных дат для записи к этому врачу.")
         await state.clear()
@@ -349,7 +349,7 @@ async def process_date_selection(callback: types.CallbackQuery, state: FSMContex
         await state.clear()
         return
 
-    available_times = generate_available_times(doctor_id, selected_date)
+    available_times = await generate_available_times(doctor_id, selected_date)
     if not available_times:
         await callback.message.answer("Нет доступного времени для записи на выбранную дату.")
         await state.clear()
@@ -369,15 +369,42 @@ async def process_time_selection(callback: types.CallbackQuery, state: FSMContex
     time_str = callback.data.split("_")[1]
     data = await state.get_data()
 
+    try:
+        slot = datetime.strptime(f"{data['date']} {time_str}", "%Y-%m-%d %H:%M")
+    except (KeyError, ValueError):
+        await callback.message.answer("❌ Произошла ошибка. Попробуйте еще раз.")
+        await state.clear()
+        await callback.answer()
+        return
+
+    if not await hold_slot(data['doctor_id'], slot, callback.from_user.id):
+        await callback.message.answer("⏳ Это время сейчас бронирует другой пациент. Выберите другое время.")
+        await callback.answer()
+        return
+
+    await state.update_data(time=time_str)
+    await callback.message.answer(
+        f"Подтвердите запись на {data['date'].replace('-', '.')} в {time_str}:",
+        reply_markup=get_booking_confirm_keyboard()
+    )
+    await state.set_state(AppointmentStates.waiting_for_confirmation)
+    await callback.answer()
+
+
+@router.callback_query(AppointmentStates.waiting_for_confirmation, lambda c: c.data == "confirm_booking")
+async def process_booking_confirmation(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    data = await state.get_data()
+
     try:
         doctor_id = data['doctor_id']
         date_str = data['date']
-        tg_id = callback.from_user.id
+        time_str = data['time']
 
-        if create_appointment(tg_id, doctor_id, date_str, time_str):
-            doctor_info = get_doctor_info(doctor_id)
+        result = await create_appointment(tg_id, doctor_id, date_str, time_str)
+        if result == BookingResult.BOOKED:
+            doctor_info = await get_doctor_info(doctor_id)
             if doctor_info:
-                doctor_name = f"{doctor_info['first_name']} {doctor_info['last_name']} ({doctor_info['specialization']})"
+                doctor_name = f"{doctor_info.full_name} ({doctor_info.specialization})"
             else:
                 doctor_name = "врачу"
 
@@ -390,11 +417,15 @@ async def process_time_selection(callback: types.CallbackQuery, state: FSMContex
             )
 
             await callback.message.answer(confirmation_message)
+        elif result == BookingResult.SLOT_TAKEN:
+            await callback.message.answer("❌ К сожалению, это время уже занято. Выберите другое время.")
+        elif result == BookingResult.HOLD_EXPIRED:
+            await callback.message.answer("⏳ Время на подтверждение истекло, и это время сейчас бронирует другой пациент. Выберите другое время.")
         else:
             await callback.message.answer("❌ Произошла ошибка при создании записи. Попробуйте позже.")
 
     except Exception as e:
-        print(f"Error processing time selection: {e}")
+        print(f"Error processing booking confirmation: {e}")
         await callback.message.answer("❌ Произошла ошибка. Попробуйте еще раз.")
     finally:
         await state.clear()
@@ -407,6 +438,7 @@ async def start_recommendation(callback: types.CallbackQuery, state: FSMContext)
     await ask_for_symptoms(callback.message, state)
 
 
+@intent_router.register("рекомендация")
 async def ask_for_symptoms(message: types.Message, state: FSMContext):
     await state.clear()
     await message.answer("Пожалуйста, опишите ваши симптомы:")
@@ -420,10 +452,10 @@ async def process_symptoms(message: types.Message, state: FSMContext):
         await message.answer("Ошибка: описание симптомов отсутствует или неверного формата.")
         return
 
-    doctor_specialization = get_doctor(symptoms)
+    doctor_specialization = await recommend_specialization(symptoms)
     await state.update_data(predicted_doctor=doctor_specialization)
 
-    doctors = get_doctors_by_specialization(doctor_specialization)
+    doctors = await get_doctors_by_specialization(doctor_specialization)
 
     if doctors:
         text = (
@@ -432,20 +464,9 @@ async def process_symptoms(message: types.Message, state: FSMContext):
             "Вы можете записаться к одному из доступных специалистов:"
         )
 
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[])
-
-        for doctor in doctors:
-            doctor_id, first_name, last_name, spec = doctor
-            keyboard.inline_keyboard.append([
-                InlineKeyboardButton(
-                    text=f"{first_name} {last_name} ({spec})",
-                    callback_data=f"rec_doctor_{doctor_id}"
-                )
-            ])
-
-        keyboard.inline_keyboard.append([
-            InlineKeyboardButton(text="🔙 Назад", callback_data="main_menu")
-        ])
+        keyboard = get_doctors_keyboard(
+            doctors, generation=doctor_catalog.generation, callback_prefix="rec_doctor_"
+        )
 
         await message.answer(
             text,
@@ -468,7 +489,7 @@ async def process_recommended_doctor(callback: types.CallbackQuery, state: FSMCo
     doctor_id = int(callback.data.split("_")[2])
     await state.update_data(doctor_id=doctor_id)
 
-    available_dates = generate_available_dates(doctor_id)
+    available_dates = await generate_available_dates(doctor_id)
     if not available_dates:
         await callback.message.answer("Нет доступных дат для записи к этому врачу.")
         await state.clear()
@@ -493,87 +514,87 @@ async def process_help_callback(callback: types.CallbackQuery, state: FSMContext
 
 
 @router.callback_query(lambda c: c.data == "medcard_profile")
-async def start_medcard_profile(callback: types.CallbackQuery, state: FSMContext):
-    await handle_medcard_profile(callback, state)
+async def start_medcard_profile(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    await callback.answer()
+    await handle_medcard_profile(callback.message, state, tg_id)
 
 
-async def handle_medcard_profile(callback: types.CallbackQuery, state: FSMContext):
+@intent_router.register("профиль")
+async def handle_medcard_profile(message: types.Message, state: FSMContext, tg_id: str):
     await state.clear()
-    tg_id = str(callback.from_user.id)
 
-    user = get_user_data(tg_id)
-    if not user:
-        await callback.message.answer("Профиль не найден.")
+    snapshot = await get_patient_snapshot(tg_id)
+    if not snapshot:
+        await message.answer("Профиль не найден.")
         return
 
+    user = snapshot.user
     text = (
         f"👤 Профиль:\n\n"
-        f"Имя: {user['first_name']}\n"
-        f"Фамилия: {user['last_name']}\n"
-        f"Пол: {user['gender']}\n"
-        f"Телефон: {user['phone']}\n"
-        f"Дата рождения: {user.get('birth_date', 'не указана')}"
+        f"Имя: {user.first_name}\n"
+        f"Фамилия: {user.last_name}\n"
+        f"Пол: {user.gender}\n"
+        f"Телефон: {user.phone}\n"
+        f"Дата рождения: {user.birth_date_str or 'не указана'}"
     )
-    await callback.message.answer(text)
+    await message.answer(text)
 
 
 @router.callback_query(lambda c: c.data == "medcard_appointments")
-async def start_medcard_appointments(callback: types.CallbackQuery, state: FSMContext):
-    await handle_medcard_appointments(callback, state)
+async def start_medcard_appointments(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    await callback.answer()
+    await handle_medcard_appointments(callback.message, state, tg_id)
 
 
-async def handle_medcard_appointments(callback: types.CallbackQuery, state: FSMContext):
+@intent_router.register("приемы")
+async def handle_medcard_appointments(message: types.Message, state: FSMContext, tg_id: str):
     await state.clear()
-    tg_id = str(callback.from_user.id)
-    user = get_user_data(tg_id)
-    if not user:
-        await callback.answer("Профиль не найден.")
+    snapshot = await get_patient_snapshot(tg_id)
+    if not snapshot:
+        await message.answer("Профиль не найден.")
         return
 
-    appointments = get_user_appointments(user['user_id'])
+    appointments = snapshot.appointments
     if not appointments:
-        await callback.answer()
-        await callback.message.answer("У вас нет запланированных приемов.")
+        await message.answer("У вас нет запланированных приемов.")
         return
 
     text = "📅 Ваши последние приемы:\n\n"
     for appt in appointments:
         text += (
-            f"Дата: {appt['date']}\n"
-            f"Время: {appt['time']}\n"
-            f"Врач: {appt['doctor_name']}\n"
-            f"Специальность: {appt['specialization']}\n\n"
+            f"Дата: {appt.date}\n"
+            f"Время: {appt.time}\n"
+            f"Врач: {appt.doctor_name}\n"
+            f"Специальность: {appt.specialization}\n\n"
         )
 
-    await callback.answer()
-    await callback.message.answer(text)
+    await message.answer(text)
 
 
 @router.callback_query(lambda c: c.data == "medcard_diagnoses")
-async def start_medcard_diagnoses(callback: types.CallbackQuery, state: FSMContext):
-    await handle_medcard_diagnoses(callback, state)
+async def start_medcard_diagnoses(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
+    await callback.answer()
+    await handle_medcard_diagnoses(callback.message, state, tg_id)
 
 
-async def handle_medcard_diagnoses(callback: types.CallbackQuery, state: FSMContext):
+@intent_router.register("диагнозы")
+async def handle_medcard_diagnoses(message: types.Message, state: FSMContext, tg_id: str):
     await state.clear()
-    tg_id = str(callback.from_user.id)
-    user = get_user_data(tg_id)
-    if not user:
-        await callback.answer("Профиль не найден.")
+    snapshot = await get_patient_snapshot(tg_id)
+    if not snapshot:
+        await message.answer("Профиль не найден.")
         return
 
-    diagnoses = get_user_diagnoses(user['user_id'])
+    diagnoses = snapshot.diagnoses
     if not diagnoses:
-        await callback.answer()
-        await callback.message.answer("Диагнозов не найдено.")
+        await message.answer("Диагнозов не найдено.")
         return
 
     text = "💊 Ваши диагнозы:\n\n"
     for diagnosis in diagnoses:
-        text += f"{diagnosis['name']} - {diagnosis['date']}\n"
+        text += f"{diagnosis.name} - {diagnosis.date}\n"
 
-    await callback.answer()
-    await callback.message.answer(text)
+    await message.answer(text)
 
 
 
@@ -581,42 +602,42 @@ async def handle_medcard_diagnoses(callback: types.CallbackQuery, state: FSMCont
 
 
 @router.callback_query(lambda c: c.data == "reference")
-async def start_certificate(callback: types.CallbackQuery, state: FSMContext):
-    await process_certificate_start(callback, state)
+async def start_certificate(callback: types.CallbackQuery, state: FSMContext, tg_id: str):
     await callback.answer()
+    await process_certificate_start(callback.message, state, tg_id)
 
 
-async def process_certificate_start(callback: types.CallbackQuery, state: FSMContext):
-    tg_id = str(callback.from_user.id)
-    user = get_user_data(tg_id)
+@intent_router.register("справка")
+async def process_certificate_start(message: types.Message, state: FSMContext, tg_id: str):
+    snapshot = await get_patient_snapshot(tg_id)
 
-    if not user:
-        await callback.message.answer("Вы не зарегистрированы в системе.")
+    if not snapshot:
+        await message.answer("Вы не зарегистрированы в системе.")
         return
 
-    #last_diagnosis = get_last_diagnosis(user['user_id'])
+    user = snapshot.user
+    #last_diagnosis = snapshot.diagnoses[0] if snapshot.diagnoses else None
     last_diagnosis = {'name':'ОРВИ', 'date': '07.06.2025'}
     if not last_diagnosis:
-        await callback.message.answer("У вас нет сохраненных диагнозов.")
+        await message.answer("У вас нет сохраненных диагнозов.")
         return
 
     await state.update_data(
-        user_id=user['user_id'],
-        full_name=f"{user['first_name']} {user['last_name']}",
-        birth_date=user.get('birth_date'),
+        user_id=user.user_id,
+        full_name=user.full_name,
+        birth_date=user.birth_date_str,
         diagnosis=last_diagnosis['name'],
         diagnosis_date=last_diagnosis['date']
     )
 
-    last_appointment = get_last_appointment(user['user_id'])
+    last_appointment = snapshot.last_appointment
     if last_appointment:
-        doctor = get_doctor_data(last_appointment['doctor_id'])
-        if doctor:
-            await state.update_data(
-                doctor_name=f"{doctor['first_name']} {doctor['last_name']}"
-            )
+        await state.update_data(
+            doctor_id=last_appointment.doctor_id,
+            doctor_name=last_appointment.doctor_name
+        )
 
-    await callback.answer(
+    await message.answer(
         f"Ваш последний диагноз: {last_diagnosis['name']} (от {last_diagnosis['date']})\n"
         "Введите дату начала болезни (ДД.ММ.ГГГГ):"
     )
@@ -625,10 +646,10 @@ async def process_certificate_start(callback: types.CallbackQuery, state: FSMCon
 
 @router.message(CertificateStates.waiting_for_start_date)
 async def process_start_date(message: types.Message, state: FSMContext):
-    date_str = message.text.strip()
+    date_str = await get_date(message.text)
 
-    if not is_valid_date(date_str):
-        await message.answer("Неверный формат даты. Введите дату в формате ДД.ММ.ГГГГ.")
+    if not date_str or not is_valid_date(date_str):
+        await message.answer("Не удалось распознать дату. Введите дату в формате ДД.ММ.ГГГГ.")
         return
 
     if not is_current_year(date_str):
@@ -643,10 +664,10 @@ async def process_start_date(message: types.Message, state: FSMContext):
 @router.message(CertificateStates.waiting_for_end_date)
 async def process_end_date(message: types.Message, state: FSMContext):
     data = await state.get_data()
-    end_date_str = message.text.strip()
+    end_date_str = await get_date(message.text)
 
-    if not is_valid_date(end_date_str):
-        await message.answer("Неверный формат даты. Введите дату в формате ДД.ММ.ГГГГ.")
+    if not end_date_str or not is_valid_date(end_date_str):
+        await message.answer("Не удалось распознать дату. Введите дату в формате ДД.ММ.ГГГГ.")
         return
 
     if not is_current_year(end_date_str):
@@ -663,76 +684,21 @@ async def process_end_date(message: types.Message, state: FSMContext):
 
 
 async def generate_certificate(message: types.Message, data: dict):
-    tg_id = str(message.from_user.id)
-    docx_path = os.path.join(OUTPUT_DIR, f"certificate_{tg_id}.docx")
-    pdf_path = os.path.join(OUTPUT_DIR, f"certificate_{tg_id}.pdf")
-
-    doc = Document()
-    doc.add_heading("Медицинская справка", level=1)
-    doc.add_paragraph(f"Выдана: {data['full_name']}")
-    doc.add_paragraph(f"Дата рождения: {data['birth_date']}")
-    doc.add_paragraph(f"Диагноз: {data['diagnosis']}")
-    doc.add_paragraph(f"Период болезни: с {data['start_date']} по {data['end_date']}")
-    doc.add_paragraph("Справка выдана для предоставления по месту требования.")
-    doc.add_paragraph(f"Врач: {data.get('doctor_name', 'Не указан')}")
-    doc.add_paragraph(f"Медицинское учреждение: Разумед")
-    doc.add_paragraph(f"Дата выдачи: {datetime.now().strftime('%d.%m.%Y')}")
-
-    doc.save(docx_path)
-    convert(docx_path, pdf_path)
+    try:
+        pdf = await issue_certificate(data)
+    except Exception as e:
+        logger.error(f"Ошибка при формировании справки: {e}")
+        await message.answer("Не удалось сформировать справку. Попробуйте позже.")
+        return
 
     await message.answer("Ваша справка готова!")
-    await message.answer_document(FSInputFile(pdf_path))
+    await message.answer_document(BufferedInputFile(pdf, filename="certificate.pdf"))
     await message.answer("🏠 Главное меню:", reply_markup=get_main_menu())
 
-    os.remove(docx_path)
-    os.remove(pdf_path)
-
 
 @router.message()
-async def handler_certificate(message: types.Message, state: FSMContext):
-    tg_id = str(message.from_user.id)
-    data = user_data.get(tg_id)
-    if not data:
-        await process_certificate_start(message, state)
-        return
-
-    text = message.text.strip()
-
-    if data.waiting_for == 'start_date':
-        text = get_date(text)
-        if not is_valid_date(text):
-            await message.answer("Неверный формат даты. Введите дату в формате ДД.ММ.ГГГГ.")
-            return
-        if not is_current_year(text):
-            await message.answer(f"Дата начала должна быть в {datetime.now().year} году.")
-            return
-        data.start_date = text
-        data.waiting_for = 'end_date'
-        await message.answer("Введите дату окончания болезни (ДД.ММ.ГГГГ):", reply_markup=ReplyKeyboardRemove())
-        return
-
-    if data.waiting_for == 'end_date':
-        text = get_date(text)
-        if not is_valid_date(text):
-            await message.answer("Неверный формат даты. Введите дату в формате ДД.ММ.ГГГГ.")
-            return
-        if not is_current_year(text):
-            await message.answer(f"Дата окончания должна быть в {datetime.now().year} году.")
-            return
-        if not is_date_before(data.start_date, text):
-            await message.answer("Дата окончания не может быть раньше даты начала.")
-            return
-        data.end_date = text
-        await generate_certificate(message, data, state)
-        user_data.pop(tg_id, None)
-        return
-
-    if text == "🔙 Назад":
-        await state.set_state(MenuState.waiting_for_input)
-        await message.answer("🏠 Главное меню:", reply_markup=get_main_menu())
-        user_data.pop(tg_id, None)
-        return
+async def handler_certificate(message: types.Message, state: FSMContext, tg_id: str):
+    await process_certificate_start(message, state, tg_id)
 
 
 # БЛОК ПОМОЩИ
@@ -741,6 +707,7 @@ async def start_help(callback: types.CallbackQuery, state: FSMContext):
     await handler_help(callback.message, state)
 
 
+@intent_router.register("функционал")
 async def handler_help(message: types.Message, state: FSMContext):
     await state.clear()
     await message.answer(
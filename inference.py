@@ -0,0 +1,235 @@
+# inference.py
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import model
+from cache import normalize_text, MISSING
+from intents import intent_engine, IntentPrediction
+from db_handler.symptoms import symptom_index, specialty_key
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 1))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", 32))
+SYMPTOM_BATCH_SIZE = int(os.environ.get("SYMPTOM_BATCH_SIZE", 8))
+SYMPTOM_BATCH_WAIT_MS = float(os.environ.get("SYMPTOM_BATCH_WAIT_MS", 5))
+INTENT_BATCH_SIZE = int(os.environ.get("INTENT_BATCH_SIZE", 16))
+INTENT_BATCH_WAIT_MS = float(os.environ.get("INTENT_BATCH_WAIT_MS", 2))
+# hybrid — индекс симптомов, а BERT только при неоднозначном ответе;
+# index и bert — только один источник, для сравнения режимов
+SYMPTOM_MATCH_MODE = os.environ.get("SYMPTOM_MATCH_MODE", "hybrid")
+# доля индекса в смешанной оценке
+SYMPTOM_INDEX_WEIGHT = float(os.environ.get("SYMPTOM_INDEX_WEIGHT", 0.5))
+
+
+class InferenceMetrics:
+    def __init__(self):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.calls = {}
+        self.total_latency = {}
+        self.max_latency = {}
+
+    def enter(self):
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def leave(self, name: str, latency: float):
+        self.queue_depth -= 1
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.total_latency[name] = self.total_latency.get(name, 0.0) + latency
+        self.max_latency[name] = max(self.max_latency.get(name, 0.0), latency)
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "calls": dict(self.calls),
+            "avg_latency": {
+                name: self.total_latency[name] / count for name, count in self.calls.items()
+            },
+            "max_latency": dict(self.max_latency),
+        }
+
+
+class InferenceService:
+    """Выполняет вызовы моделей в отдельном пуле потоков, не блокируя event loop.
+
+    Количество одновременно ожидающих вызовов ограничено queue_size: когда очередь
+    заполнена, новые вызовы ждут свободного места (backpressure).
+    """
+
+    def __init__(self, workers: int = INFERENCE_WORKERS, queue_size: int = INFERENCE_QUEUE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._slots = asyncio.Semaphore(queue_size)
+        self.metrics = InferenceMetrics()
+
+    async def run(self, name: str, func, *args):
+        async with self._slots:
+            started = time.perf_counter()
+            self.metrics.enter()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+            finally:
+                latency = time.perf_counter() - started
+                self.metrics.leave(name, latency)
+                logger.debug(
+                    f"{name}: {latency * 1000:.1f} ms, в очереди {self.metrics.queue_depth}"
+                )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MicroBatcher:
+    """Собирает одновременные запросы к модели в один батч.
+
+    Батч отправляется, когда набралось max_batch текстов или прошло max_wait
+    секунд с первого запроса; каждый вызывающий получает свой результат.
+    batch_func принимает список текстов и возвращает список результатов.
+    """
+
+    def __init__(self, service: InferenceService, name: str, batch_func,
+                 max_batch: int, max_wait: float):
+        self._service = service
+        self.name = name
+        self.batch_func = batch_func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.batch_sizes = {}
+
+    async def submit(self, text: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        texts = [text for text, _ in batch]
+        try:
+            results = await self._service.run(self.name, self.batch_func, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+inference_service = InferenceService()
+symptom_batcher = MicroBatcher(
+    inference_service, "get_doctor", model.get_doctor_scores_batch,
+    SYMPTOM_BATCH_SIZE, SYMPTOM_BATCH_WAIT_MS / 1000
+)
+intent_batcher = MicroBatcher(
+    inference_service, "predict_intent", model.predict_intents_batch,
+    INTENT_BATCH_SIZE, INTENT_BATCH_WAIT_MS / 1000
+)
+
+
+async def get_doctor_scores_async(symptoms: str) -> dict:
+    model.check_model_files()
+    # промах засчитает model.get_doctor_scores_batch
+    cached = model.symptom_cache.get(normalize_text(symptoms), count_miss=False)
+    if cached is not MISSING:
+        return cached
+    return await symptom_batcher.submit(symptoms)
+
+
+async def get_doctor_async(symptoms: str) -> str:
+    return model.best_doctor(await get_doctor_scores_async(symptoms))
+
+
+def _normalized(scores: dict) -> dict:
+    total = sum(scores.values())
+    return {key: value / total for key, value in scores.items()} if total else {}
+
+
+def combine_scores(index_scores: dict, bert_scores: dict, index_weight: float = SYMPTOM_INDEX_WEIGHT) -> dict:
+    """Смешивает доли индекса и вероятности BERT по специализациям.
+
+    Метки классификатора ("Кардиолог") сводятся к названиям специализаций из
+    индекса ("Кардиология"); метки без пары остаются как есть.
+    """
+    combined = {key: index_weight * value for key, value in _normalized(index_scores).items()}
+    names = {specialty_key(name): name for name in index_scores}
+    for label, probability in bert_scores.items():
+        key = names.get(specialty_key(label), label)
+        combined[key] = combined.get(key, 0.0) + (1 - index_weight) * probability
+    return combined
+
+
+# сколько рекомендаций дал каждый путь: только индекс, индекс + BERT, только BERT
+symptom_match_paths = {"index": 0, "hybrid": 0, "bert": 0}
+
+
+async def recommend_specialization(symptoms: str, mode: str = SYMPTOM_MATCH_MODE) -> str:
+    started = time.perf_counter()
+    index_scores = {}
+    if mode != "bert":
+        await symptom_index.ensure_loaded()
+        index_scores = symptom_index.score(symptoms)
+
+    if mode == "index" or (mode == "hybrid" and symptom_index.is_confident(index_scores)):
+        path = "index"
+        result = max(index_scores, key=index_scores.get) if index_scores else model.FALLBACK_DOCTOR
+    elif not index_scores:
+        path = "bert"
+        result = await get_doctor_async(symptoms)
+    else:
+        path = "hybrid"
+        result = model.best_doctor(combine_scores(index_scores, await get_doctor_scores_async(symptoms)))
+
+    symptom_match_paths[path] += 1
+    logger.debug(f"Специализация по симптомам [{path}]: {result}, {(time.perf_counter() - started) * 1000:.2f} ms")
+    return result
+
+
+async def predict_intent_async(message: str) -> IntentPrediction:
+    prediction = intent_engine.match(message)
+    if prediction is not None:
+        return prediction
+
+    intent_engine.record("model")
+    model.check_model_files()
+    cached = model.intent_cache.get(normalize_text(message), count_miss=False)
+    if cached is not MISSING:
+        return cached
+    return await intent_batcher.submit(message)
+
+
+async def warm_up_models():
+    try:
+        await inference_service.run("warm_up", model.warm_up)
+    except Exception as e:
+        logger.error(f"Ошибка при загрузке моделей: {e}")
@@ -0,0 +1,212 @@
+import os
+import logging
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class IntentPrediction(NamedTuple):
+    intent: str
+    confidence: float
+    # разница вероятностей первого и второго кандидата
+    margin: float
+    runner_up: Optional[str] = None
+    tier: str = "model"
+
+
+# Тексты, которые бот получает чаще всего: подписи кнопок и типовые фразы.
+# Для них модель намерений не нужна.
+INTENT_PHRASES = {
+    "📝 Записаться к врачу": "запись",
+    "записаться": "запись",
+    "записаться на прием": "запись",
+    "запись к врачу": "запись",
+    "💊 Рекомендация": "рекомендация",
+    "какой врач мне нужен": "рекомендация",
+    "📄 Справка": "справка",
+    "нужна справка": "справка",
+    "📋 Данные профиля": "профиль",
+    "мой профиль": "профиль",
+    "📅 Данные о приёмах": "приемы",
+    "мои приемы": "приемы",
+    "💊 Диагнозы": "диагнозы",
+    "мои диагнозы": "диагнозы",
+    "ℹ️ Помощь": "функционал",
+    "помощь": "функционал",
+    "что ты умеешь": "функционал",
+    "поддержка": "поддержка",
+}
+
+# Основы слов, которые в коротком сообщении однозначно указывают на намерение
+INTENT_KEYWORDS = {
+    "график": ("график", "расписани", "часы работы", "время работы", "во сколько открыва", "режим работы"),
+    "адреса": ("адрес", "филиал", "где наход", "как добрат", "как доехать"),
+    "специальности": ("специальност", "какие врачи", "какие специалисты", "направлени"),
+}
+
+# в длинных сообщениях ключевое слово может быть второстепенным — их решает модель
+INTENT_KEYWORD_MAX_WORDS = int(os.environ.get("INTENT_KEYWORD_MAX_WORDS", 5))
+
+# ниже этих порогов бот не угадывает сценарий, а просит уточнить
+INTENT_CONFIDENCE_THRESHOLD = float(os.environ.get("INTENT_CONFIDENCE_THRESHOLD", 0.5))
+INTENT_MARGIN_THRESHOLD = float(os.environ.get("INTENT_MARGIN_THRESHOLD", 0.15))
+
+
+class KeywordTrie:
+    """Префиксное дерево основ слов: ключ совпадает, если с него начинается слово."""
+
+    def __init__(self, keywords: Dict[str, Iterable[str]]):
+        self.root = {}
+        for intent, stems in keywords.items():
+            for stem in stems:
+                node = self.root
+                for char in normalize_text(stem):
+                    node = node.setdefault(char, {})
+                node[None] = intent
+
+    def find(self, text: str) -> set:
+        """Намерения всех ключей, которые встречаются в нормализованном тексте."""
+        found = set()
+        for start in range(len(text)):
+            if start and text[start - 1] != " ":
+                continue
+            node = self.root
+            for char in text[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                if None in node:
+                    found.add(node[None])
+        return found
+
+
+class IntentEngine:
+    """Быстрые уровни определения намерения до вызова модели.
+
+    1. точное совпадение с известной фразой или подписью кнопки;
+    2. совпадение после normalize_text;
+    3. ключевое слово в коротком сообщении, если оно указывает на одно намерение.
+
+    Если ни один уровень не сработал, match возвращает None и решает модель.
+    """
+
+    TIERS = ("exact", "normalized", "keyword", "model")
+
+    def __init__(self, phrases: Dict[str, str] = INTENT_PHRASES,
+                 keywords: Dict[str, Iterable[str]] = INTENT_KEYWORDS,
+                 keyword_max_words: int = INTENT_KEYWORD_MAX_WORDS):
+        self.exact = dict(phrases)
+        self.normalized = {normalize_text(phrase): intent for phrase, intent in phrases.items()}
+        self.trie = KeywordTrie(keywords)
+        self.keyword_max_words = keyword_max_words
+        self.hits = dict.fromkeys(self.TIERS, 0)
+        self._lock = threading.Lock()
+
+    def record(self, tier: str):
+        with self._lock:
+            self.hits[tier] += 1
+
+    def match_tier(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        intent = self.exact.get(text)
+        if intent is not None:
+            return intent, "exact"
+
+        key = normalize_text(text)
+        intent = self.normalized.get(key)
+        if intent is not None:
+            return intent, "normalized"
+
+        if key.count(" ") < self.keyword_max_words:
+            found = self.trie.find(key)
+            if len(found) == 1:
+                return found.pop(), "keyword"
+
+        return None, None
+
+    def match(self, text: str) -> Optional[IntentPrediction]:
+        intent, tier = self.match_tier(text)
+        if tier is None:
+            return None
+        self.record(tier)
+        return IntentPrediction(intent, 1.0, 1.0, tier=tier)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.hits)
+
+
+class IntentRouter:
+    """Таблица намерение -> корутина с проверкой уверенности модели.
+
+    Корутины регистрируются декоратором register и вызываются как хендлеры
+    aiogram: получают только те именованные аргументы, которые объявили.
+    Каждое решение логируется вместе с вероятностью и отрывом от второго
+    кандидата, по этим логам подбираются пороги.
+    """
+
+    DECISIONS = ("routed", "clarify", "unknown", "clarified_top", "clarified_other")
+
+    def __init__(self, threshold: float = INTENT_CONFIDENCE_THRESHOLD,
+                 min_margin: float = INTENT_MARGIN_THRESHOLD):
+        self.threshold = threshold
+        self.min_margin = min_margin
+        self.routes = {}
+        self.decisions = dict.fromkeys(self.DECISIONS, 0)
+        self._lock = threading.Lock()
+
+    def register(self, *intents: str):
+        from aiogram.dispatcher.event.handler import CallableObject
+
+        def decorator(func):
+            handler = CallableObject(func)
+            for intent in intents:
+                self.routes[intent] = handler
+            return func
+        return decorator
+
+    def _count(self, decision: str):
+        with self._lock:
+            self.decisions[decision] += 1
+
+    def decide(self, prediction: IntentPrediction) -> str:
+        if prediction.intent not in self.routes:
+            decision = "unknown"
+        elif prediction.confidence >= self.threshold and prediction.margin >= self.min_margin:
+            decision = "routed"
+        else:
+            decision = "clarify"
+        self._count(decision)
+        logger.info(
+            f"Намерение {prediction.intent} [{prediction.tier}]: p={prediction.confidence:.2f}, "
+            f"отрыв={prediction.margin:.2f}, второе={prediction.runner_up} -> {decision}"
+        )
+        return decision
+
+    def options(self, prediction: IntentPrediction) -> Tuple[str, ...]:
+        """Варианты для клавиатуры уточнения: первый и второй кандидаты модели."""
+        return tuple(
+            intent for intent in dict.fromkeys((prediction.intent, prediction.runner_up))
+            if intent in self.routes
+        )
+
+    def record_clarification(self, predicted: Optional[str], chosen: str):
+        # выбор второго кандидата — сценарий, который без уточнения запустился бы зря
+        self._count("clarified_top" if chosen == predicted else "clarified_other")
+        logger.info(f"Уточнение намерения: модель {predicted}, выбрано {chosen}")
+
+    async def dispatch(self, intent: str, event, **kwargs):
+        """Вызывает корутину намерения. Все, кроме самого сообщения, передается
+        по имени: лишние именованные аргументы отбрасываются, а позиционные — нет.
+        """
+        return await self.routes[intent].call(event, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.decisions)
+
+
+intent_engine = IntentEngine()
+intent_router = IntentRouter()
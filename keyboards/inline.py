@@ -1,6 +1,17 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from datetime import *
+from functools import lru_cache
 
+# Статические меню строятся один раз, а динамические кэшируются по своим
+# входным данным. Кэшированная клавиатура общая для всех пользователей:
+# aiogram ее не замораживает, поэтому менять ее после получения нельзя —
+# для другой разметки нужно строить новую.
+
+DOCTORS_PAGE_SIZE = 10
+# кнопки без действия (номер страницы): хендлер только отвечает на callback
+NOOP_CALLBACK = "noop"
+
+@lru_cache(maxsize=None)
 def get_main_menu() -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="📝 Записаться к врачу", callback_data="appointment")],
@@ -11,6 +22,7 @@ def get_main_menu() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@lru_cache(maxsize=None)
 def get_doctors_menu() -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="Терапевт", callback_data="doctor_therapist")],
@@ -20,6 +32,7 @@ def get_doctors_menu() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@lru_cache(maxsize=None)
 def get_gender_keyboard() -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="Мужской ♂️", callback_data="gender_male")],
@@ -29,6 +42,7 @@ def get_gender_keyboard() -> InlineKeyboardMarkup:
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+@lru_cache(maxsize=None)
 def get_help_back_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -36,6 +50,7 @@ def get_help_back_keyboard() -> InlineKeyboardMarkup:
         ]
     )
 
+@lru_cache(maxsize=None)
 def get_medcard_keyboard() -> InlineKeyboardMarkup:
     keyboard = [
         [InlineKeyboardButton(text="📋 Данные профиля", callback_data="medcard_profile")],
@@ -45,6 +60,7 @@ def get_medcard_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
+@lru_cache(maxsize=None)
 def get_recommendation_keyboard() -> InlineKeyboardMarkup:
     buttons = [
         [InlineKeyboardButton(text="✅ Да", callback_data="appointment")],
@@ -52,72 +68,138 @@ def get_recommendation_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
-def get_doctors_keyboard(doctors: list) -> InlineKeyboardMarkup:
+@lru_cache(maxsize=None)
+def get_booking_confirm_keyboard() -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text="✅ Подтвердить запись", callback_data="confirm_booking")],
+        [InlineKeyboardButton(text="🔙 Назад", callback_data="appointment")]
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+# Подписи сценариев на клавиатуре уточнения намерения
+INTENT_TITLES = {
+    "запись": "📝 Записаться к врачу",
+    "рекомендация": "💊 Рекомендация",
+    "справка": "📄 Справка",
+    "профиль": "📋 Данные профиля",
+    "приемы": "📅 Данные о приёмах",
+    "диагнозы": "💊 Диагнозы",
+    "график": "🕒 График работы",
+    "адреса": "📍 Адреса филиалов",
+    "специальности": "🏥 Специальности",
+    "поддержка": "💬 Поддержка",
+    "функционал": "ℹ️ Помощь",
+}
+
+@lru_cache(maxsize=None)
+def get_intent_clarification_keyboard(intents: tuple) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=INTENT_TITLES.get(intent, intent), callback_data=f"intent_{intent}")]
+        for intent in intents
+    ]
+    buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="main_menu")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+_doctors_keyboards = {}
+_doctors_keyboards_generation = None
+
+
+def get_doctors_keyboard(doctors: list, page: int = 0, generation=None, page_callback: str = None,
+                         callback_prefix: str = "doctor_") -> InlineKeyboardMarkup:
+    """Клавиатура врачей; с page_callback список разбивается на страницы по DOCTORS_PAGE_SIZE.
+
+    generation — номер версии состава врачей (doctor_catalog.generation); если он
+    передан, готовая клавиатура кэшируется до смены состава.
+    """
+    global _doctors_keyboards_generation
+    key = None
+    if generation is not None:
+        if generation != _doctors_keyboards_generation:
+            _doctors_keyboards.clear()
+            _doctors_keyboards_generation = generation
+        key = (callback_prefix, page_callback, page, tuple(doctor[0] for doctor in doctors))
+        markup = _doctors_keyboards.get(key)
+        if markup is not None:
+            return markup
+
+    if page_callback:
+        pages = max((len(doctors) + DOCTORS_PAGE_SIZE - 1) // DOCTORS_PAGE_SIZE, 1)
+        page = min(max(page, 0), pages - 1)
+        shown = doctors[page * DOCTORS_PAGE_SIZE:(page + 1) * DOCTORS_PAGE_SIZE]
+    else:
+        pages = 1
+        shown = doctors
+
     buttons = []
-    for doctor in doctors:
+    for doctor in shown:
         doctor_id, first_name, last_name, specialization = doctor
         buttons.append(
             [InlineKeyboardButton(
                 text=f"{first_name} {last_name} ({specialization})",
-                callback_data=f"doctor_{doctor_id}"
+                callback_data=f"{callback_prefix}{doctor_id}"
             )]
         )
+
+    if pages > 1:
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton(text="◀️", callback_data=f"{page_callback}_{page - 1}"))
+        navigation.append(InlineKeyboardButton(text=f"{page + 1}/{pages}", callback_data=NOOP_CALLBACK))
+        if page < pages - 1:
+            navigation.append(InlineKeyboardButton(text="▶️", callback_data=f"{page_callback}_{page + 1}"))
+        buttons.append(navigation)
+
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="main_menu")])
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
+    markup = InlineKeyboardMarkup(inline_keyboard=buttons)
+    if key is not None:
+        _doctors_keyboards[key] = markup
+    return markup
 
 
 def get_dates_keyboard(dates) -> InlineKeyboardMarkup:
-    buttons = []
-
     # Ensure dates is always a list (handle both str and list inputs)
     if isinstance(dates, str):
         dates = [dates]
 
+    date_strs = []
     for date in dates:
-        try:
-            # Handle if date is already a datetime object
-            if hasattr(date, 'strftime'):
-                date_str = date.strftime("%Y-%m-%d")
-            # Handle if date is a string in YYYY-MM-DD format
-            elif isinstance(date, str):
-                date_str = date
-            else:
-                continue  # Skip invalid entries
-
-            buttons.append([
-                InlineKeyboardButton(
-                    text=date_str.replace("-", "."),
-                    callback_data=f"date_{date_str}"
-                )
-            ])
-        except Exception as e:
-            print(f"Error processing date {date}: {e}")
-            continue
+        # Handle if date is already a datetime object
+        if hasattr(date, 'strftime'):
+            date_strs.append(date.strftime("%Y-%m-%d"))
+        # Handle if date is a string in YYYY-MM-DD format
+        elif isinstance(date, str):
+            date_strs.append(date)
 
+    return _build_dates_keyboard(tuple(date_strs))
+
+
+@lru_cache(maxsize=1024)
+def _build_dates_keyboard(date_strs: tuple) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=date_str.replace("-", "."), callback_data=f"date_{date_str}")]
+        for date_str in date_strs
+    ]
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="appointment")])
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
 def get_times_keyboard(times: list) -> InlineKeyboardMarkup:
-    buttons = []
+    time_strs = []
     for time_entry in times:
-        try:
-            if hasattr(time_entry, 'strftime'):
-                time_str = time_entry.strftime("%H:%M")
-            elif isinstance(time_entry, datetime):
-                time_str = time_entry.strftime("%H:%M")
-            elif isinstance(time_entry, str):
-                time_str = time_entry
-            else:
-                continue
-
-            buttons.append([InlineKeyboardButton(
-                text=time_str,
-                callback_data=f"time_{time_str}"
-            )])
-        except Exception as e:
-            print(f"Error formatting time entry {time_entry}: {e}")
-            continue
+        if hasattr(time_entry, 'strftime'):
+            time_strs.append(time_entry.strftime("%H:%M"))
+        elif isinstance(time_entry, str):
+            time_strs.append(time_entry)
+
+    return _build_times_keyboard(tuple(time_strs))
+
 
+@lru_cache(maxsize=1024)
+def _build_times_keyboard(time_strs: tuple) -> InlineKeyboardMarkup:
+    buttons = [
+        [InlineKeyboardButton(text=time_str, callback_data=f"time_{time_str}")]
+        for time_str in time_strs
+    ]
     buttons.append([InlineKeyboardButton(text="🔙 Назад", callback_data="appointment")])
-    return InlineKeyboardMarkup(inline_keyboard=buttons)
\ No newline at end of file
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
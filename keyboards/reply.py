@@ -1,5 +1,7 @@
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def get_start_reply_keyboard() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -9,6 +11,7 @@ def get_start_reply_keyboard() -> ReplyKeyboardMarkup:
         one_time_keyboard=True
     )
 
+@lru_cache(maxsize=None)
 def get_menu_reply_keyboard() -> ReplyKeyboardMarkup:
     return ReplyKeyboardMarkup(
         keyboard=[
@@ -19,6 +22,7 @@ def get_menu_reply_keyboard() -> ReplyKeyboardMarkup:
 
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
+@lru_cache(maxsize=None)
 def get_back_keyboard():
     return ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text="🔙 Назад")]],
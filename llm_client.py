@@ -0,0 +1,113 @@
+# llm_client.py
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+from date_parser import parse_date
+from cache import TTLCache, MISSING
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = os.environ.get("LLM_MODEL", "mistral")
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 10))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))
+LLM_FAILURE_THRESHOLD = int(os.environ.get("LLM_FAILURE_THRESHOLD", 3))
+LLM_RESET_TIMEOUT = float(os.environ.get("LLM_RESET_TIMEOUT", 60))
+
+DATE_PROMPT = "Извлеки из текста дату и преобразуй в формат 'DD.MM.YYYY':  \"{text}\". " \
+              "Сегодня {today}. В ответе должна быть только дата определенного формата"
+
+
+class CircuitBreaker:
+    """После failure_threshold ошибок подряд перестает пропускать запросы на reset_timeout секунд.
+
+    Затем пропускает один пробный запрос (полуоткрытое состояние), остальным
+    отказывает, пока проба не завершится: успех закрывает цепь, ошибка снова
+    открывает ее на reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_FAILURE_THRESHOLD, reset_timeout: float = LLM_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if self.probe_started is not None:
+            # проба еще идет; если ее отменили и она не отчиталась,
+            # через reset_timeout пропускаем следующую
+            if now - self.probe_started < self.reset_timeout:
+                return False
+        elif now - self.opened_at < self.reset_timeout:
+            return False
+        self.probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_started = None
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class LLMDateClient:
+    def __init__(self, host: Optional[str] = None, model: str = LLM_MODEL, timeout: float = LLM_TIMEOUT,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.host = host
+        self.model = model
+        self.timeout = timeout
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.cache = TTLCache(maxsize=1024, ttl=86400)
+
+    def _get_client(self):
+        # один AsyncClient на процесс, чтобы переиспользовать HTTP-соединения
+        if self._client is None:
+            import ollama
+
+            self._client = ollama.AsyncClient(host=self.host, timeout=self.timeout)
+        return self._client
+
+    async def extract_date(self, text: str) -> Optional[str]:
+        today = datetime.now().strftime("%d.%m.%Y")
+        key = f"{today}\n{text.strip()}"
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        if not self.breaker.allow():
+            return None
+
+        async with self._semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    self._get_client().chat(model=self.model, messages=[
+                        {'role': 'user', 'content': DATE_PROMPT.format(text=text, today=today)}
+                    ]),
+                    timeout=self.timeout,
+                )
+            except Exception as e:
+                self.breaker.record_failure()
+                logger.error(f"Ошибка при обращении к LLM: {e!r}")
+                return None
+
+        self.breaker.record_success()
+        date_str = parse_date(response['message']['content'].strip())
+        self.cache.set(key, date_str)
+        return date_str
+
+
+llm_date_client = LLMDateClient()
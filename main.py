@@ -1,25 +1,92 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import asyncio
 import logging
+import contextlib
+import functools
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from db_handler.db import create_pool, close_pool
+from db_handler.availability import availability_index
+from db_handler.catalog import doctor_catalog
+from db_handler.symptoms import symptom_index
+from db_handler.fsm_storage import create_fsm_storage
+from db_handler.migrations import apply_migrations
+from handlers.admin import router as admin_router
 from handlers.common import router
-from time_func import send_appointment_reminders
+from inference import inference_service, warm_up_models
+from certificate import certificate_renderer
+from middlewares import FirstUpdateTimerMiddleware, IdentityMiddleware
+from time_func import setup_reminder_scheduler
 import os
 
 
 TOKEN = os.environ.get("TOKEN")
+# polling или webhook, см. webhook.py
+BOT_MODE = os.environ.get("BOT_MODE", "polling")
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "1") == "1"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def main():
-    bot = Bot(token=TOKEN)
-    dp = Dispatcher(storage=MemoryStorage())
 
+def create_dispatcher() -> Dispatcher:
+    dp = Dispatcher(storage=create_fsm_storage())
+    dp.update.outer_middleware(FirstUpdateTimerMiddleware(STARTED_AT))
+    # внутренние middleware срабатывают только если нашелся хендлер
+    identity = IdentityMiddleware()
+    router.message.middleware(identity)
+    router.callback_query.middleware(identity)
+    # админский роутер раньше общего: в общем есть хендлер на любое сообщение
+    dp.include_router(admin_router)
     dp.include_router(router)
+    return dp
+
+
+async def cancel_task(task: asyncio.Task):
+    """Останавливает фоновую задачу при завершении бота и дожидается ее."""
+    if task.done():
+        return
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+async def start_services(bot: Bot, dp: Dispatcher, run_scheduler: bool = True):
+    await create_pool()
+    await apply_migrations()
+    await availability_index.ensure_loaded()
+    await doctor_catalog.start()
+    await symptom_index.ensure_loaded()
+    dp.shutdown.register(dp.storage.close)
+    dp.shutdown.register(doctor_catalog.stop)
+    dp.shutdown.register(close_pool)
+    if MODEL_WARMUP:
+        # задачу держим до shutdown: иначе ее может собрать сборщик мусора,
+        # а отменить ее нужно раньше, чем остановится пул инференса
+        warmup_task = asyncio.create_task(warm_up_models())
+        dp.shutdown.register(functools.partial(cancel_task, warmup_task))
+    dp.shutdown.register(inference_service.shutdown)
+    dp.shutdown.register(certificate_renderer.shutdown)
 
-    asyncio.create_task(send_appointment_reminders())
+    if run_scheduler:
+        scheduler = setup_reminder_scheduler(bot)
+        scheduler.start()
+        dp.shutdown.register(scheduler.shutdown)
 
+
+async def main():
+    bot = Bot(token=TOKEN)
+    dp = create_dispatcher()
+
+    await start_services(bot, dp)
+
+    logger.info(f"Бот запущен за {time.perf_counter() - STARTED_AT:.2f} с")
     await dp.start_polling(bot)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if BOT_MODE == "webhook":
+        from webhook import run_webhook
+
+        run_webhook()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,4 @@
+from .identity import IdentityMiddleware
+from .startup import FirstUpdateTimerMiddleware
+
+__all__ = ['FirstUpdateTimerMiddleware', 'IdentityMiddleware']
@@ -0,0 +1,27 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from db_handler.db import resolve_user_id, tg_id_key
+
+
+class IdentityMiddleware(BaseMiddleware):
+    """Один раз на апдейт определяет пациента и кладет в kwargs хендлера
+    tg_id (строка, как в Users.tg_id) и user_id (None — не зарегистрирован).
+
+    Сам поиск кэшируется в resolve_user_id, так что повторные апдейты
+    от того же пользователя не ходят в БД.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is not None:
+            data["tg_id"] = tg_id_key(user.id)
+            data["user_id"] = await resolve_user_id(user.id)
+        return await handler(event, data)
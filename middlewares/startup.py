@@ -0,0 +1,31 @@
+import time
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+logger = logging.getLogger(__name__)
+
+
+class FirstUpdateTimerMiddleware(BaseMiddleware):
+    """Логирует время от запуска процесса до первого обработанного апдейта."""
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.reported = False
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        try:
+            return await handler(event, data)
+        finally:
+            if not self.reported:
+                self.reported = True
+                logger.info(
+                    f"Первый апдейт обработан через {time.perf_counter() - self.started_at:.2f} с после запуска"
+                )
@@ -1,47 +1,223 @@
-from transformers import BertTokenizer, BertForSequenceClassification
-import torch
-import joblib
-import ollama
+import os
+import time
+import logging
+import threading
 
-def get_date(text):
-    prompt = f"Извлеки из текста дату и преобразуй в формат 'DD.MM.YY':  \"{text}\". В ответе должна быть только дата " \
-             f"определенного формата"
+from date_parser import parse_date
+from cache import TTLCache, normalize_text, MISSING
+from intents import IntentPrediction
 
-    response = ollama.chat(model='mistral', messages=[
-        {'role': 'user', 'content': prompt}
-    ])
+logger = logging.getLogger(__name__)
 
-    return response['message']['content']
+# torch, transformers, joblib и ollama импортируются лениво: загрузка моделей
+# не должна задерживать запуск бота
 
-intent_model = joblib.load("intent_model.joblib")
+DATE_LLM_FALLBACK = os.environ.get("DATE_LLM_FALLBACK", "1") == "1"
 
-def predict_intent(message):
-    return intent_model.predict([message])[0]
 
+async def get_date(text):
+    """Возвращает дату в формате ДД.ММ.ГГГГ или None, если ее не удалось распознать."""
+    date_str = parse_date(text)
+    if date_str or not DATE_LLM_FALLBACK:
+        return date_str
+
+    from llm_client import llm_date_client
+
+    return await llm_date_client.extract_date(text)
 
+
+intent_model_path = "intent_model.joblib"
 checkpoint_path = "./results/checkpoint-624"
-tokenizer = BertTokenizer.from_pretrained("DeepPavlov/rubert-base-cased")
-model = BertForSequenceClassification.from_pretrained(checkpoint_path)
-model.eval()
-
-with open('results/label_map.txt', 'r') as f:
-  label_map = {}
-  for i in range(16):
-    if i != 15:
-      label_map[i] = f.readline()[:-1]
-    else:
-      label_map[i] = f.readline()
+label_map_path = "results/label_map.txt"
+# torch, torch-int8 или onnx, см. classifier_backends.py
+classifier_backend = os.environ.get("CLASSIFIER_BACKEND", "torch")
+
+_load_lock = threading.Lock()
+_intent_model = None
+_backend = None
+_label_map = None
+
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 4096))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+MODEL_FILES_CHECK_INTERVAL = 30
+# LinearSVC дает не вероятности, а расстояния до гиперплоскостей (примерно от -1
+# до 1); softmax с этой температурой переводит их в уверенность. Подобрана на
+# benchmarks/data/intents.tsv под пороги INTENT_CONFIDENCE/MARGIN_THRESHOLD:
+# верные ответы модели почти все выше порогов, ошибки и бессмыслица — ниже.
+INTENT_SCORE_TEMPERATURE = float(os.environ.get("INTENT_SCORE_TEMPERATURE", 0.2))
+
+intent_cache = TTLCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+symptom_cache = TTLCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+
+_fingerprints = {}
+_fingerprints_checked_at = 0.0
+
+
+def _path_fingerprint(path: str):
+    try:
+        if os.path.isdir(path):
+            return max(
+                (entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in os.scandir(path) if entry.is_file()
+            )
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except (OSError, ValueError):
+        return None
+
+
+def check_model_files():
+    """Сбрасывает кэш и загруженную модель, если файл модели изменился на диске."""
+    global _fingerprints_checked_at, _intent_model, _backend
+
+    now = time.monotonic()
+    if now - _fingerprints_checked_at < MODEL_FILES_CHECK_INTERVAL:
+        return
+    _fingerprints_checked_at = now
+
+    for path, cache in ((intent_model_path, intent_cache), (checkpoint_path, symptom_cache)):
+        fingerprint = _path_fingerprint(path)
+        if path in _fingerprints and _fingerprints[path] != fingerprint:
+            logger.info(f"Файл модели {path} изменился, кэш предсказаний сброшен")
+            cache.clear()
+            with _load_lock:
+                if path == intent_model_path:
+                    _intent_model = None
+                else:
+                    _backend = None
+        _fingerprints[path] = fingerprint
+
+
+def get_intent_model():
+    global _intent_model
+    if _intent_model is None:
+        with _load_lock:
+            if _intent_model is None:
+                import joblib
+
+                _intent_model = joblib.load(intent_model_path)
+    return _intent_model
+
+
+def _intent_probabilities(intent_model, messages):
+    import numpy as np
+
+    if hasattr(intent_model, "predict_proba"):
+        return np.asarray(intent_model.predict_proba(messages))
+
+    scores = np.asarray(intent_model.decision_function(messages), dtype=float)
+    if scores.ndim == 1:
+        # у бинарного классификатора одно расстояние на текст
+        scores = np.column_stack((-scores, scores))
+    scores = scores / INTENT_SCORE_TEMPERATURE
+    scores -= scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _predict_intents(intent_model, messages):
+    classes = intent_model.classes_
+    predictions = []
+    for row in _intent_probabilities(intent_model, messages):
+        order = row.argsort()[::-1]
+        best = order[0]
+        second = order[1] if len(order) > 1 else None
+        predictions.append(IntentPrediction(
+            intent=str(classes[best]),
+            confidence=float(row[best]),
+            margin=float(row[best] - (row[second] if second is not None else 0.0)),
+            runner_up=str(classes[second]) if second is not None else None,
+        ))
+    return predictions
 
-def get_doctor(symptoms):
-    inputs = tokenizer(symptoms, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        probabilities = torch.nn.functional.softmax(logits, dim=1).squeeze()
-    max_prob, predicted_class_id = torch.max(probabilities, dim=0)
-    if max_prob.item() < 0.4:
-        final_prediction = "Терапевт"
-    else:
-        final_prediction = label_map[predicted_class_id.item()]
-    return final_prediction
 
+def predict_intents_batch(messages):
+    check_model_files()
+    keys = [normalize_text(message) for message in messages]
+    predictions = [intent_cache.get(key) for key in keys]
+    missing = [i for i, prediction in enumerate(predictions) if prediction is MISSING]
+    if not missing:
+        return predictions
+
+    predicted = _predict_intents(get_intent_model(), [messages[i] for i in missing])
+    for i, prediction in zip(missing, predicted):
+        predictions[i] = prediction
+        intent_cache.set(keys[i], prediction)
+    return predictions
+
+
+def predict_intent(message):
+    return predict_intents_batch([message])[0].intent
+
+
+def _read_label_map():
+    with open(label_map_path, 'r') as f:
+        label_map = {}
+        for i in range(16):
+            if i != 15:
+                label_map[i] = f.readline()[:-1]
+            else:
+                label_map[i] = f.readline()
+    return label_map
+
+
+def get_classifier():
+    global _backend, _label_map
+    if _backend is None:
+        with _load_lock:
+            if _backend is None:
+                from classifier_backends import load_backend
+
+                _label_map = _read_label_map()
+                _backend = load_backend(classifier_backend, checkpoint_path)
+                logger.info(f"Бэкенд классификатора: {classifier_backend}")
+    return _backend, _label_map
+
+
+def warm_up():
+    started = time.perf_counter()
+    get_intent_model()
+    logger.info(f"Модель намерений загружена за {time.perf_counter() - started:.2f} с")
+
+    started = time.perf_counter()
+    get_classifier()
+    logger.info(f"Классификатор симптомов загружен за {time.perf_counter() - started:.2f} с")
+
+
+FALLBACK_DOCTOR = "Терапевт"
+FALLBACK_THRESHOLD = 0.4
+# сколько лучших меток классификатора отдавать для смешивания с индексом симптомов
+SYMPTOM_TOP_K = 5
+
+
+def get_doctor_scores_batch(symptoms_list):
+    """Для каждого текста — словарь {метка врача: вероятность} по SYMPTOM_TOP_K лучшим меткам."""
+    check_model_files()
+    keys = [normalize_text(symptoms) for symptoms in symptoms_list]
+    scores = [symptom_cache.get(key) for key in keys]
+    missing = [i for i, item in enumerate(scores) if item is MISSING]
+    if not missing:
+        return scores
+
+    backend, label_map = get_classifier()
+    probabilities = backend.predict_proba([symptoms_list[i] for i in missing])
+    for i, row in zip(missing, probabilities):
+        top = row.argsort()[::-1][:SYMPTOM_TOP_K]
+        scores[i] = {label_map[int(class_id)]: float(row[class_id]) for class_id in top}
+        symptom_cache.set(keys[i], scores[i])
+    return scores
+
+
+def best_doctor(scores: dict) -> str:
+    if not scores:
+        return FALLBACK_DOCTOR
+    label = max(scores, key=scores.get)
+    return label if scores[label] >= FALLBACK_THRESHOLD else FALLBACK_DOCTOR
+
+
+def get_doctors_batch(symptoms_list):
+    return [best_doctor(scores) for scores in get_doctor_scores_batch(symptoms_list)]
+
+
+def get_doctor(symptoms):
+    return get_doctors_batch([symptoms])[0]
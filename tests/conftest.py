@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from benchmarks.common import temporary_schema
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    if TEST_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_DATABASE_URL не задан")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def database():
+    """Фабрика временной схемы: async with database() as pool: ..."""
+    return lambda **kwargs: temporary_schema(TEST_DATABASE_URL, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    from db_handler import db
+
+    yield
+    db._identities.clear()
+    db._patient_snapshots.clear()
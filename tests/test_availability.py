@@ -0,0 +1,40 @@
+import asyncio
+from datetime import datetime, timedelta, time as time_type
+from unittest import mock
+
+from benchmarks.availability import RowsPool
+from db_handler.availability import AvailabilityIndex
+
+
+def build_index(schedules, appointments):
+    index = AvailabilityIndex()
+    with mock.patch("db_handler.availability.get_pool", return_value=RowsPool(schedules, appointments)):
+        asyncio.run(index.rebuild())
+    return index
+
+
+def test_free_dates_follow_schedule():
+    today = datetime.now().date()
+    index = build_index([(1, today.weekday())], [])
+    assert index.free_dates(1, days_ahead=14) == [today, today + timedelta(days=7)]
+    assert index.free_dates(2) == []
+
+
+def test_booked_slots_are_excluded():
+    today = datetime.now().date()
+    slot = datetime.combine(today, time_type(12, 0))
+    index = build_index([(1, today.weekday())], [(1, slot)])
+    times = index.free_times(1, today)
+    assert time_type(12, 0) not in times
+    assert len(times) == len(index.day_slots[today.weekday()]) - 1
+
+    index.book(1, datetime.combine(today, time_type(13, 0)))
+    assert time_type(13, 0) not in index.free_times(1, today)
+
+
+def test_fully_booked_day_is_not_offered():
+    today = datetime.now().date()
+    index = build_index([(1, today.weekday())], [])
+    for slot in index.day_slots[today.weekday()]:
+        index.book(1, datetime.combine(today, slot))
+    assert today not in index.free_dates(1, days_ahead=1)
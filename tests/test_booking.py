@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from benchmarks.booking import FIRST_SLOT, active_per_slot, book_concurrently, seed
+from benchmarks.common import make_state, FakeMessage
+from db_handler import db
+from db_handler.db import BookingResult
+
+
+def booking_args(slot: datetime):
+    return slot.strftime("%Y-%m-%d"), slot.strftime("%H:%M")
+
+
+@pytest.mark.postgres
+def test_hundreds_of_parallel_bookers_get_one_slot(database):
+    async def scenario():
+        async with database(max_size=30) as pool:
+            doctor_id = await seed(pool, 300)
+            results, _ = await book_concurrently(doctor_id, 300, slots=1, concurrency=30)
+            return results, await active_per_slot(pool, doctor_id)
+
+    results, per_slot = asyncio.run(scenario())
+    assert results.count(BookingResult.BOOKED) == 1
+    assert per_slot == {FIRST_SLOT: 1}
+
+
+@pytest.mark.postgres
+def test_parallel_bookers_without_hold_race_on_unique_index(database):
+    async def scenario():
+        async with database(max_size=30) as pool:
+            doctor_id = await seed(pool, 300)
+            results, _ = await book_concurrently(doctor_id, 300, slots=1, concurrency=30, hold=False)
+            return results, await active_per_slot(pool, doctor_id)
+
+    results, per_slot = asyncio.run(scenario())
+    assert results.count(BookingResult.BOOKED) == 1
+    assert set(results) <= {BookingResult.BOOKED, BookingResult.SLOT_TAKEN, BookingResult.HOLD_EXPIRED}
+    assert per_slot == {FIRST_SLOT: 1}
+
+
+@pytest.mark.postgres
+def test_expired_hold_purged_by_rebuild_can_still_be_confirmed(database):
+    async def scenario():
+        async with database() as pool:
+            doctor_id = await seed(pool, 1)
+            assert await db.hold_slot(doctor_id, FIRST_SLOT, 1, seconds=-1)
+            await pool.execute("DELETE FROM SlotHolds WHERE expires_at < CURRENT_TIMESTAMP")
+            return await db.create_appointment(1, doctor_id, *booking_args(FIRST_SLOT))
+
+    assert asyncio.run(scenario()) == BookingResult.BOOKED
+
+
+@pytest.mark.postgres
+def test_expired_hold_taken_by_another_user_cannot_be_confirmed(database):
+    async def scenario():
+        async with database() as pool:
+            doctor_id = await seed(pool, 2)
+            assert await db.hold_slot(doctor_id, FIRST_SLOT, 1, seconds=-1)
+            assert await db.hold_slot(doctor_id, FIRST_SLOT, 2)
+            late = await db.create_appointment(1, doctor_id, *booking_args(FIRST_SLOT))
+            owner = await db.create_appointment(2, doctor_id, *booking_args(FIRST_SLOT))
+            return late, owner
+
+    assert asyncio.run(scenario()) == (BookingResult.HOLD_EXPIRED, BookingResult.BOOKED)
+
+
+@pytest.mark.postgres
+def test_back_from_confirmation_releases_hold(database):
+    from handlers.common import AppointmentStates, handler_appointment
+
+    async def scenario():
+        async with database() as pool:
+            doctor_id = await seed(pool, 2)
+            assert await db.hold_slot(doctor_id, FIRST_SLOT, 1)
+            state = make_state(user_id=1)
+            await state.update_data(doctor_id=doctor_id, date=FIRST_SLOT.strftime("%Y-%m-%d"),
+                                    time=FIRST_SLOT.strftime("%H:%M"))
+            await state.set_state(AppointmentStates.waiting_for_confirmation)
+
+            await handler_appointment(FakeMessage(user_id=1), state, tg_id="1")
+            return await db.hold_slot(doctor_id, FIRST_SLOT, 2)
+
+    assert asyncio.run(scenario())
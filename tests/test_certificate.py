@@ -0,0 +1,41 @@
+import pytest
+
+import certificate
+
+FIELDS = certificate.certificate_fields({
+    "full_name": "Анна Иванова",
+    "birth_date": "01.02.1990",
+    "diagnosis": "ОРВИ",
+    "start_date": "01.06.2025",
+    "end_date": "07.06.2025",
+    "issue_date": "08.06.2025",
+})
+
+
+@pytest.mark.parametrize("full_name", [
+    "Олесь Ґудзь",          # украинская кириллица
+    "Әлия Нұрғалиева",      # казахская кириллица
+    "Łukasz Żółć-Dvořák",   # Latin Extended-A
+    "Ёжиков Пётр — «№ 5»",
+])
+def test_names_render_with_subset_font(full_name):
+    assert not certificate.missing_glyphs([full_name])
+    pdf = certificate.render_certificate({**FIELDS, "full_name": full_name})
+    assert pdf.startswith(b"%PDF")
+
+
+def test_subset_font_has_every_listed_glyph():
+    from fontTools.ttLib import TTFont
+
+    cmap = TTFont(certificate.compile_font()).getBestCmap()
+    assert set(certificate.FONT_UNICODES) <= set(cmap)
+
+
+def test_missing_glyph_fails_instead_of_blank_box():
+    with pytest.raises(ValueError, match="😀"):
+        certificate.render_certificate({**FIELDS, "full_name": "Анна 😀"})
+
+
+def test_content_hash_depends_on_fields():
+    assert certificate.content_hash(FIELDS) == certificate.content_hash(dict(FIELDS))
+    assert certificate.content_hash(FIELDS) != certificate.content_hash({**FIELDS, "diagnosis": "Грипп"})
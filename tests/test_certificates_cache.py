@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from db_handler import certificates
+
+DATA = {
+    "full_name": "Анна Иванова",
+    "birth_date": "01.02.1990",
+    "diagnosis": "ОРВИ",
+    "start_date": "01.06.2025",
+    "end_date": "07.06.2025",
+    "issue_date": "08.06.2025",
+}
+
+
+class CountingRenderer:
+    def __init__(self):
+        self.calls = 0
+
+    async def render(self, fields):
+        self.calls += 1
+        return f"PDF {self.calls}".encode()
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = CountingRenderer()
+    monkeypatch.setattr(certificates, "certificate_renderer", renderer)
+    return renderer
+
+
+def test_without_patient_certificate_is_only_rendered(renderer, monkeypatch):
+    async def fail(*args, **kwargs):
+        raise AssertionError("справка без пациента не должна попадать в кэш")
+
+    monkeypatch.setattr(certificates, "get_certificate_pdf", fail)
+    monkeypatch.setattr(certificates, "save_certificate", fail)
+    assert asyncio.run(certificates.issue_certificate(DATA)) == b"PDF 1"
+
+
+@pytest.mark.postgres
+def test_same_fields_for_two_patients_are_stored_separately(database, renderer):
+    async def scenario():
+        async with database() as pool:
+            await pool.execute("INSERT INTO Users (first_name, last_name, tg_id) VALUES ('А', 'А', '1'), ('Б', 'Б', '2')")
+            first = await certificates.issue_certificate({**DATA, "user_id": 1})
+            second = await certificates.issue_certificate({**DATA, "user_id": 2})
+            again = await certificates.issue_certificate({**DATA, "user_id": 2})
+            owners = await pool.fetch("SELECT user_id FROM Certificates ORDER BY user_id")
+            return first, second, again, [row["user_id"] for row in owners]
+
+    first, second, again, owners = asyncio.run(scenario())
+    assert (first, second, again) == (b"PDF 1", b"PDF 2", b"PDF 2")
+    assert owners == [1, 2]
+    assert renderer.calls == 2
+
+
+@pytest.mark.postgres
+def test_revoked_certificate_is_reissued_and_cached_again(database, renderer):
+    async def scenario():
+        async with database() as pool:
+            await pool.execute("INSERT INTO Users (first_name, last_name, tg_id) VALUES ('А', 'А', '1')")
+            await certificates.issue_certificate({**DATA, "user_id": 1})
+            await pool.execute("UPDATE Certificates SET status = 'revoked'")
+            reissued = await certificates.issue_certificate({**DATA, "user_id": 1})
+            cached = await certificates.issue_certificate({**DATA, "user_id": 1})
+            statuses = await pool.fetch("SELECT status FROM Certificates ORDER BY certificate_id")
+            return reissued, cached, [row["status"] for row in statuses]
+
+    reissued, cached, statuses = asyncio.run(scenario())
+    assert reissued == cached == b"PDF 2"
+    assert statuses == ["revoked", "active"]
+    assert renderer.calls == 2
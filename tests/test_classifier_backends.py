@@ -0,0 +1,39 @@
+import os
+import importlib.util
+
+import pytest
+
+import model
+from benchmarks.common import load_corpus
+from classifier_backends import BACKENDS, load_backend, onnx_path_for
+
+
+def test_onnx_export_lives_outside_checkpoint():
+    path = onnx_path_for("./results/checkpoint-624/")
+    assert os.path.dirname(path) == "results"
+    assert not path.startswith(os.path.normpath(model.checkpoint_path) + os.sep)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_backend("tensorflow", model.checkpoint_path)
+
+
+@pytest.mark.skipif(
+    not all(importlib.util.find_spec(name) for name in ("torch", "transformers", "onnxruntime"))
+    or not os.path.isdir(model.checkpoint_path),
+    reason="нужны torch, transformers, onnxruntime и чекпоинт классификатора",
+)
+def test_backends_agree_on_symptom_corpus():
+    texts = [text for text, _ in load_corpus("symptoms.tsv")]
+    label_map = model._read_label_map()
+
+    predictions = {}
+    for name in BACKENDS:
+        probabilities = load_backend(name, model.checkpoint_path).predict_proba(texts)
+        predictions[name] = [label_map[int(row.argmax())] for row in probabilities]
+
+    reference = predictions["torch"]
+    for name, labels in predictions.items():
+        mismatches = [(text, a, b) for text, a, b in zip(texts, reference, labels) if a != b]
+        assert not mismatches, f"{name} расходится с torch: {mismatches}"
@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from benchmarks.common import load_corpus
+from date_parser import parse_date
+
+TODAY = date(2025, 6, 12)
+
+
+@pytest.mark.parametrize("text,expected", load_corpus("dates.tsv"))
+def test_corpus(text, expected):
+    assert parse_date(text, TODAY) == (expected or None)
+
+
+def test_invalid_numeric_match_does_not_stop_parsing():
+    assert parse_date("температура 38.5 с 10 июня", TODAY) == "10.06.2025"
+
+
+def test_ago_without_number_counts_one_unit():
+    assert parse_date("заболел неделю назад", TODAY) == "05.06.2025"
+    assert parse_date("заболела день назад", TODAY) == "11.06.2025"
+
+
+def test_empty_text():
+    assert parse_date("", TODAY) is None
+    assert parse_date(None, TODAY) is None
@@ -0,0 +1,69 @@
+import asyncio
+
+import asyncpg
+import pytest
+
+from db_handler import db
+
+
+class FakePool:
+    def __init__(self, users=None, fail=False):
+        self.users = dict(users or {})
+        self.fail = fail
+        self.queries = []
+
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        if self.fail:
+            raise asyncpg.PostgresError("нет соединения")
+        return self.users.get(args[0])
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool({"42": 7})
+    monkeypatch.setattr(db, "_pool", pool)
+    return pool
+
+
+def test_resolve_user_id_caches_hits_and_misses(fake_pool):
+    async def scenario():
+        assert await db.resolve_user_id(42) == 7
+        assert await db.resolve_user_id("42") == 7
+        assert await db.resolve_user_id(43) is None
+        assert await db.check_auth(43) is False
+
+    asyncio.run(scenario())
+    assert len(fake_pool.queries) == 2
+
+
+def test_invalidate_identity_forces_lookup(fake_pool):
+    async def scenario():
+        assert await db.resolve_user_id(43) is None
+        fake_pool.users["43"] = 8
+        db.invalidate_identity(43)
+        assert await db.resolve_user_id(43) == 8
+
+    asyncio.run(scenario())
+
+
+def test_database_error_is_not_cached(fake_pool):
+    async def scenario():
+        fake_pool.fail = True
+        assert await db.resolve_user_id(42) is None
+        fake_pool.fail = False
+        assert await db.resolve_user_id(42) == 7
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.postgres
+def test_register_and_check_auth(database):
+    async def scenario():
+        async with database():
+            assert await db.check_auth("100") is False
+            assert await db.register_user("100", None, "Анна", "Иванова", "Ж", "+79990000000",
+                                          birth_date="01.02.1990")
+            assert await db.check_auth(100) is True
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from benchmarks.common import make_state
+from db_handler import db
+from db_handler.fsm_storage import PostgresStorage
+
+
+class FakeFSMPool:
+    def __init__(self):
+        self.rows = {}
+        self.reads = 0
+        self.batches = []
+
+    async def fetchrow(self, query, storage_key, ttl):
+        self.reads += 1
+        return self.rows.get(storage_key)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def executemany(self, query, args):
+        self.batches.append(len(args))
+        for storage_key, state, data in args:
+            self.rows[storage_key] = {"state": state, "data": data}
+
+    async def execute(self, query, *args):
+        if "ANY" in query:
+            for storage_key in args[0]:
+                self.rows.pop(storage_key, None)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakeFSMPool()
+    monkeypatch.setattr(db, "_pool", pool)
+    return pool
+
+
+def test_writes_are_batched_and_reads_cached(fake_pool):
+    async def scenario():
+        storage = PostgresStorage(flush_interval=0.01)
+        for user_id in range(5):
+            state = make_state(user_id, storage)
+            await state.update_data(first_name="Анна")
+            await state.update_data(last_name="Иванова")
+            assert await state.get_data() == {"first_name": "Анна", "last_name": "Иванова"}
+        await asyncio.sleep(0.05)
+        await storage.close()
+
+    asyncio.run(scenario())
+    assert fake_pool.reads == 5
+    assert fake_pool.batches == [5]
+    assert json.loads(next(iter(fake_pool.rows.values()))["data"])["last_name"] == "Иванова"
+
+
+def test_state_survives_restart_and_clear_deletes(fake_pool):
+    async def scenario():
+        storage = PostgresStorage()
+        await make_state(1, storage).set_state("RegistrationStates:waiting_for_phone")
+        await storage.close()
+
+        restarted = PostgresStorage()
+        state = make_state(1, restarted)
+        assert await state.get_state() == "RegistrationStates:waiting_for_phone"
+        await state.clear()
+        await restarted.close()
+
+    asyncio.run(scenario())
+    assert fake_pool.rows == {}
+
+
+@pytest.mark.postgres
+def test_round_trip_through_postgres(database):
+    async def scenario():
+        async with database():
+            storage = PostgresStorage()
+            await make_state(7, storage).update_data(phone="+79990000000")
+            await storage.close()
+            return await make_state(7, PostgresStorage()).get_data()
+
+    assert asyncio.run(scenario()) == {"phone": "+79990000000"}
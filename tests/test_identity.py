@@ -0,0 +1,18 @@
+import asyncio
+
+from benchmarks.queries_per_update import SESSION, count_queries
+from db_handler.db import RESOLVE_USER_ID_QUERY
+
+RESOLVE = " ".join(RESOLVE_USER_ID_QUERY.split())
+
+
+def test_identity_is_resolved_once_per_user():
+    updates, queries = asyncio.run(count_queries(users=5, rounds=3, cached=True))
+    assert updates == 5 * 3 * len(SESSION)
+    assert queries[RESOLVE] == 5
+    assert sum(queries.values()) == 10
+
+
+def test_without_cache_every_update_hits_users():
+    updates, queries = asyncio.run(count_queries(users=5, rounds=3, cached=False))
+    assert queries[RESOLVE] == updates
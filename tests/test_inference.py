@@ -0,0 +1,80 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import model
+from inference import InferenceService, MicroBatcher
+
+
+class FakeBackend:
+    """Первый класс уверенно для текстов про сердце, иначе равномерно."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_proba(self, texts):
+        self.batches.append(list(texts))
+        rows = []
+        for text in texts:
+            if "сердце" in text:
+                rows.append([0.9, 0.05, 0.05])
+            else:
+                rows.append([0.34, 0.33, 0.33])
+        return np.array(rows)
+
+
+@pytest.fixture
+def fake_classifier(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(model, "_backend", backend)
+    monkeypatch.setattr(model, "_label_map", {0: "Кардиолог", 1: "Невролог", 2: "Лор"})
+    monkeypatch.setattr(model, "check_model_files", lambda: None)
+    model.symptom_cache.clear()
+    yield backend
+    model.symptom_cache.clear()
+
+
+def test_batch_scores_and_fallback(fake_classifier):
+    assert model.get_doctors_batch(["болит сердце", "что-то непонятное"]) == ["Кардиолог", model.FALLBACK_DOCTOR]
+    assert fake_classifier.batches == [["болит сердце", "что-то непонятное"]]
+
+    # повторный текст берется из кэша и до модели не доходит
+    assert model.get_doctor("Болит сердце!") == "Кардиолог"
+    assert len(fake_classifier.batches) == 1
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    calls = []
+
+    def batch_func(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    async def scenario():
+        service = InferenceService()
+        batcher = MicroBatcher(service, "test", batch_func, max_batch=4, max_wait=0.05)
+        results = await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(6)))
+        service.shutdown()
+        return results, batcher.batch_sizes
+
+    results, sizes = asyncio.run(scenario())
+    assert results == [f"T{i}" for i in range(6)]
+    # 4 по заполнению батча и 2 по таймеру
+    assert sizes == {4: 1, 2: 1}
+    assert calls == [["t0", "t1", "t2", "t3"], ["t4", "t5"]]
+
+
+def test_micro_batcher_propagates_errors():
+    def batch_func(texts):
+        raise RuntimeError("модель недоступна")
+
+    async def scenario():
+        service = InferenceService()
+        batcher = MicroBatcher(service, "test", batch_func, max_batch=8, max_wait=0.001)
+        try:
+            return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        finally:
+            service.shutdown()
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(scenario()))
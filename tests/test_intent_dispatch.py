@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from benchmarks.common import FakeMessage, make_state
+from db_handler import db
+from intents import IntentPrediction, intent_router
+import handlers.common as common
+
+
+class EmptyPool:
+    """База без данных: пользователь не найден, врачей нет."""
+
+    async def fetch(self, query, *args):
+        return []
+
+    async def fetchval(self, query, *args):
+        return None
+
+    async def fetchrow(self, query, *args):
+        return None
+
+    async def execute(self, query, *args):
+        return "OK"
+
+
+class FakeCallback:
+    def __init__(self, data, message):
+        self.data = data
+        self.message = message
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def empty_database(monkeypatch):
+    monkeypatch.setattr(db, "_pool", EmptyPool())
+
+
+@pytest.mark.parametrize("intent", sorted(intent_router.routes))
+def test_menu_text_dispatches_every_registered_intent(monkeypatch, intent):
+    async def predict(text):
+        return IntentPrediction(intent, 1.0, 1.0)
+
+    monkeypatch.setattr(common, "predict_intent_async", predict)
+    message = FakeMessage("текст")
+
+    asyncio.run(common.main_menu_text_handler(message, make_state(), tg_id="1"))
+    assert message.answers
+
+
+@pytest.mark.parametrize("intent", sorted(intent_router.routes))
+def test_clarification_dispatches_every_registered_intent(intent):
+    message = FakeMessage()
+    callback = FakeCallback(f"intent_{intent}", message)
+
+    asyncio.run(common.process_intent_clarification(callback, make_state(), tg_id="1"))
+    assert message.answers
+
+
+def test_dispatch_rejects_positional_state():
+    with pytest.raises(TypeError):
+        asyncio.run(intent_router.dispatch("график", FakeMessage(), make_state()))
@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.common import load_corpus
+from intents import IntentEngine, IntentRouter
+
+CORPUS = load_corpus("intents.tsv")
+
+
+@pytest.fixture
+def engine():
+    return IntentEngine()
+
+
+@pytest.mark.parametrize("text, expected", CORPUS)
+def test_fast_path_is_never_wrong(engine, text, expected):
+    intent, _ = engine.match_tier(text)
+    assert intent in (None, expected)
+
+
+@pytest.mark.parametrize("text, tier", [
+    ("📝 Записаться к врачу", "exact"),
+    ("Запись к врачу!", "normalized"),
+    ("расписание клиники", "keyword"),
+    # ключевое слово в длинном сообщении решает модель
+    ("подскажите пожалуйста какое расписание у кардиолога на неделе", None),
+    # два намерения сразу — тоже модель
+    ("адрес и график работы", None),
+])
+def test_tiers(engine, text, tier):
+    assert engine.match_tier(text)[1] == tier
+
+
+def test_hits_are_counted_per_tier(engine):
+    engine.match("помощь")
+    engine.match("где находится филиал")
+    assert engine.stats() == {"exact": 1, "normalized": 0, "keyword": 1, "model": 0}
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    joblib = pytest.importorskip("joblib")
+    pytest.importorskip("sklearn")
+    import model
+
+    try:
+        return joblib.load(model.intent_model_path)
+    except (ImportError, OSError) as e:
+        pytest.skip(f"модель намерений не загружается: {e}")
+
+
+def test_model_agrees_with_corpus_on_free_text(pipeline):
+    engine = IntentEngine()
+    free_text = [(text, expected) for text, expected in CORPUS if engine.match_tier(text)[1] is None]
+    predicted = pipeline.predict([text for text, _ in free_text])
+    correct = sum(answer == expected for answer, (_, expected) in zip(predicted, free_text))
+    assert correct / len(free_text) >= 0.8
+
+
+@pytest.mark.parametrize("text, decision", [
+    ("хочу записаться к терапевту на завтра", "routed"),
+    ("у меня болит голова к какому врачу идти", "routed"),
+    ("можно ли отменить запись", "clarify"),
+    ("привет", "clarify"),
+])
+def test_real_model_confidence_drives_decision(pipeline, text, decision):
+    import model
+
+    router = IntentRouter()
+    router.routes = dict.fromkeys(map(str, pipeline.classes_))
+    prediction, = model._predict_intents(pipeline, [text])
+
+    assert 0.0 < prediction.confidence <= 1.0
+    assert prediction.runner_up is not None
+    assert router.decide(prediction) == decision
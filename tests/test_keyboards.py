@@ -0,0 +1,70 @@
+import asyncio
+
+from keyboards import inline
+
+
+class FakeCallback:
+    def __init__(self, data, message=None):
+        self.data = data
+        self.message = message
+        self.answered = False
+
+    async def answer(self, *args, **kwargs):
+        self.answered = True
+
+
+class NotModifiedMessage:
+    async def edit_reply_markup(self, **kwargs):
+        raise RuntimeError("message is not modified")
+
+
+DOCTORS = [(i, "Имя", f"Фамилия{i}", "Терапия") for i in range(25)]
+
+
+def callbacks(markup):
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def test_page_indicator_is_noop():
+    markup = inline.get_doctors_keyboard(DOCTORS, page=1, page_callback="doctors_page")
+    navigation = markup.inline_keyboard[-2]
+    assert [button.text for button in navigation] == ["◀️", "2/3", "▶️"]
+    assert [button.callback_data for button in navigation] == ["doctors_page_0", inline.NOOP_CALLBACK, "doctors_page_2"]
+
+
+def test_pages_split_doctors():
+    pages = [inline.get_doctors_keyboard(DOCTORS, page=page, page_callback="doctors_page") for page in range(3)]
+    shown = [data for markup in pages for data in callbacks(markup) if data.startswith("doctor_")]
+    assert shown == [f"doctor_{i}" for i in range(25)]
+
+
+def test_cached_keyboards_are_reused():
+    assert inline.get_main_menu() is inline.get_main_menu()
+    first = inline.get_doctors_keyboard(DOCTORS, generation=1, page_callback="doctors_page")
+    assert inline.get_doctors_keyboard(DOCTORS, generation=1, page_callback="doctors_page") is first
+    assert inline.get_doctors_keyboard(DOCTORS, generation=2, page_callback="doctors_page") is not first
+
+
+def test_callback_data_fits_telegram_limit():
+    markups = [
+        inline.get_main_menu(), inline.get_medcard_keyboard(), inline.get_booking_confirm_keyboard(),
+        inline.get_intent_clarification_keyboard(tuple(inline.INTENT_TITLES)),
+        inline.get_doctors_keyboard(DOCTORS, page=2, page_callback="doctors_page"),
+    ]
+    assert all(len(data.encode()) <= 64 for markup in markups for data in callbacks(markup))
+
+
+def test_noop_and_page_callbacks_are_answered():
+    from handlers.common import process_noop, process_doctors_page
+
+    noop = FakeCallback(inline.NOOP_CALLBACK)
+    asyncio.run(process_noop(noop))
+    assert noop.answered
+
+    # даже если Telegram отклонит правку клавиатуры, часики на кнопке уже сняты
+    page = FakeCallback("doctors_page_1", NotModifiedMessage())
+    try:
+        asyncio.run(process_doctors_page(page, state=None))
+    except RuntimeError:
+        pass
+    assert page.answered
@@ -0,0 +1,164 @@
+import time
+import asyncio
+import contextlib
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("ollama")
+
+from aiohttp import web
+
+from benchmarks.common import FakeMessage, make_state
+from llm_client import LLMDateClient
+
+
+class FakeOllama:
+    """HTTP-сервер с API /api/chat, как у Ollama."""
+
+    def __init__(self, answer="05.06.2025", delay=0.0, status=200):
+        self.answer = answer
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def chat(self, request):
+        self.requests.append(await request.json())
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.status != 200:
+            return web.json_response({"error": "модель недоступна"}, status=self.status)
+        return web.json_response({
+            "model": "mistral",
+            "created_at": "2025-06-12T10:00:00Z",
+            "message": {"role": "assistant", "content": self.answer},
+            "done": True,
+        })
+
+    @contextlib.asynccontextmanager
+    async def serve(self):
+        app = web.Application()
+        app.router.add_post("/api/chat", self.chat)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            await runner.cleanup()
+
+
+def test_extracts_and_caches_date():
+    server = FakeOllama(answer=" 05.06.2025\n")
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=2)
+            first = await client.extract_date("в начале месяца")
+            second = await client.extract_date("в начале месяца ")
+            return first, second
+
+    assert asyncio.run(scenario()) == ("05.06.2025", "05.06.2025")
+    assert len(server.requests) == 1
+    assert server.requests[0]["model"] == "mistral"
+    assert "DD.MM.YYYY" in server.requests[0]["messages"][0]["content"]
+
+
+def test_timeout_returns_none_quickly():
+    server = FakeOllama(delay=1)
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=0.2)
+            started = time.monotonic()
+            result = await client.extract_date("когда-то давно")
+            return result, time.monotonic() - started, client.breaker.failures
+
+    result, elapsed, failures = asyncio.run(scenario())
+    assert result is None
+    assert elapsed < 2
+    assert failures == 1
+
+
+def test_circuit_breaker_stops_calling_broken_server():
+    server = FakeOllama(status=500)
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=1)
+            client.breaker.failure_threshold = 2
+            return [await client.extract_date(f"текст {i}") for i in range(5)]
+
+    assert asyncio.run(scenario()) == [None] * 5
+    assert len(server.requests) == 2
+
+
+@pytest.mark.parametrize("probe_status,after_probe", [(200, 1), (500, 0)])
+def test_half_open_breaker_lets_one_probe_through(probe_status, after_probe):
+    server = FakeOllama(status=500)
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=2)
+            client.breaker.failure_threshold = 1
+            client.breaker.reset_timeout = 0.1
+            await client.extract_date("текст")
+            await asyncio.sleep(0.15)
+
+            server.status, server.delay = probe_status, 0.05
+            results = await asyncio.gather(*(client.extract_date(f"текст {i}") for i in range(10)))
+            requests_during_probe = len(server.requests) - 1
+            # после удачной пробы цепь закрыта, после неудачной снова открыта
+            await client.extract_date("после пробы")
+            return results, requests_during_probe
+
+    results, requests_during_probe = asyncio.run(scenario())
+    assert requests_during_probe == 1
+    assert results.count("05.06.2025") == (1 if probe_status == 200 else 0)
+    assert len(server.requests) == 2 + after_probe
+
+
+def test_concurrency_is_bounded():
+    server = FakeOllama(delay=0.05)
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=2, max_concurrency=2)
+            await asyncio.gather(*(client.extract_date(f"текст {i}") for i in range(8)))
+
+    asyncio.run(scenario())
+    assert len(server.requests) == 8
+    assert server.max_active == 2
+
+
+@pytest.mark.parametrize("answer,expected", [
+    ("05.06.2025", "Введите дату окончания болезни (ДД.ММ.ГГГГ):"),
+    ("не знаю", "Не удалось распознать дату. Введите дату в формате ДД.ММ.ГГГГ."),
+])
+def test_certificate_start_date_falls_back_to_llm(answer, expected):
+    from handlers.common import CertificateStates, process_start_date
+
+    server = FakeOllama(answer=answer)
+
+    async def scenario():
+        async with server.serve() as host:
+            client = LLMDateClient(host=host, timeout=2)
+            message, state = FakeMessage("когда начались выходные"), make_state()
+            await state.set_state(CertificateStates.waiting_for_start_date)
+            with mock.patch("llm_client.llm_date_client", client), \
+                    mock.patch("handlers.common.is_current_year", return_value=True):
+                await process_start_date(message, state)
+            return message.last_text, await state.get_data()
+
+    text, data = asyncio.run(scenario())
+    assert len(server.requests) == 1
+    assert text == expected
+    assert data.get("start_date") == ("05.06.2025" if answer == "05.06.2025" else None)
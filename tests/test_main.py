@@ -0,0 +1,36 @@
+import asyncio
+
+from aiogram import Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+
+import main
+
+
+async def noop(*args, **kwargs):
+    pass
+
+
+def test_shutdown_cancels_pending_warm_up(monkeypatch):
+    started = []
+
+    async def slow_warm_up():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(3600)
+
+    for name in ("create_pool", "apply_migrations", "close_pool"):
+        monkeypatch.setattr(main, name, noop)
+    monkeypatch.setattr(main.availability_index, "ensure_loaded", noop)
+    monkeypatch.setattr(main.doctor_catalog, "start", noop)
+    monkeypatch.setattr(main.symptom_index, "ensure_loaded", noop)
+    monkeypatch.setattr(main.inference_service, "shutdown", lambda: None)
+    monkeypatch.setattr(main, "warm_up_models", slow_warm_up)
+    monkeypatch.setattr(main, "MODEL_WARMUP", True)
+
+    async def scenario():
+        dp = Dispatcher(storage=MemoryStorage())
+        await main.start_services(None, dp, run_scheduler=False)
+        await asyncio.sleep(0)
+        await dp.emit_shutdown(bot=None)
+        return started[0]
+
+    assert asyncio.run(scenario()).cancelled()
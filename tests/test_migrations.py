@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import json
+import os
+from datetime import datetime
+
+import asyncpg
+import pytest
+
+from db_handler import db, migrations
+from db_handler.certificates import GET_CERTIFICATE_PDF_QUERY
+from db_handler.db import PATIENT_SNAPSHOT_QUERY, RESOLVE_USER_ID_QUERY
+from db_handler.fsm_storage import SELECT_QUERY
+from time_func import DUE_REMINDERS_QUERY
+
+
+class FakeMigrationConnection:
+    def __init__(self):
+        self.applied = []
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, query):
+        return []
+
+    async def execute(self, query, *args):
+        if "BROKEN" in query:
+            raise asyncpg.PostgresSyntaxError("syntax error at or near \"BROKEN\"")
+        if query.startswith("INSERT INTO SchemaMigrations"):
+            self.applied.append(args[0])
+
+
+def test_failed_migration_aborts_startup(tmp_path, monkeypatch):
+    (tmp_path / "0001_ok.sql").write_text("SELECT 1;", encoding="utf-8")
+    (tmp_path / "0002_broken.sql").write_text("BROKEN;", encoding="utf-8")
+    (tmp_path / "0003_after.sql").write_text("SELECT 3;", encoding="utf-8")
+    conn = FakeMigrationConnection()
+    monkeypatch.setattr(db, "_pool", conn)
+
+    with pytest.raises(asyncpg.PostgresError):
+        asyncio.run(migrations.apply_migrations(str(tmp_path)))
+    assert conn.applied == ["0001_ok.sql"]
+
+
+@pytest.mark.postgres
+def test_slot_index_migration_cancels_duplicates(database):
+    async def scenario():
+        async with database() as pool:
+            await pool.execute("""
+                DROP INDEX appointments_doctor_slot_uniq;
+                INSERT INTO Specializations (name) VALUES ('Терапия');
+                INSERT INTO Doctors (first_name, last_name, specialization_id) VALUES ('Иван', 'Петров', 1);
+                INSERT INTO Users (first_name, last_name, tg_id) VALUES ('А', 'А', '1'), ('Б', 'Б', '2');
+                INSERT INTO Appointments (user_id, doctor_id, appointment_date, status) VALUES
+                    (1, 1, '2030-06-12 10:00', 'scheduled'),
+                    (2, 1, '2030-06-12 10:00', 'confirmed');
+            """)
+            with open(os.path.join(migrations.MIGRATIONS_DIR, "0001_missing_tables.sql"), encoding="utf-8") as f:
+                await pool.execute(f.read())
+            return await pool.fetch("SELECT user_id, status FROM Appointments ORDER BY appointment_id")
+
+    rows = asyncio.run(scenario())
+    assert [tuple(row) for row in rows] == [(1, "scheduled"), (2, "canceled")]
+
+
+# Горячие запросы и таблицы, которые растут вместе с базой: по ним нужен индекс
+HOT_QUERIES = {
+    "resolve_user_id": (RESOLVE_USER_ID_QUERY, ("1",)),
+    "patient_snapshot": (PATIENT_SNAPSHOT_QUERY, ("1",)),
+    "due_reminders": (DUE_REMINDERS_QUERY, (datetime(2030, 6, 12, 10), datetime(2030, 6, 12, 11), "24h")),
+    "fsm_state": (SELECT_QUERY, ("fsm:1:1", 300.0)),
+    "certificate_pdf": (GET_CERTIFICATE_PDF_QUERY, (1, "hash")),
+}
+LARGE_TABLES = {"users", "appointments", "diagnoses", "appointmentreminders", "fsmstates", "certificates"}
+
+
+def seq_scanned_tables(plan: dict) -> set:
+    tables = {plan["Relation Name"].lower()} if plan["Node Type"] == "Seq Scan" else set()
+    for child in plan.get("Plans", []):
+        tables |= seq_scanned_tables(child)
+    return tables
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_do_not_seq_scan(database, name):
+    query, args = HOT_QUERIES[name]
+
+    async def scenario():
+        async with database() as pool:
+            async with pool.acquire() as conn:
+                # без seqscan планировщик выберет полный просмотр, только если индекса нет
+                await conn.execute("SET enable_seqscan = off")
+                plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+                return json.loads(plan)[0]["Plan"]
+
+    assert not seq_scanned_tables(asyncio.run(scenario())) & LARGE_TABLES
@@ -0,0 +1,56 @@
+import asyncio
+import json
+from datetime import date, datetime
+
+from benchmarks.common import FakeMessage, make_state
+from benchmarks.row_mapping import snapshot_json
+from db_handler import db
+from db_handler.models import PatientSnapshot
+
+
+class SnapshotPool:
+    def __init__(self, raw):
+        self.raw = raw
+        self.calls = 0
+
+    async def fetchval(self, query, tg_id):
+        self.calls += 1
+        return self.raw
+
+
+def test_snapshot_maps_into_models():
+    snapshot = PatientSnapshot.from_json(json.loads(snapshot_json(appointments=2, diagnoses=1)))
+
+    assert snapshot.user.full_name == "Анна Иванова"
+    assert snapshot.user.birth_date == date(1990, 2, 1)
+    assert snapshot.user.birth_date_str == "01.02.1990"
+    assert snapshot.last_appointment.appointment_date == datetime(2025, 6, 12, 10, 0)
+    assert (snapshot.last_appointment.date, snapshot.last_appointment.time) == ("12.06.2025", "10:00")
+    assert snapshot.diagnoses[0].date == "01.06.2025"
+
+
+def test_empty_medcard():
+    raw = json.loads(snapshot_json(appointments=0, diagnoses=0))
+    raw["user"]["birth_date"] = None
+    snapshot = PatientSnapshot.from_json(raw)
+
+    assert snapshot.last_appointment is None
+    assert snapshot.user.birth_date_str is None
+
+
+def test_medcard_handlers_render_cached_snapshot(monkeypatch):
+    from handlers.common import handle_medcard_appointments, handle_medcard_profile
+
+    pool = SnapshotPool(snapshot_json(appointments=1, diagnoses=0))
+    monkeypatch.setattr(db, "_pool", pool)
+
+    async def scenario():
+        profile, appointments = FakeMessage(), FakeMessage()
+        await handle_medcard_profile(profile, make_state(), tg_id="1")
+        await handle_medcard_appointments(appointments, make_state(), tg_id="1")
+        return profile.last_text, appointments.last_text
+
+    profile, appointments = asyncio.run(scenario())
+    assert "Дата рождения: 01.02.1990" in profile
+    assert "Дата: 12.06.2025\nВремя: 10:00\nВрач: Иван Петров" in appointments
+    assert pool.calls == 1
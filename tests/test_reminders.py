@@ -0,0 +1,33 @@
+import time
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.reminders import FakeBot, FakeReminderPool, run
+from time_func import RateLimiter
+
+
+def test_restart_mid_chunk_neither_duplicates_nor_skips():
+    start = datetime(2025, 6, 12, 10, 0)
+    pool = FakeReminderPool(2000, start)
+    crashed, restarted = FakeBot(crash_after=777), FakeBot(retry_every=97)
+
+    asyncio.run(run(pool, [crashed, restarted], start))
+
+    delivered = Counter(crashed.delivered + restarted.delivered)
+    assert 777 <= len(crashed.delivered) < 2000
+    assert len(delivered) == 2000
+    assert max(delivered.values()) == 1
+    assert len(pool.sent) == 2000
+
+
+def test_rate_limiter_spaces_messages_to_one_chat():
+    async def scenario():
+        limiter = RateLimiter(global_rate=1000, chat_interval=0.05)
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.wait(1)
+        await limiter.wait(2)
+        return time.monotonic() - started
+
+    assert 0.09 <= asyncio.run(scenario()) < 0.5
@@ -0,0 +1,52 @@
+import re
+
+import pytest
+
+from benchmarks.common import INIT_SQL
+from db_handler.symptoms import SymptomIndex, same_specialty, specialty_key
+from inference import combine_scores
+
+with open(INIT_SQL, encoding="utf-8") as f:
+    SPECIALIZATIONS = re.findall(r"^\('([^']+)'", f.read(), re.M)
+
+
+def test_every_specialization_has_its_own_key():
+    keys = [specialty_key(name) for name in SPECIALIZATIONS]
+    assert len(SPECIALIZATIONS) > 20
+    assert len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize("label, specialization", [
+    ("Гинеколог", "Гинекология"),
+    ("Кардиолог", "Кардиология"),
+    ("Терапевт", "Терапия"),
+    ("Психотерапевт", "Психотерапия"),
+    ("ЛОР", "Отоларингология"),
+    ("Сосудистый хирург", "Сосудистая хирургия"),
+    ("Хирург", "Хирургия"),
+])
+def test_label_maps_to_exactly_one_specialization(label, specialization):
+    assert [name for name in SPECIALIZATIONS if same_specialty(label, name)] == [specialization]
+
+
+def test_hybrid_scores_do_not_leak_into_similar_names():
+    index_scores = {"Гинекология-онкология": 2.0, "Гинеколог-хирург": 1.0, "Гинекология": 1.0}
+    combined = combine_scores(index_scores, {"Гинеколог": 0.8, "Уролог": 0.2}, index_weight=0.5)
+
+    assert combined["Гинекология"] == pytest.approx(0.5 * 0.25 + 0.5 * 0.8)
+    assert combined["Гинекология-онкология"] == pytest.approx(0.5 * 0.5)
+    assert combined["Уролог"] == pytest.approx(0.5 * 0.2)
+    assert max(combined, key=combined.get) == "Гинекология"
+
+
+def test_index_scores_symptoms_by_stems():
+    index = SymptomIndex()
+    index.build([
+        {"symptom_id": 1, "symptom": "боль в груди", "specialization": "Кардиология", "priority": 1},
+        {"symptom_id": 1, "symptom": "боль в груди", "specialization": "Терапия", "priority": 2},
+        {"symptom_id": 2, "symptom": "головная боль", "specialization": "Неврология", "priority": 1},
+    ])
+
+    scores = index.score("сильные боли в груди")
+    assert scores == {"Кардиология": 1.0, "Терапия": 0.5}
+    assert index.is_confident(scores)
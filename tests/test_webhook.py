@@ -0,0 +1,85 @@
+import json
+import queue
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import webhook
+from benchmarks.webhook_load import NoTelegramBot, make_update
+
+
+class RecordingDispatcher:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.seen = []
+        self.active = 0
+        self.max_active = 0
+
+    async def feed_raw_update(self, bot, update):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.seen.append((update["message"]["chat"]["id"], update["update_id"]))
+        self.active -= 1
+
+
+def test_get_chat_id():
+    assert webhook.get_chat_id(make_update(1, 42)) == 42
+    callback = {"update_id": 2, "callback_query": {"from": {"id": 7}, "message": {"chat": {"id": 8}}}}
+    assert webhook.get_chat_id(callback) == 8
+    assert webhook.get_chat_id({"update_id": 3}) == 0
+
+
+def test_updates_of_one_chat_keep_order():
+    dp = RecordingDispatcher(delay=0.001)
+    updates = queue.Queue()
+    for update_id in range(60):
+        updates.put((update_id % 3, json.dumps(make_update(update_id, update_id % 3))))
+    updates.put(None)
+
+    asyncio.run(webhook.consume_updates(updates, webhook.ChatOrderedRunner(dp, bot=None)))
+
+    assert len(dp.seen) == 60
+    for chat_id in range(3):
+        ids = [update_id for chat, update_id in dp.seen if chat == chat_id]
+        assert ids == sorted(ids)
+
+
+def test_worker_stops_reading_when_pending_limit_is_reached():
+    dp = RecordingDispatcher(delay=0.2)
+    updates = queue.Queue()
+    for update_id in range(10):
+        updates.put((update_id, json.dumps(make_update(update_id, update_id))))
+
+    async def scenario():
+        runner = webhook.ChatOrderedRunner(dp, bot=None, max_pending=3)
+        consumer = asyncio.create_task(webhook.consume_updates(updates, runner))
+        await asyncio.sleep(0.1)
+        left_in_queue = updates.qsize()
+        updates.put(None)
+        await consumer
+        return left_in_queue
+
+    # 3 апдейта в работе, остальные ждут в очереди
+    assert asyncio.run(scenario()) == 7
+    assert dp.max_active == 3
+    assert len(dp.seen) == 10
+
+
+def test_full_queue_answers_503():
+    updates = queue.Queue(maxsize=1)
+
+    async def scenario():
+        client = TestClient(TestServer(webhook.create_app(NoTelegramBot(), [updates])))
+        await client.start_server()
+        try:
+            statuses = []
+            for update_id in range(2):
+                response = await client.post(webhook.WEBHOOK_PATH, data=json.dumps(make_update(update_id, 5)))
+                statuses.append(response.status)
+            return statuses
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == [200, 503]
+    assert updates.get_nowait()[0] == 5
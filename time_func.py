@@ -1,64 +1,194 @@
 # time_func.py
 import os
+import time
 import asyncio
+import logging
 from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
 from aiogram import Bot
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError, TelegramBadRequest
+import asyncpg
 import db_handler
 
-TOKEN = os.getenv("TOKEN")
-bot = Bot(token=TOKEN)
+logger = logging.getLogger(__name__)
 
+REMINDER_CHUNK_SIZE = int(os.environ.get("REMINDER_CHUNK_SIZE", 500))
+REMINDER_CONCURRENCY = int(os.environ.get("REMINDER_CONCURRENCY", 20))
+REMINDER_MAX_RETRIES = int(os.environ.get("REMINDER_MAX_RETRIES", 5))
+# Telegram: не больше ~30 сообщений в секунду всего и одного в секунду в один чат
+TELEGRAM_GLOBAL_RATE = float(os.environ.get("TELEGRAM_GLOBAL_RATE", 30))
+TELEGRAM_CHAT_INTERVAL = float(os.environ.get("TELEGRAM_CHAT_INTERVAL", 1))
 
-async def send_appointment_reminders():
-    while True:
-        now = datetime.now()
-        tomorrow = now + timedelta(days=1)
-        target_date = tomorrow.date()
+CLINIC_TIMEZONE = ZoneInfo(os.environ.get("CLINIC_TIMEZONE", "Europe/Moscow"))
+REMINDER_LEAD_TIMES = {
+    "24h": timedelta(hours=24),
+    "2h": timedelta(hours=2),
+}
+REMINDER_CHECK_MINUTES = int(os.environ.get("REMINDER_CHECK_MINUTES", 10))
+# насколько запоздавшая проверка (перезапуск, простой) еще досылает напоминания
+REMINDER_CATCH_UP = timedelta(minutes=int(os.environ.get("REMINDER_CATCH_UP_MINUTES", 60)))
+REMINDER_LOCK_BASE = 7310100
 
-        conn = db_handler.db.create_connection()
-        if not conn:
-            print("❌ Нет подключения к БД")
-            await asyncio.sleep(3600)
-            continue
+DUE_REMINDERS_QUERY = """
+    SELECT 
+        a.appointment_id,
+        u.tg_id,
+        a.appointment_date,
+        d.first_name || ' ' || d.last_name AS doctor_name,
+        s.name AS specialization
+    FROM Appointments a
+    JOIN Users u ON a.user_id = u.user_id
+    JOIN Doctors d ON a.doctor_id = d.doctor_id
+    JOIN Specializations s ON d.specialization_id = s.specialization_id
+    LEFT JOIN AppointmentReminders r ON r.appointment_id = a.appointment_id AND r.kind = $3
+    WHERE a.appointment_date >= $1 AND a.appointment_date < $2
+      AND a.status = 'scheduled'
+      AND r.appointment_id IS NULL
+    ORDER BY a.appointment_id
+"""
+
+MARK_SENT_QUERY = """
+    INSERT INTO AppointmentReminders (appointment_id, kind)
+    VALUES ($1, $2)
+    ON CONFLICT DO NOTHING
+"""
+
+
+class RateLimiter:
+    """Ограничивает общую частоту отправки и частоту отправки в один чат."""
+
+    def __init__(self, global_rate: float = TELEGRAM_GLOBAL_RATE, chat_interval: float = TELEGRAM_CHAT_INTERVAL):
+        self.global_interval = 1 / global_rate
+        self.chat_interval = chat_interval
+        self._next_global = 0.0
+        self._next_chat = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, chat_id: int):
+        async with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_global, self._next_chat.get(chat_id, 0.0))
+            self._next_global = send_at + self.global_interval
+            self._next_chat[chat_id] = send_at + self.chat_interval
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
 
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        u.tg_id,
-                        a.appointment_date,
-                        d.first_name || ' ' || d.last_name AS doctor_name,
-                        s.name AS specialization
-                    FROM Appointments a
-                    JOIN Users u ON a.user_id = u.user_id
-                    JOIN Doctors d ON a.doctor_id = d.doctor_id
-                    JOIN Specializations s ON d.specialization_id = s.specialization_id
-                    WHERE DATE(a.appointment_date) = %s
-                """, (target_date,))
-
-                rows = cursor.fetchall()
-
-                for row in rows:
-                    tg_id = int(row[0])
-                    date_str = row[1].strftime("%d.%m.%Y")
-                    time_str = row[1].strftime("%H:%M")
-                    doctor = row[2]
-                    specialization = row[3]
-
-                    text = (
-                        f"🔔 Напоминание о приеме:\n\n"
-                        f"📅 {date_str} в {time_str}\n"
-                        f"👨‍⚕️ Врач: {doctor} ({specialization})"
-                    )
-
-                    try:
-                        await bot.send_message(chat_id=tg_id, text=text)
-                    except Exception as e:
-                        print(f"Ошибка отправки уведомления пользователю {tg_id}: {e}")
 
+def format_reminder(appointment_date: datetime, doctor: str, specialization: str) -> str:
+    date_str = appointment_date.strftime("%d.%m.%Y")
+    time_str = appointment_date.strftime("%H:%M")
+    return (
+        f"🔔 Напоминание о приеме:\n\n"
+        f"📅 {date_str} в {time_str}\n"
+        f"👨‍⚕️ Врач: {doctor} ({specialization})"
+    )
+
+
+async def send_reminder(bot: Bot, limiter: RateLimiter, tg_id: int, text: str) -> bool:
+    """Возвращает True, если напоминание можно считать обработанным."""
+    delay = 1.0
+    for attempt in range(REMINDER_MAX_RETRIES):
+        await limiter.wait(tg_id)
+        try:
+            await bot.send_message(chat_id=tg_id, text=text)
+            return True
+        except TelegramRetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # пользователь заблокировал бота или чата нет — повторять бесполезно
+            logger.warning(f"Напоминание пользователю {tg_id} не доставлено: {e}")
+            return True
         except Exception as e:
-            print(f"Ошибка при получении данных о приемах: {e}")
-        finally:
-            conn.close()
+            logger.warning(f"Ошибка отправки уведомления пользователю {tg_id}: {e}")
+            await asyncio.sleep(delay)
+            delay *= 2
+    return False
+
+
+async def dispatch_reminders(
+    bot: Bot,
+    start: datetime,
+    end: datetime,
+    kind: str,
+    limiter: Optional[RateLimiter] = None
+) -> int:
+    """Рассылает напоминания о приемах в интервале [start, end), которые еще не отправлялись.
+
+    Записи читаются серверным курсором порциями по REMINDER_CHUNK_SIZE. Каждое
+    напоминание отмечается в AppointmentReminders сразу после отправки, поэтому
+    перезапуск посреди порции не дублирует уже отправленные и не пропускает остальные.
+    """
+    pool = await db_handler.db.get_pool()
+    if not pool:
+        print("❌ Нет подключения к БД")
+        return 0
+
+    limiter = limiter or RateLimiter()
+    semaphore = asyncio.Semaphore(REMINDER_CONCURRENCY)
+
+    async def process(row) -> bool:
+        async with semaphore:
+            text = format_reminder(row['appointment_date'], row['doctor_name'], row['specialization'])
+            if not await send_reminder(bot, limiter, int(row['tg_id']), text):
+                return False
+            await pool.execute(MARK_SENT_QUERY, row['appointment_id'], kind)
+            return True
+
+    sent = 0
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            cursor = await conn.cursor(DUE_REMINDERS_QUERY, start, end, kind)
+            while True:
+                rows = await cursor.fetch(REMINDER_CHUNK_SIZE)
+                if not rows:
+                    break
+                sent += sum(await asyncio.gather(*(process(row) for row in rows)))
+
+    return sent
+
+
+async def run_reminder_job(bot: Bot, kind: str, lead_time: timedelta):
+    """Отправляет напоминания с упреждением lead_time.
+
+    Задачу держит advisory lock в Postgres, поэтому при нескольких репликах бота
+    рассылку в каждый момент выполняет только одна из них.
+    """
+    pool = await db_handler.db.get_pool()
+    if not pool:
+        print("❌ Нет подключения к БД")
+        return
+
+    lock_id = REMINDER_LOCK_BASE + list(REMINDER_LEAD_TIMES).index(kind)
+    try:
+        async with pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", lock_id):
+                return
+            try:
+                # appointment_date хранится в местном времени клиники
+                now = datetime.now(CLINIC_TIMEZONE).replace(tzinfo=None)
+                end = now + lead_time
+                start = max(now, end - REMINDER_CATCH_UP)
+                sent = await dispatch_reminders(bot, start, end, kind)
+                if sent:
+                    logger.info(f"Отправлено напоминаний ({kind}): {sent}")
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", lock_id)
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"Ошибка при получении данных о приемах: {e}")
+
 
-        await asyncio.sleep(86400)
+def setup_reminder_scheduler(bot: Bot) -> AsyncIOScheduler:
+    scheduler = AsyncIOScheduler(timezone=CLINIC_TIMEZONE)
+    for kind, lead_time in REMINDER_LEAD_TIMES.items():
+        scheduler.add_job(
+            run_reminder_job,
+            CronTrigger(minute=f"*/{REMINDER_CHECK_MINUTES}", timezone=CLINIC_TIMEZONE),
+            args=(bot, kind, lead_time),
+            id=f"reminders_{kind}",
+            max_instances=1,
+            coalesce=True,
+        )
+    return scheduler
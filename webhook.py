@@ -0,0 +1,183 @@
+# webhook.py
+import os
+import json
+import queue
+import asyncio
+import logging
+import multiprocessing
+
+from aiohttp import web
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+TOKEN = os.environ.get("TOKEN")
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+WEBHOOK_HOST = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", 8080))
+WEBHOOK_WORKERS = int(os.environ.get("WEBHOOK_WORKERS", 2))
+WORKER_QUEUE_SIZE = int(os.environ.get("WORKER_QUEUE_SIZE", 1000))
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 64))
+# сколько апдейтов воркер берет из очереди, пока не обработает предыдущие;
+# остальные ждут в очереди, а когда заполнится и она, вебхук отвечает 503
+WORKER_MAX_PENDING = int(os.environ.get("WORKER_MAX_PENDING", 256))
+
+UPDATE_FIELDS = (
+    "message", "edited_message", "callback_query", "my_chat_member", "chat_member",
+    "chat_join_request", "inline_query", "chosen_inline_result", "pre_checkout_query",
+    "shipping_query", "poll_answer",
+)
+
+
+def get_chat_id(update: dict) -> int:
+    """Чат, к которому относится апдейт; по нему апдейты распределяются между воркерами."""
+    for field in UPDATE_FIELDS:
+        event = update.get(field)
+        if not event:
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"]
+    return 0
+
+
+class ChatOrderedRunner:
+    """Обрабатывает апдейты разных чатов параллельно, а апдейты одного чата — по порядку.
+
+    Одновременно выполняется не больше concurrency апдейтов, а принятых и еще
+    не обработанных может быть не больше max_pending: перед чтением из очереди
+    нужно дождаться reserve().
+    """
+
+    def __init__(self, dp, bot: Bot, concurrency: int = WORKER_CONCURRENCY,
+                 max_pending: int = WORKER_MAX_PENDING):
+        self.dp = dp
+        self.bot = bot
+        self._tails = {}
+        self._tasks = set()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+
+    async def reserve(self):
+        await self._pending.acquire()
+
+    def cancel_reservation(self):
+        self._pending.release()
+
+    def submit(self, chat_id: int, update: dict):
+        """Запускает обработку апдейта; место должно быть заранее занято через reserve()."""
+        previous = self._tails.get(chat_id)
+        task = asyncio.create_task(self._run(previous, update))
+        self._tails[chat_id] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._release(chat_id, done))
+
+    def _release(self, chat_id: int, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._pending.release()
+        if self._tails.get(chat_id) is task:
+            del self._tails[chat_id]
+
+    async def _run(self, previous, update: dict):
+        if previous is not None:
+            await asyncio.wait([previous])
+        async with self._semaphore:
+            try:
+                await self.dp.feed_raw_update(self.bot, update)
+            except Exception as e:
+                logger.error(f"Ошибка при обработке апдейта {update.get('update_id')}: {e}")
+
+    async def join(self):
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+
+async def consume_updates(updates: multiprocessing.Queue, runner: ChatOrderedRunner):
+    """Читает апдейты из очереди воркера до None и ждет обработки принятых.
+
+    Новый апдейт берется из очереди только при свободном месте в runner,
+    поэтому под нагрузкой очередь заполняется и вебхук начинает отвечать 503.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await runner.reserve()
+        item = await loop.run_in_executor(None, updates.get)
+        if item is None:
+            runner.cancel_reservation()
+            break
+        chat_id, update = item
+        runner.submit(chat_id, json.loads(update))
+    await runner.join()
+
+
+async def _worker_main(index: int, updates: multiprocessing.Queue):
+    from main import create_dispatcher, start_services
+
+    bot = Bot(token=TOKEN)
+    dp = create_dispatcher()
+    # напоминания рассылает один воркер, остальные страхует advisory lock
+    await start_services(bot, dp, run_scheduler=index == 0)
+    await dp.emit_startup(bot=bot)
+
+    logger.info(f"Воркер {index} запущен")
+    try:
+        await consume_updates(updates, ChatOrderedRunner(dp, bot))
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+
+
+def _run_worker(index: int, updates: multiprocessing.Queue):
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_worker_main(index, updates))
+
+
+def create_app(bot: Bot, queues: list) -> web.Application:
+    async def handle_update(request: web.Request) -> web.Response:
+        if WEBHOOK_SECRET and request.headers.get("X-Telegram-Bot-Api-Secret-Token") != WEBHOOK_SECRET:
+            return web.Response(status=403)
+
+        body = await request.text()
+        chat_id = get_chat_id(json.loads(body))
+        try:
+            queues[chat_id % len(queues)].put_nowait((chat_id, body))
+        except queue.Full:
+            # Telegram повторит доставку позже
+            return web.Response(status=503)
+        return web.Response()
+
+    async def on_startup(app: web.Application):
+        await bot.set_webhook(f"{WEBHOOK_URL}{WEBHOOK_PATH}", secret_token=WEBHOOK_SECRET)
+
+    async def on_cleanup(app: web.Application):
+        await bot.session.close()
+
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, handle_update)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def run_webhook(workers: int = WEBHOOK_WORKERS):
+    context = multiprocessing.get_context("spawn")
+    queues = [context.Queue(maxsize=WORKER_QUEUE_SIZE) for _ in range(workers)]
+    processes = [
+        context.Process(target=_run_worker, args=(index, updates), name=f"bot-worker-{index}")
+        for index, updates in enumerate(queues)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        web.run_app(create_app(Bot(token=TOKEN), queues), host=WEBHOOK_HOST, port=WEBHOOK_PORT)
+    finally:
+        for updates in queues:
+            updates.put(None)
+        for process in processes:
+            process.join()